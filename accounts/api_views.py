@@ -97,6 +97,27 @@ class UserListView(generics.ListAPIView):
 
 
 
+class PresenceView(APIView):
+    """
+    GET /presence/?ids=1,2,3 -> {"results": [{"user_id", "online", "last_seen"}]}
+    Served from the presence store; only users missing from it hit the database.
+    """
+    permission_classes = [IsAuthenticated]
+    max_ids = 200
+
+    def get(self, request):
+        from .presence import presence_for
+        try:
+            ids = [int(i) for i in request.query_params.get("ids", "").split(",") if i.strip()]
+        except ValueError:
+            return Response({"detail": "ids must be a comma separated list of user ids"}, status=400)
+        if len(ids) > self.max_ids:
+            return Response({"detail": f"At most {self.max_ids} ids per request"}, status=400)
+        states = presence_for(ids)
+        return Response({"results": [{"user_id": uid, **state} for uid, state in states.items()]})
+
+
+
 class GoogleLoginView(SocialLoginView):
     
     adapter_class = GoogleOAuth2Adapter
@@ -181,15 +181,15 @@ class User(AbstractBaseUser, PermissionsMixin):
         total = len(fields)
         return round((filled / total) * 100, 2)
 
+    # Presence goes through accounts.presence; is_online/last_seen are written
+    # by its periodic flush (and on a user's last disconnect), not on every event.
     def mark_online(self):
-        self.is_online = True
-        self.last_seen = timezone.now()
-        self.save(update_fields=["is_online", "last_seen"])
+        from .presence import connect
+        connect(self.pk)
 
     def mark_offline(self):
-        self.is_online = False
-        self.last_seen = timezone.now()
-        self.save(update_fields=["is_online", "last_seen"])
+        from .presence import disconnect
+        disconnect(self.pk)
 
     def generate_google_auth_user(self, google_data):
         
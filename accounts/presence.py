@@ -0,0 +1,260 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# Online presence without per-event writes to the users table.
+# Sockets report connect / heartbeat / disconnect; a user is online while
+# they hold at least one connection whose TTL keeps being refreshed by
+# heartbeats (a crashed worker's connections simply time out). Every event
+# also records "seen now" in a pending map that flush() writes to
+# User.last_seen / is_online (and FreelancerFeatures.last_seen) in one bulk
+# UPDATE per batch; a user's last disconnect is written straight away so
+# nobody stays online between flushes. The store is Redis (PRESENCE_STORE_URL,
+# the Celery broker by default), shared by every worker and drained by the
+# beat task. With the URL set empty it is a process-local stand-in for tests
+# and dev servers, drained by a daemon thread in that same process.
+
+SEEN_KEY = "presence:seen"
+
+
+def ttl_seconds():
+    return getattr(settings, "PRESENCE_TTL_SECONDS", 60)
+
+
+def flush_seconds():
+    return getattr(settings, "PRESENCE_FLUSH_SECONDS", 30)
+
+
+def _conns_key(user_id):
+    return f"presence:conns:{user_id}"
+
+
+class LocalPresenceStore:
+    """In-process store (tests, single-process dev servers)."""
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conns = {}  # user_id -> [connection count, expires (monotonic)]
+        self._seen = {}   # user_id -> unix time, pending flush
+
+    def _alive(self, user_id, now):
+        entry = self._conns.get(user_id)
+        if entry and (entry[0] <= 0 or entry[1] <= now):
+            self._conns.pop(user_id, None)
+            return None
+        return entry
+
+    def connect(self, user_id, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._alive(user_id, now) or [0, 0]
+            self._conns[user_id] = [entry[0] + 1, now + ttl]
+            self._seen[user_id] = time.time()
+
+    def heartbeat(self, user_id, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._alive(user_id, now) or [1, 0]
+            self._conns[user_id] = [entry[0], now + ttl]
+            self._seen[user_id] = time.time()
+
+    def disconnect(self, user_id):
+        """Returns True when that was the user's last connection."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._alive(user_id, now)
+            if entry:
+                entry[0] -= 1
+                entry = self._alive(user_id, now)
+            self._seen[user_id] = time.time()
+            return entry is None
+
+    def online(self, user_ids):
+        now = time.monotonic()
+        with self._lock:
+            return {uid: self._alive(uid, now) is not None for uid in user_ids}
+
+    def seen(self, user_ids):
+        with self._lock:
+            return {uid: self._seen[uid] for uid in user_ids if uid in self._seen}
+
+    def drain_seen(self):
+        with self._lock:
+            seen, self._seen = self._seen, {}
+        return seen
+
+    def requeue(self, seen):
+        with self._lock:
+            for uid, ts in seen.items():
+                self._seen[uid] = max(ts, self._seen.get(uid, 0))
+
+
+class RedisPresenceStore:
+    """Shared store: a connection counter per user with a TTL, pending last_seen in one hash."""
+    shared = True
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def connect(self, user_id, ttl):
+        pipe = self.client.pipeline()
+        pipe.incr(_conns_key(user_id))
+        pipe.expire(_conns_key(user_id), ttl)
+        pipe.hset(SEEN_KEY, user_id, time.time())
+        pipe.execute()
+
+    def heartbeat(self, user_id, ttl):
+        pipe = self.client.pipeline()
+        # re-create the counter if it expired while the socket stayed up
+        pipe.set(_conns_key(user_id), 1, nx=True, ex=ttl)
+        pipe.expire(_conns_key(user_id), ttl)
+        pipe.hset(SEEN_KEY, user_id, time.time())
+        pipe.execute()
+
+    def disconnect(self, user_id):
+        """Returns True when that was the user's last connection."""
+        last = self.client.decr(_conns_key(user_id)) <= 0
+        if last:
+            self.client.delete(_conns_key(user_id))
+        self.client.hset(SEEN_KEY, user_id, time.time())
+        return last
+
+    def online(self, user_ids):
+        values = self.client.mget([_conns_key(uid) for uid in user_ids]) if user_ids else []
+        return {uid: bool(v) and int(v) > 0 for uid, v in zip(user_ids, values)}
+
+    def seen(self, user_ids):
+        values = self.client.hmget(SEEN_KEY, user_ids) if user_ids else []
+        return {uid: float(v) for uid, v in zip(user_ids, values) if v is not None}
+
+    def drain_seen(self):
+        batch = f"{SEEN_KEY}:{uuid.uuid4().hex}"
+        try:
+            self.client.rename(SEEN_KEY, batch)
+        except Exception:
+            return {}  # nothing pending
+        seen = self.client.hgetall(batch)
+        self.client.delete(batch)
+        return {int(k): float(v) for k, v in seen.items()}
+
+    def requeue(self, seen):
+        pipe = self.client.pipeline()
+        for uid, ts in seen.items():
+            pipe.hsetnx(SEEN_KEY, uid, ts)  # a newer event wins
+        pipe.execute()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _flush_forever(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        finally:
+            close_old_connections()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            url = getattr(settings, "PRESENCE_STORE_URL", None)
+            _store = RedisPresenceStore(url) if url else LocalPresenceStore()
+            # nobody else can drain a process-local store
+            if not _store.shared and flush_seconds() > 0:
+                threading.Thread(target=_flush_forever, args=(flush_seconds(),), daemon=True).start()
+    return _store
+
+
+def _safe(action, *args):
+    try:
+        return getattr(get_store(), action)(*args)
+    except Exception:
+        logger.exception("Presence store unavailable")
+        return None
+
+
+def connect(user_id):
+    _safe("connect", int(user_id), ttl_seconds())
+
+
+def heartbeat(user_id):
+    _safe("heartbeat", int(user_id), ttl_seconds())
+
+
+def disconnect(user_id):
+    user_id = int(user_id)
+    if _safe("disconnect", user_id):
+        # the last tab closed: write it now rather than after the next flush
+        now = time.time()
+        try:
+            _write_seen({user_id: now}, {user_id: False})
+        except Exception:
+            logger.exception("Presence write failed for user %s", user_id)
+
+
+def _to_datetime(ts):
+    return datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+
+
+def _write_seen(seen, online, batch_size=500):
+    """Bulk-write last_seen / is_online for {user_id: unix time}; returns users updated."""
+    users = [User(id=uid, last_seen=_to_datetime(ts), is_online=online.get(uid, False)) for uid, ts in seen.items()]
+    existing = set(User.objects.filter(id__in=list(seen)).values_list("id", flat=True))
+    users = [u for u in users if u.id in existing]
+    # bulk_update skips save(), so the hot users row is touched once per flush, not per event;
+    # the scoring features take last_seen from it here rather than from the post_save refresh
+    User.objects.bulk_update(users, ["last_seen", "is_online"], batch_size=batch_size)
+    FreelancerFeatures = apps.get_model("recommendations", "FreelancerFeatures")
+    FreelancerFeatures.objects.bulk_update(
+        [FreelancerFeatures(user_id=u.id, last_seen=u.last_seen) for u in users], ["last_seen"], batch_size=batch_size
+    )
+    return len(users)
+
+
+def presence_for(user_ids):
+    """
+    {user_id: {"online": bool, "last_seen": datetime | None}} for many users:
+    one store round trip plus one query for users not seen since the last flush.
+    """
+    ids = list(dict.fromkeys(int(uid) for uid in user_ids))
+    store = get_store()
+    online, seen = store.online(ids), store.seen(ids)
+    missing = [uid for uid in ids if uid not in seen]
+    stored = dict(User.objects.filter(id__in=missing).values_list("id", "last_seen")) if missing else {}
+    return {
+        uid: {
+            "online": online.get(uid, False),
+            "last_seen": _to_datetime(seen[uid]) if uid in seen else stored.get(uid),
+        }
+        for uid in ids
+        if uid in seen or uid in stored
+    }
+
+
+def flush(batch_size=500):
+    """Write pending last_seen / is_online to the users table. Returns users updated."""
+    store = get_store()
+    seen = store.drain_seen()
+    if not seen:
+        return 0
+    try:
+        return _write_seen(seen, store.online(list(seen)), batch_size=batch_size)
+    except Exception:
+        # keep them pending for the next flush
+        store.requeue(seen)
+        logger.exception("Presence flush failed")
+        return 0
@@ -0,0 +1,10 @@
+from celery import shared_task
+
+
+@shared_task
+def flush_presence():
+    """
+    Write buffered presence (last_seen / is_online) to the users table.
+    """
+    from .presence import flush
+    return flush()
@@ -1,3 +1,39 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from .models import User
+from recommendations.models import FreelancerFeatures
+from . import presence
 
-# Create your tests here.
+
+class PresenceTests(TestCase):
+    def setUp(self):
+        presence._store = presence.LocalPresenceStore()
+        self.a = User.objects.create_user(email='a@example.com', full_name='A', password='pass')
+        self.b = User.objects.create_user(email='b@example.com', full_name='B', password='pass', user_type='freelancer')
+
+    def test_presence_is_buffered_and_flushed_in_bulk(self):
+        with self.assertNumQueries(0):
+            presence.connect(self.a.id)
+            presence.connect(self.a.id)
+            presence.heartbeat(self.a.id)
+            presence.connect(self.b.id)
+        self.a.refresh_from_db()
+        self.assertEqual((self.a.is_online, self.a.last_seen), (False, None))
+        # the last tab closing is written straight away
+        presence.disconnect(self.b.id)
+        self.b.refresh_from_db()
+        self.assertTrue(not self.b.is_online and self.b.last_seen)
+        self.assertEqual(FreelancerFeatures.objects.get(user=self.b).last_seen, self.b.last_seen)
+
+        client = APIClient()
+        client.force_authenticate(self.b)
+        res = client.get('/api/accounts/presence/', {'ids': f'{self.a.id},{self.b.id}'})
+        self.assertEqual({r['user_id']: r['online'] for r in res.data['results']}, {self.a.id: True, self.b.id: False})
+
+        # one read to skip deleted users, one bulk UPDATE of users and one of their scoring features
+        with self.assertNumQueries(3):
+            self.assertEqual(presence.flush(), 2)
+        self.a.refresh_from_db()
+        self.assertTrue(self.a.is_online and self.a.last_seen)
+        presence.disconnect(self.a.id)
+        self.assertTrue(presence.presence_for([self.a.id])[self.a.id]['online'])  # second tab still open
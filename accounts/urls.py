@@ -5,7 +5,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .api_views import (
     RegisterView, UserProfileView, GoogleLoginView, LogoutView,
     PasswordChangeView, PasswordResetConfirmView, PasswordResetRequestView,VerifyEmailView
-    ,KYCUploadView,ProfileUpdateView
+    ,KYCUploadView,ProfileUpdateView,PresenceView
 )
 from .import views
 
@@ -34,6 +34,7 @@ urlpatterns = [
     path("google/login/", GoogleLoginView.as_view(), name="google_login"),
     path("kyc/upload/", KYCUploadView.as_view(), name="kyc_upload"),
     path('profile/update/', ProfileUpdateView.as_view(), name='profile-update'),
+    path("presence/", PresenceView.as_view(), name="presence"),
 
     
 ]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
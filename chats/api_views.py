@@ -8,10 +8,12 @@ from django.utils import timezone
 from .models import Conversation, Participant, Message, MessageReceipt, MessageThread
 from .serializers import (
     ConversationSerializer, ConversationCreateSerializer,
-    ParticipantSerializer, MessageSerializer, MessageCreateSerializer, ThreadSerializer
+    ParticipantSerializer, MessageSerializer, MessageCreateSerializer, ThreadSerializer, UserMiniSerializer,
+    InboxEntrySerializer
 )
 from .permissions import IsConversationParticipant
-from . import utils
+from . import utils, receipts
+from jobsalign.pagination import KeysetPagination, OldestFirstKeysetPagination
 
 class ConversationCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
@@ -21,6 +23,25 @@ class ConversationCreateView(generics.CreateAPIView):
         conv = serializer.save()
         return conv
 
+class InboxPagination(KeysetPagination):
+    # most recently active conversation first
+    time_field = "conversation__updated_at"
+
+
+class InboxView(generics.ListAPIView):
+    """
+    GET conversations/?archived=1 -> the caller's conversations with last message and
+    unread count, read from denormalized columns in one query per page.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = InboxEntrySerializer
+    pagination_class = InboxPagination
+
+    def get_queryset(self):
+        archived = self.request.query_params.get('archived') in ('1', 'true')
+        return (Participant.objects.filter(user=self.request.user, conversation__is_archived=archived)
+                .select_related('conversation', 'conversation__last_message', 'conversation__last_message__sender'))
+
 class ConversationDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsConversationParticipant]
     queryset = Conversation.objects.all()
@@ -47,10 +68,10 @@ class MessageCreateView(generics.CreateAPIView):
     @transaction.atomic
     def perform_create(self, serializer):
         msg = serializer.save()
-        # create receipts
-        participants = msg.conversation.participants.exclude(user=msg.sender)
-        receipts = [MessageReceipt(message=msg, user=p.user) for p in participants]
-        MessageReceipt.objects.bulk_create(receipts, ignore_conflicts=True)
+        # per-message receipts only when enabled; read state is a participant watermark
+        if receipts.per_message_receipts():
+            recipients = msg.conversation.participants.exclude(user=msg.sender).values_list('user_id', flat=True)
+            receipts.create_receipts([msg], list(recipients))
         # notify channel layer & background jobs
         utils.notify_message_created(msg)
         return msg
@@ -58,27 +79,56 @@ class MessageCreateView(generics.CreateAPIView):
 class MessageListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsConversationParticipant]
     serializer_class = MessageSerializer
-    pagination_class = None
+    # keyset cursor on (created_at, id), oldest first; `limit` sets the page size
+    pagination_class = OldestFirstKeysetPagination
 
     def get_queryset(self):
         conv_id = self.kwargs.get('conversation_id')
         conv = get_object_or_404(Conversation, id=conv_id)
-        qs = conv.messages.select_related('sender').all().order_by('created_at')
-        # optional: support cursor pagination or limit param
-        limit = int(self.request.query_params.get('limit', 50))
-        offset = int(self.request.query_params.get('offset', 0))
-        return qs[offset:offset+limit]
+        return conv.messages.select_related('sender').all()
+
+class MessageSyncView(generics.GenericAPIView):
+    """GET conversations/<id>/sync/?after=<seq>&limit= -> messages with seq > after, oldest first."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, conversation_id):
+        from .sync import sync_messages
+        if not Participant.objects.filter(conversation_id=conversation_id, user=request.user).exists():
+            return Response({'detail':'Not found.'}, status=404)
+        try:
+            return Response(sync_messages(conversation_id, request.query_params.get('after'), request.query_params.get('limit')))
+        except ValueError as e:
+            return Response({'detail':str(e)}, status=400)
 
 class MarkAsReadView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated, IsConversationParticipant]
 
     def post(self, request, conversation_id):
-        conv = get_object_or_404(Conversation, id=conversation_id)
-        p = conv.participants.get(user=request.user)
-        p.last_read_at = timezone.now()
-        p.save(update_fields=['last_read_at'])
-        MessageReceipt.objects.filter(message__conversation=conv, user=request.user, read_at__isnull=True).update(read_at=timezone.now())
-        return Response({'detail':'ok'})
+        # one UPDATE of the caller's participant row
+        seq = receipts.mark_read(conversation_id, request.user.id)
+        if seq is None:
+            return Response({'detail':'Not found.'}, status=404)
+        return Response({'detail':'ok', 'last_read_seq': seq})
+
+class MarkDeliveredView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsConversationParticipant]
+
+    def post(self, request, conversation_id):
+        seq = receipts.mark_delivered(conversation_id, request.user.id)
+        if seq is None:
+            return Response({'detail':'Not found.'}, status=404)
+        return Response({'detail':'ok', 'last_delivered_seq': seq})
+
+class MessageSeenByView(generics.GenericAPIView):
+    """Per-message read/delivered state, derived from participant watermarks."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, message_id):
+        msg = get_object_or_404(Message, id=message_id)
+        rows = receipts.seen_by(msg)
+        if msg.sender_id != request.user.id and not any(p.user_id == request.user.id for p, _ in rows):
+            return Response({'detail':'Forbidden'}, status=403)
+        return Response([{'user': UserMiniSerializer(p.user).data, 'status': state} for p, state in rows])
 
 class ThreadCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated, IsConversationParticipant]
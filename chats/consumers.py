@@ -1,15 +1,35 @@
+import asyncio
 import json
+import logging
+import time
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .models import Conversation, Participant, Message, MessageReceipt
+from .models import Conversation, Participant, Message
+from .receipts import create_receipts, mark_delivered, mark_read
+from .sync import sync_messages
 from .serializers import MessageSerializer
 from django.contrib.auth import get_user_model
+from accounts import presence
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Sends arriving on one connection within this many ms are written in one
+# transaction (0 writes each send on its own).
+COALESCE_MS = getattr(settings, 'CHAT_SEND_COALESCE_MS', 5)
+# How long a connection trusts its cached participant list; membership
+# changes also refresh it through a participants.changed group event.
+PARTICIPANTS_TTL = getattr(settings, 'CHAT_PARTICIPANTS_CACHE_SECONDS', 60)
+
 
 class ChatConsumer(AsyncJsonWebsocketConsumer):
+    participant_ids = None
+    participants_loaded_at = 0.0
+
     async def connect(self):
         user = self.scope.get('user')
         if not user or not user.is_authenticated:
@@ -23,13 +43,21 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             await self.close()
             return
         await self.channel_layer.group_add(self.group_name, self.channel_name)
-        # presence: mark as online in Redis
+        # presence: TTL store, kept alive by 'heartbeat' actions (no users-table write)
+        await database_sync_to_async(presence.connect)(user.id)
         await self.accept()
         await self.channel_layer.group_send(self.group_name, {'type':'presence.join','user_id':str(user.id)})
 
     async def disconnect(self, code):
+        if not hasattr(self, 'group_name'):
+            return
+        flush_task = getattr(self, '_flush_task', None)
+        if flush_task is not None:
+            # write whatever is buffered or mid-write before the connection goes away
+            await flush_task
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
         user = self.scope.get('user')
+        await database_sync_to_async(presence.disconnect)(user.id)
         await self.channel_layer.group_send(self.group_name, {'type':'presence.leave','user_id':str(user.id)})
 
     async def receive_json(self, content):
@@ -37,47 +65,137 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         user = self.scope.get('user')
         if action == 'send_message':
             data = content.get('data', {})
-            msg = await database_sync_to_async(self._create_message)(user, data)
-            serialized = MessageSerializer(msg).data
-            await self.channel_layer.group_send(self.group_name, {'type':'chat.message','message':serialized})
+            await self._queue_message(user, data)
+        elif action == 'resume':
+            # reconnecting client: everything after the last seq it has
+            page = await database_sync_to_async(sync_messages)(self.conversation_id, content.get('after', 0), content.get('limit'))
+            await self.send_json({'type':'sync', **page})
+        elif action == 'heartbeat':
+            await database_sync_to_async(presence.heartbeat)(user.id)
         elif action == 'typing':
             await self.channel_layer.group_send(self.group_name, {'type':'chat.typing','user_id':str(user.id)})
         elif action == 'mark_read':
-            await database_sync_to_async(self._mark_read)(user)
-
-    def _create_message(self, user, data):
-        conv = Conversation.objects.get(id=self.conversation_id)
-        msg = Message.objects.create(
-            conversation=conv,
-            sender=user,
-            content=data.get('content'),
-            attachments=data.get('attachments', [])
-        )
-        # create receipts for other participants
-        participants = conv.participants.exclude(user=user)
-        for p in participants:
-            MessageReceipt.objects.get_or_create(message=msg, user=p.user)
-        return msg
-
-    def _mark_read(self, user):
-        conv = Conversation.objects.get(id=self.conversation_id)
+            seq = await database_sync_to_async(mark_read)(self.conversation_id, user.id, content.get('upto'))
+            if seq is not None:
+                # clients update "seen by" locally from the reader's new watermark
+                await self.channel_layer.group_send(self.group_name, {'type':'chat.read','user_id':str(user.id),
+                                                                      'read_seq':seq,'read_at':timezone.now().isoformat()})
+        elif action == 'mark_delivered':
+            await database_sync_to_async(mark_delivered)(self.conversation_id, user.id, content.get('upto'))
+
+    async def _is_participant(self):
+        ids = await database_sync_to_async(self._participant_ids)()
+        return self.scope['user'].id in ids
+
+    def _participant_ids(self):
+        # cached per connection; refreshed after PARTICIPANTS_TTL or on participants.changed
+        if self.participant_ids is None or time.monotonic() - self.participants_loaded_at > PARTICIPANTS_TTL:
+            self.participant_ids = set(
+                Participant.objects.filter(conversation_id=self.conversation_id).values_list('user_id', flat=True)
+            )
+            self.participants_loaded_at = time.monotonic()
+        return self.participant_ids
+
+    async def _queue_message(self, user, data):
+        # timestamp on arrival so a coalesced batch keeps send order
+        item = (data, timezone.now())
+        if COALESCE_MS <= 0:
+            await self._flush([item])
+            return
+        if not hasattr(self, '_pending'):
+            self._pending = []
+            self._flush_task = None
+        self._pending.append(item)
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        # the task stays referenced until its write is done (disconnect awaits
+        # it); sends arriving meanwhile go out in the next round
         try:
-            p = conv.participants.get(user=user)
-            p.last_read_at = timezone.now()
-            p.save(update_fields=['last_read_at'])
-        except Participant.DoesNotExist:
-            pass
-        MessageReceipt.objects.filter(message__conversation=conv, user=user, read_at__isnull=True).update(read_at=timezone.now())
+            while self._pending:
+                await asyncio.sleep(COALESCE_MS / 1000)
+                batch, self._pending = self._pending, []
+                await self._flush(batch)
+        finally:
+            self._flush_task = None
+
+    async def _flush(self, batch):
+        user = self.scope.get('user')
+        try:
+            serialized = await database_sync_to_async(self._create_messages)(user, batch)
+        except Exception:
+            logger.exception("Saving %s message(s) from user %s in %s failed", len(batch), user.id, self.conversation_id)
+            await self._send_error('Message could not be saved, please resend', len(batch))
+            return
+        if serialized is None:
+            logger.warning("Rejected %s message(s) from non-participant %s in %s", len(batch), user.id, self.conversation_id)
+            await self._send_error('You are not a participant of this conversation', len(batch))
+            return
+        for message in serialized:
+            await self.channel_layer.group_send(self.group_name, {'type':'chat.message','message':message})
+
+    async def _send_error(self, detail, count):
+        try:
+            await self.send_json({'type':'error','action':'send_message','detail':detail,'count':count})
+        except Exception:
+            pass  # socket already gone
+
+    def _create_messages(self, user, batch):
+        """
+        Write a batch of sends in one transaction: one seq allocation, one
+        INSERT for the messages and one sender watermark update, however many
+        participants the chat has (plus one INSERT of receipts when
+        CHAT_PER_MESSAGE_RECEIPTS is on). Notifications go out after commit.
+        Returns the serialized messages, or None when the sender is not a
+        participant.
+        """
+        participant_ids = self._participant_ids()
+        if user.id not in participant_ids:
+            return None
+        recipients = [uid for uid in participant_ids if uid != user.id]
+        messages = [
+            Message(conversation_id=self.conversation_id, sender=user, content=data.get('content'),
+                    attachments=data.get('attachments', []), created_at=created_at)
+            for data, created_at in batch
+        ]
+        with transaction.atomic():
+            # one seq range for the batch; also touches the conversation
+            first = Conversation.allocate_seq(self.conversation_id, len(messages), last_message=messages[-1])
+            for i, m in enumerate(messages):
+                m.seq = first + i
+            Message.objects.bulk_create(messages)
+            Participant.mark_sent(self.conversation_id, user.id, messages[-1].seq)
+            create_receipts(messages, recipients)
+        # bulk_create skips post_save, so send the notifications the signals would have
+        transaction.on_commit(lambda: self._notify_sent(messages))
+        return [MessageSerializer(m).data for m in messages]
+
+    def _notify_sent(self, messages):
+        from notifications.utils import notify_new_messages
+        from .utils import enqueue_message_notifications
+        enqueue_message_notifications([m.id for m in messages])
+        try:
+            notify_new_messages(messages)
+        except Exception:
+            logger.exception("In-app notifications for %s message(s) in %s failed", len(messages), self.conversation_id)
 
     # group handlers
     async def chat_message(self, event):
         await self.send_json({'type':'message','message': event['message']})
 
+    async def chat_read(self, event):
+        await self.send_json({'type':'read','user_id': event.get('user_id'),'read_seq': event.get('read_seq'),
+                              'read_at': event.get('read_at')})
+
     async def chat_typing(self, event):
         await self.send_json({'type':'typing','user_id': event.get('user_id')})
 
     async def presence_join(self, event):
         await self.send_json({'type':'presence','action':'join','user_id': event.get('user_id')})
 
+    async def participants_changed(self, event):
+        self.participant_ids = None
+
     async def presence_leave(self, event):
         await self.send_json({'type':'presence','action':'leave','user_id': event.get('user_id')})
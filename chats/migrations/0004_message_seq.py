@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def number_existing_messages(apps, schema_editor):
+    Conversation = apps.get_model('chats', 'Conversation')
+    Message = apps.get_model('chats', 'Message')
+    for conv_id in Conversation.objects.values_list('id', flat=True).iterator():
+        batch, seq = [], 0
+        for msg in Message.objects.filter(conversation_id=conv_id).order_by('created_at', 'id').only('id').iterator():
+            seq += 1
+            msg.seq = seq
+            batch.append(msg)
+        Message.objects.bulk_update(batch, ['seq'], batch_size=1000)
+        Conversation.objects.filter(id=conv_id).update(last_seq=seq)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0003_participant_delivered_watermark'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='seq',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(number_existing_messages, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='message',
+            constraint=models.UniqueConstraint(fields=('conversation', 'seq'), name='chats_message_conversation_seq'),
+        ),
+    ]
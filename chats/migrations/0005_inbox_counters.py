@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_inbox(apps, schema_editor):
+    Conversation = apps.get_model('chats', 'Conversation')
+    Message = apps.get_model('chats', 'Message')
+    for conv in Conversation.objects.only('id').iterator():
+        last = Message.objects.filter(conversation_id=conv.id).order_by('-seq').only('id', 'created_at').first()
+        if last:
+            Conversation.objects.filter(id=conv.id).update(last_message_id=last.id, last_message_at=last.created_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0004_message_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chats.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_watermarks(apps, schema_editor):
+    # the highest seq at or before each timestamp watermark
+    Participant = apps.get_model('chats', 'Participant')
+    Message = apps.get_model('chats', 'Message')
+    for seq_field, at_field in (('last_read_seq', 'last_read_at'), ('last_delivered_seq', 'last_delivered_at')):
+        upto = (Message.objects.filter(conversation_id=OuterRef('conversation_id'), created_at__lte=OuterRef(at_field))
+                .order_by('-seq').values('seq')[:1])
+        Participant.objects.filter(**{f'{at_field}__isnull': False}).update(
+            **{seq_field: Coalesce(Subquery(upto), Value(0))})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0005_inbox_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participant',
+            name='last_delivered_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='last_read_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_watermarks, migrations.RunPython.noop),
+    ]
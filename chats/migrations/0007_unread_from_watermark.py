@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:08
+
+from django.db import migrations
+from django.db.models import Max
+
+
+def own_messages_are_read(apps, schema_editor):
+    # unread is now last_seq - last_read_seq, so move each reader past their own messages
+    Participant = apps.get_model('chats', 'Participant')
+    Message = apps.get_model('chats', 'Message')
+    latest = (Message.objects.filter(sender__isnull=False).values('conversation_id', 'sender_id')
+              .annotate(seq=Max('seq')).order_by())
+    for row in latest.iterator():
+        Participant.objects.filter(conversation_id=row['conversation_id'], user_id=row['sender_id'],
+                                   last_read_seq__lt=row['seq']).update(last_read_seq=row['seq'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0006_participant_seq_watermarks'),
+    ]
+
+    operations = [
+        migrations.RunPython(own_messages_are_read, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.utils import timezone
 import uuid
@@ -11,6 +13,10 @@ class Conversation(models.Model):
     is_group = models.BooleanField(default=False)
     created_by = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, related_name='created_conversations')
     is_archived = models.BooleanField(default=False)  # for soft-archive
+    last_seq = models.PositiveBigIntegerField(default=0)  # highest Message.seq handed out
+    # inbox denormalization, maintained with the insert (see allocate_seq)
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -20,11 +26,31 @@ class Conversation(models.Model):
     def __str__(self):
         return self.title or f"Conversation {self.id}"
 
+    @classmethod
+    def allocate_seq(cls, conversation_id, count=1, last_message=None):
+        """
+        Reserve `count` consecutive message sequence numbers; returns the first.
+        Call inside the transaction that inserts the messages: the UPDATE
+        holds the conversation row until commit, so numbers never repeat or
+        interleave. Also bumps updated_at for the inbox ordering and, when
+        given, records last_message (ids are generated client side, so this
+        can run before the INSERT; the FK is checked at commit).
+        """
+        fields = {'last_seq': F('last_seq') + count, 'updated_at': timezone.now()}
+        if last_message is not None:
+            fields.update(last_message_id=last_message.pk, last_message_at=last_message.created_at)
+        cls.objects.filter(pk=conversation_id).update(**fields)
+        return cls.objects.filter(pk=conversation_id).values_list('last_seq', flat=True).get() - count + 1
+
 
 class Participant(models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='participants')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversations')
     joined_at = models.DateTimeField(default=timezone.now)
+    # receipt watermarks (highest Message.seq delivered / read), see chats.receipts
+    last_delivered_seq = models.PositiveBigIntegerField(default=0)
+    last_read_seq = models.PositiveBigIntegerField(default=0)
+    last_delivered_at = models.DateTimeField(blank=True, null=True)
     last_read_at = models.DateTimeField(blank=True, null=True)
     muted = models.BooleanField(default=False)
     is_admin = models.BooleanField(default=False)
@@ -32,6 +58,19 @@ class Participant(models.Model):
     class Meta:
         unique_together = ('conversation', 'user')
 
+    @property
+    def unread_count(self):
+        # messages past the read watermark; senders read their own on send
+        return max(0, self.conversation.last_seq - self.last_read_seq)
+
+    @classmethod
+    def mark_sent(cls, conversation_id, sender_id, seq):
+        """The sender has read the conversation up to their own message at `seq`."""
+        return cls.objects.filter(conversation_id=conversation_id, user_id=sender_id).update(
+            last_read_seq=Greatest(F('last_read_seq'), Value(seq)),
+            last_delivered_seq=Greatest(F('last_delivered_seq'), Value(seq)),
+        )
+
 
 class MessageThread(models.Model):
     """Optional: messages can belong to a thread within a conversation"""
@@ -55,11 +94,22 @@ class Message(models.Model):
     edit_log = models.JSONField(default=list, blank=True)  # store previous_content/time/editor
     pinned = models.BooleanField(default=False)
     reactions = models.JSONField(default=dict, blank=True)  # {"emoji": [user_id,...]}
+    seq = models.PositiveBigIntegerField(blank=True, null=True)  # per-conversation, gap free, set on insert
 
     class Meta:
-        indexes = [models.Index(fields=['conversation', 'created_at']),]
+        indexes = [models.Index(fields=['conversation', 'created_at', 'id']),]
+        constraints = [models.UniqueConstraint(fields=['conversation', 'seq'], name='chats_message_conversation_seq')]
         ordering = ['created_at']
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.seq is None:
+            with transaction.atomic():
+                self.seq = Conversation.allocate_seq(self.conversation_id, last_message=self)
+                super().save(*args, **kwargs)
+                Participant.mark_sent(self.conversation_id, self.sender_id, self.seq)
+                return
+        return super().save(*args, **kwargs)
+
     def add_reaction(self, emoji, user_id):
         arr = self.reactions.get(emoji, [])
         if user_id not in arr:
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from .models import Conversation, Participant, MessageReceipt
+
+# Read/delivered state as per-participant watermarks.
+# Participant.last_delivered_seq / last_read_seq say "everything up to this
+# Message.seq"; a message counts as read by p when message.seq <= p.last_read_seq.
+# Seqs are handed out inside the inserting transaction, so a watermark taken
+# from Conversation.last_seq never covers a message that is not committed yet
+# (arrival timestamps could: a coalesced batch commits after later reads).
+# Marking read is one UPDATE of one row and no per-message rows are written,
+# so storage and cost are O(participants). "Seen by" for a message is worked
+# out on request from the participant rows. last_*_at record when.
+# MessageReceipt rows are still written alongside while
+# CHAT_PER_MESSAGE_RECEIPTS is on (the default); turning it off drops them.
+
+
+def per_message_receipts():
+    return getattr(settings, 'CHAT_PER_MESSAGE_RECEIPTS', True)
+
+
+def create_receipts(messages, recipient_ids):
+    if not per_message_receipts():
+        return
+    MessageReceipt.objects.bulk_create(
+        [MessageReceipt(message=m, user_id=uid) for m in messages for uid in recipient_ids],
+        ignore_conflicts=True,
+    )
+
+
+def _upto(conversation_id, upto):
+    # never past the last committed seq; None when the conversation is gone
+    last_seq = Conversation.objects.filter(pk=conversation_id).values_list('last_seq', flat=True).first()
+    if last_seq is None:
+        return None
+    try:
+        return min(int(upto), last_seq) if upto is not None else last_seq
+    except (TypeError, ValueError):
+        return last_seq
+
+
+def mark_delivered(conversation_id, user_id, upto=None):
+    """
+    Advance the delivered watermark to seq `upto` (default: the latest
+    message). Returns the seq applied, or None if user_id is not a participant.
+    """
+    upto = _upto(conversation_id, upto)
+    if upto is None:
+        return None
+    updated = Participant.objects.filter(conversation_id=conversation_id, user_id=user_id).update(
+        last_delivered_seq=Greatest(F('last_delivered_seq'), Value(upto)),
+        last_delivered_at=timezone.now(),
+    )
+    return upto if updated else None
+
+
+def mark_read(conversation_id, user_id, upto=None):
+    """
+    Read implies delivered; the inbox unread_count (last_seq - last_read_seq)
+    follows. Returns the seq applied, or None if user_id is not a participant.
+    """
+    upto = _upto(conversation_id, upto)
+    if upto is None:
+        return None
+    now = timezone.now()
+    updated = Participant.objects.filter(conversation_id=conversation_id, user_id=user_id).update(
+        last_read_seq=Greatest(F('last_read_seq'), Value(upto)),
+        last_delivered_seq=Greatest(F('last_delivered_seq'), Value(upto)),
+        last_read_at=now,
+        last_delivered_at=now,
+    )
+    if not updated:
+        return None
+    if per_message_receipts():
+        MessageReceipt.objects.filter(message__conversation_id=conversation_id, user_id=user_id,
+                                      read_at__isnull=True, message__seq__lte=upto).update(read_at=now)
+    return upto
+
+
+def seen_by(message):
+    """[(participant, 'read' | 'delivered' | 'sent')] for everyone but the sender, one query."""
+    rows = []
+    participants = (Participant.objects.filter(conversation_id=message.conversation_id)
+                    .exclude(user_id=message.sender_id).select_related('user').order_by('id'))
+    for p in participants:
+        if message.seq and p.last_read_seq >= message.seq:
+            state = 'read'
+        elif message.seq and p.last_delivered_seq >= message.seq:
+            state = 'delivered'
+        else:
+            state = 'sent'
+        rows.append((p, state))
+    return rows
@@ -13,14 +13,15 @@ class ParticipantSerializer(serializers.ModelSerializer):
     user = UserMiniSerializer(read_only=True)
     class Meta:
         model = Participant
-        fields = ('id','user','joined_at','last_read_at','muted','is_admin')
+        fields = ('id','user','joined_at','last_delivered_seq','last_read_seq','last_delivered_at','last_read_at',
+                  'unread_count','muted','is_admin')
 
 class ConversationSerializer(serializers.ModelSerializer):
     participants = ParticipantSerializer(many=True, read_only=True)
     class Meta:
         model = Conversation
-        fields = ('id','title','is_group','created_by','is_archived','created_at','updated_at','participants')
-        read_only_fields = ('created_at','updated_at','created_by')
+        fields = ('id','title','is_group','created_by','is_archived','last_seq','created_at','updated_at','participants')
+        read_only_fields = ('created_at','updated_at','created_by','last_seq')
 
 class ConversationCreateSerializer(serializers.ModelSerializer):
     participant_ids = serializers.ListField(child=serializers.UUIDField(), write_only=True, required=False)
@@ -43,10 +44,14 @@ class ConversationCreateSerializer(serializers.ModelSerializer):
 
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserMiniSerializer(read_only=True)
+    # string ids so the data can go straight onto the channel layer / send_json
+    conversation = serializers.PrimaryKeyRelatedField(queryset=Conversation.objects.all(), pk_field=serializers.UUIDField())
+    thread = serializers.PrimaryKeyRelatedField(queryset=MessageThread.objects.all(), pk_field=serializers.UUIDField(),
+                                                required=False, allow_null=True)
     class Meta:
         model = Message
-        fields = ('id','conversation','thread','sender','content','attachments','created_at','edited_at','is_deleted','pinned','reactions')
-        read_only_fields = ('id','sender','created_at','edited_at','reactions')
+        fields = ('id','seq','conversation','thread','sender','content','attachments','created_at','edited_at','is_deleted','pinned','reactions')
+        read_only_fields = ('id','seq','sender','created_at','edited_at','reactions')
 
 class MessageCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -65,6 +70,27 @@ class MessageCreateSerializer(serializers.ModelSerializer):
         msg = Message.objects.create(sender=user, **validated_data)
         return msg
 
+class InboxMessageSerializer(serializers.ModelSerializer):
+    sender = UserMiniSerializer(read_only=True)
+    class Meta:
+        model = Message
+        fields = ('id','seq','sender','content','attachments','created_at','is_deleted')
+
+class InboxEntrySerializer(serializers.ModelSerializer):
+    """One inbox row: the caller's Participant joined to its conversation."""
+    id = serializers.UUIDField(source='conversation.id', read_only=True)
+    title = serializers.CharField(source='conversation.title', read_only=True)
+    is_group = serializers.BooleanField(source='conversation.is_group', read_only=True)
+    is_archived = serializers.BooleanField(source='conversation.is_archived', read_only=True)
+    last_seq = serializers.IntegerField(source='conversation.last_seq', read_only=True)
+    last_message = InboxMessageSerializer(source='conversation.last_message', read_only=True)
+    last_message_at = serializers.DateTimeField(source='conversation.last_message_at', read_only=True)
+    updated_at = serializers.DateTimeField(source='conversation.updated_at', read_only=True)
+    class Meta:
+        model = Participant
+        fields = ('id','title','is_group','is_archived','last_seq','last_message','last_message_at','updated_at',
+                  'unread_count','last_read_seq','last_read_at','muted')
+
 class ThreadSerializer(serializers.ModelSerializer):
     class Meta:
         model = MessageThread
@@ -1,7 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Message
-from .utils import notify_message_created
+from .models import Message, Participant
+from .utils import notify_message_created, notify_participants_changed
 
 @receiver(post_save, sender=Message)
 def on_message_created(sender, instance, created, **kwargs):
@@ -10,3 +10,9 @@ def on_message_created(sender, instance, created, **kwargs):
             notify_message_created(instance)
         except Exception:
             pass
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def on_participants_changed(sender, instance, **kwargs):
+    # open chat sockets drop their cached participant lists
+    notify_participants_changed(instance.conversation_id)
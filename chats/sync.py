@@ -0,0 +1,28 @@
+from .models import Conversation, Message
+from .serializers import MessageSerializer
+
+# Delta sync on Message.seq: a client that holds everything up to seq N asks
+# for seq > N and gets only what it missed, over the (conversation, seq)
+# unique index. Used by the sync endpoint and the socket 'resume' action.
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+
+def sync_messages(conversation_id, after=0, limit=None):
+    """{"messages": [...], "last_seq": n, "has_more": bool} for seq > after."""
+    try:
+        after = max(int(after or 0), 0)
+        limit = min(max(int(limit or DEFAULT_LIMIT), 1), MAX_LIMIT)
+    except (TypeError, ValueError):
+        raise ValueError("after and limit must be integers")
+    last_seq = Conversation.objects.filter(pk=conversation_id).values_list('last_seq', flat=True).first() or 0
+    rows = list(
+        Message.objects.filter(conversation_id=conversation_id, seq__gt=after)
+        .select_related('sender').order_by('seq')[:limit + 1]
+    )
+    return {
+        'messages': MessageSerializer(rows[:limit], many=True).data,
+        'last_seq': last_seq,
+        'has_more': len(rows) > limit,
+    }
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from .models import Conversation, Message
@@ -21,3 +21,152 @@ class ChatsBasicTests(TestCase):
         self.assertIn(resp2.status_code, (200,201))
         msgs = Message.objects.filter(conversation_id=conv_id)
         self.assertTrue(msgs.exists())
+
+
+class ChatConsumerSendTests(TestCase):
+    def setUp(self):
+        from .models import Participant
+        self.sender = User.objects.create_user(email='s@example.com', full_name='S', password='pass')
+        self.conv = Conversation.objects.create(is_group=True, created_by=self.sender)
+        Participant.objects.create(conversation=self.conv, user=self.sender)
+        for i in range(5):
+            u = User.objects.create_user(email=f'm{i}@example.com', full_name=f'M{i}', password='pass')
+            Participant.objects.create(conversation=self.conv, user=u)
+
+    @override_settings(CHAT_PER_MESSAGE_RECEIPTS=False)
+    def test_batch_of_sends_costs_constant_queries(self):
+        from django.utils import timezone
+        from .consumers import ChatConsumer
+        from .models import MessageReceipt
+        consumer = ChatConsumer()
+        consumer.conversation_id = str(self.conv.id)
+        batch = [({'content': f'hi {i}'}, timezone.now()) for i in range(3)]
+        # participants (cached afterwards) + seq allocation (update, read back) + messages + sender watermark,
+        # inside one savepoint
+        with self.assertNumQueries(7):
+            data = consumer._create_messages(self.sender, batch)
+        self.assertEqual([m['content'] for m in data], ['hi 0', 'hi 1', 'hi 2'])
+        self.assertEqual(data[0]['conversation'], str(self.conv.id))
+        self.assertFalse(MessageReceipt.objects.exists())
+        self.assertEqual([m['seq'] for m in data], [1, 2, 3])
+        with self.assertNumQueries(6):
+            consumer._create_messages(self.sender, [({'content': 'again'}, timezone.now())])
+
+    def test_message_receipts_are_kept_by_default(self):
+        from django.utils import timezone
+        from .consumers import ChatConsumer
+        from .models import MessageReceipt
+        from .receipts import mark_read
+        consumer = ChatConsumer()
+        consumer.conversation_id = str(self.conv.id)
+        consumer._create_messages(self.sender, [({'content': 'hi'}, timezone.now())])
+        self.assertEqual(MessageReceipt.objects.count(), 5)
+        reader = MessageReceipt.objects.first().user_id
+        mark_read(self.conv.id, reader)
+        self.assertEqual(set(MessageReceipt.objects.filter(read_at__isnull=False).values_list('user_id', flat=True)), {reader})
+
+    def test_socket_sends_create_in_app_notifications(self):
+        from django.utils import timezone
+        from notifications.models import Notification
+        from .consumers import ChatConsumer
+        consumer = ChatConsumer()
+        consumer.conversation_id = str(self.conv.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            data = consumer._create_messages(self.sender, [({'content': 'hi'}, timezone.now())])
+        notes = Notification.objects.filter(verb='new_message')
+        members = self.conv.participants.exclude(user=self.sender).values_list('user_id', flat=True)
+        self.assertEqual(sorted(n.user_id for n in notes), sorted(members))
+        self.assertEqual({n.data['message_id'] for n in notes}, {str(data[0]['id'])})
+
+    def test_failed_or_rejected_sends_get_an_error_frame(self):
+        import asyncio
+        from .consumers import ChatConsumer
+        consumer = ChatConsumer()
+        consumer.conversation_id = str(self.conv.id)
+        consumer.scope = {'user': self.sender}
+        sent = []
+
+        async def send_json(content):
+            sent.append(content)
+
+        def broken(user, batch):
+            raise RuntimeError('database unavailable')
+
+        async def send_one():
+            await consumer._queue_message(self.sender, {'content': 'hi'})
+            # still referenced while the write runs, so disconnect can await it
+            self.assertIsNotNone(consumer._flush_task)
+            await consumer._flush_task
+
+        consumer.send_json = send_json
+        with self.assertLogs('chats.consumers', level='WARNING') as logs:
+            consumer._create_messages = broken
+            asyncio.run(send_one())
+            consumer._create_messages = lambda user, batch: None
+            asyncio.run(send_one())
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual([(f['type'], f['count']) for f in sent], [('error', 1), ('error', 1)])
+        self.assertIsNone(consumer._flush_task)
+
+    def test_read_state_is_a_participant_watermark(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from rest_framework.test import APIClient
+        from .receipts import mark_delivered, seen_by
+        reader, other = [p.user for p in self.conv.participants.exclude(user=self.sender).order_by('id')[:2]]
+        old = Message.objects.create(conversation=self.conv, sender=self.sender, content='old',
+                                     created_at=timezone.now() - timedelta(minutes=1))
+        client = APIClient()
+        client.force_authenticate(reader)
+        self.assertEqual(client.post(reverse('mark-read', args=[self.conv.id])).status_code, 200)
+        mark_delivered(self.conv.id, other.id)
+        # stamped before the mark-read but committed after it, like a coalesced batch
+        new = Message.objects.create(conversation=self.conv, sender=self.sender, content='new',
+                                     created_at=timezone.now() - timedelta(minutes=2))
+
+        states = {p.user_id: state for p, state in seen_by(old)}
+        self.assertEqual((states[reader.id], states[other.id], len(states)), ('read', 'delivered', 5))
+        self.assertEqual({state for _, state in seen_by(new)}, {'sent'})
+        res = client.get(reverse('message-seen-by', args=[old.id]))
+        self.assertEqual([r['status'] for r in res.data].count('read'), 1)
+
+    def test_sync_returns_only_messages_after_seq(self):
+        from rest_framework.test import APIClient
+        from django.utils import timezone
+        from .consumers import ChatConsumer
+        from .sync import sync_messages
+        consumer = ChatConsumer()
+        consumer.conversation_id = str(self.conv.id)
+        consumer._create_messages(self.sender, [({'content': f'm{i}'}, timezone.now()) for i in range(4)])
+        self.conv.refresh_from_db()
+        self.assertEqual(self.conv.last_seq, 4)
+        page = sync_messages(self.conv.id, after=1, limit=2)
+        self.assertEqual(([m['seq'] for m in page['messages']], page['has_more']), ([2, 3], True))
+        client = APIClient()
+        client.force_authenticate(self.sender)
+        res = client.get(reverse('message-sync', args=[self.conv.id]), {'after': 3})
+        self.assertEqual(([m['content'] for m in res.data['messages']], res.data['last_seq']), (['m3'], 4))
+
+    def test_inbox_reads_derived_counters(self):
+        from django.utils import timezone
+        from rest_framework.test import APIClient
+        from .consumers import ChatConsumer
+        quiet = Conversation.objects.create(created_by=self.sender)
+        quiet.participants.create(user=self.sender)
+        consumer = ChatConsumer()
+        consumer.conversation_id = str(self.conv.id)
+        consumer._create_messages(self.sender, [({'content': f'm{i}'}, timezone.now()) for i in range(3)])
+
+        member = self.conv.participants.exclude(user=self.sender).first().user
+        client = APIClient()
+        client.force_authenticate(member)
+        with self.assertNumQueries(1):
+            rows = client.get(reverse('inbox')).data['results']
+        self.assertEqual((rows[0]['unread_count'], rows[0]['last_message']['content']), (3, 'm2'))
+        client.post(reverse('mark-read', args=[self.conv.id]))
+        self.assertEqual(client.get(reverse('inbox')).data['results'][0]['unread_count'], 0)
+        # unread is last_seq - last_read_seq, and sending moves the sender's watermark
+        client.force_authenticate(self.sender)
+        self.assertEqual(client.get(reverse('inbox')).data['results'][0]['unread_count'], 0)
+        rows = client.get(reverse('inbox')).data['results']
+        self.assertEqual([r['id'] for r in rows], [str(self.conv.id), str(quiet.id)])
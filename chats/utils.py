@@ -14,9 +14,20 @@ def notify_message_created(message):
     except Exception:
         pass
     # enqueue background notifications
+    enqueue_message_notifications([message.id])
+
+def enqueue_message_notifications(message_ids):
     try:
         from .tasks import send_message_notifications
-        send_message_notifications.delay(str(message.id))
+        for message_id in message_ids:
+            send_message_notifications.delay(str(message_id))
+    except Exception:
+        pass
+
+def notify_participants_changed(conversation_id):
+    try:
+        group = f'chat_{conversation_id}'
+        async_to_sync(channel_layer.group_send)(group, {'type':'participants.changed'})
     except Exception:
         pass
 
@@ -42,11 +42,13 @@ def create_dispute_chat(dispute):
     Create or link a chat conversation for dispute discussion for audit.
     """
     try:
-        from chats.utils import create_conversation_for_contract
+        from marketplace.utils import create_conversation_for_contract
+        from chats.models import Message
         conv = create_conversation_for_contract(dispute.contract)  # this returns existing conv or new
+        if conv is None:
+            return None
         # Post a system message into the conversation
-        from chats import utils as chats_utils
-        chats_utils.post_system_message(conv, f"Dispute opened: {dispute.reason}")
+        Message.objects.create(conversation=conv, sender=None, content=f"Dispute opened: {dispute.reason}")
         return conv
     except Exception:
         return None
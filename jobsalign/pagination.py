@@ -0,0 +1,131 @@
+import base64
+import json
+from collections import OrderedDict
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination on (created_at, id).
+
+    Each page is a WHERE (created_at, id) < (last_created_at, last_id) query
+    over an index, so page 1000 costs the same as page 1 (no OFFSET scans),
+    and rows inserted while scrolling never shift or duplicate results.
+    Cursors are opaque base64 tokens; responses look like DRF's
+    CursorPagination: {"next": url, "previous": url, "results": [...]}.
+
+    Views pick the direction with `ordering` ("-created_at" newest first,
+    "created_at" oldest first). Subclasses may seek on another timestamp,
+    including one across a relation ("conversation__updated_at").
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = "-created_at"
+    time_field = "created_at"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.descending = self.ordering.startswith("-")
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+        # walking backwards flips both the comparison and the sort
+        forward_desc = self.descending != reverse
+
+        t = self.time_field
+        if cursor:
+            if forward_desc:
+                seek = Q(**{f"{t}__lt": cursor["t"]}) | Q(**{t: cursor["t"], "id__lt": cursor["i"]})
+            else:
+                seek = Q(**{f"{t}__gt": cursor["t"]}) | Q(**{t: cursor["t"], "id__gt": cursor["i"]})
+            queryset = queryset.filter(seek)
+        order = (f"-{t}", "-id") if forward_desc else (t, "id")
+        rows = list(queryset.order_by(*order)[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+        self.page = rows
+        self.has_next = has_more if not reverse else True
+        self.has_previous = bool(cursor) if not reverse else has_more
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            created_at = parse_datetime(data["t"])
+            if created_at is None:
+                raise ValueError
+            return {"t": created_at, "i": data["i"], "r": bool(data.get("r"))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def row_time(self, row):
+        for attr in self.time_field.split("__"):
+            row = getattr(row, attr)
+        return row
+
+    def encode_cursor(self, row, reverse=False):
+        data = {"t": self.row_time(row).isoformat(), "i": str(row.pk)}
+        if reverse:
+            data["r"] = 1
+        token = base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class OldestFirstKeysetPagination(KeysetPagination):
+    """Chronological variant for chat history; keeps the old `limit` parameter."""
+    ordering = "created_at"
+    page_size = 50
+    page_size_query_param = "limit"
@@ -295,6 +295,77 @@ FRONTEND_URL = "https://jobsalign.com"
 CELERY_BROKER_URL = "redis://localhost:6379/0"
 CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
 
+from celery.schedules import crontab
+
+CELERY_BEAT_SCHEDULE = {
+    "precompute-project-recommendations": {
+        "task": "recommendations.tasks.precompute_all_project_recommendations",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "rebuild-freelancer-features": {
+        "task": "recommendations.tasks.rebuild_freelancer_features",
+        "schedule": crontab(hour=1, minute=45),
+    },
+    "compact-recommendation-history": {
+        "task": "recommendations.tasks.compact_recommendation_history",
+        "schedule": crontab(hour=1, minute=30),
+    },
+    "flush-project-views": {
+        "task": "marketplace.tasks.flush_project_views",
+        "schedule": 5.0,
+    },
+    "update-embedding-index": {
+        "task": "recommendations.tasks.update_embedding_index",
+        "schedule": crontab(minute="*/15"),
+    },
+    "flush-presence": {
+        "task": "accounts.tasks.flush_presence",
+        "schedule": 30.0,
+    },
+    "purge-expired-uploads": {
+        "task": "marketplace.tasks.purge_expired_uploads",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "repair-bid-stats": {
+        "task": "marketplace.tasks.repair_bid_stats",
+        "schedule": crontab(minute=20),
+    },
+}
+RECOMMENDATIONS_PRECOMPUTE_WORKERS = 4
+RECOMMENDATIONS_KEEP_SNAPSHOTS = 3
+RECOMMENDATIONS_ARCHIVE_DIR = BASE_DIR / 'archives' / 'recommendations'
+RECOMMENDATIONS_EMBEDDING_DIR = BASE_DIR / 'archives' / 'embeddings'
+
+# Project view counter: shared Redis buffer drained by beat (the broker by default);
+# set it empty for a process-local buffer flushed every PROJECT_VIEW_FLUSH_SECONDS
+PROJECT_VIEW_BUFFER_URL = config("PROJECT_VIEW_BUFFER_URL", default=CELERY_BROKER_URL)
+PROJECT_VIEW_FLUSH_SECONDS = 5
+PROJECT_VIEW_DEDUPE_SECONDS = 30 * 60
+# Reverse proxies in front of the app that append to X-Forwarded-For; 0 trusts
+# only REMOTE_ADDR for anonymous viewers.
+TRUSTED_PROXY_COUNT = config("TRUSTED_PROXY_COUNT", default=0, cast=int)
+SUGGESTED_BID_COALESCE_SECONDS = 10
+
+# Presence: shared Redis TTL store drained by beat (the broker by default); set it
+# empty for a process-local store flushed every PRESENCE_FLUSH_SECONDS.
+# Sockets heartbeat more often than the TTL; last_seen is flushed in batches.
+PRESENCE_STORE_URL = config("PRESENCE_STORE_URL", default=CELERY_BROKER_URL)
+PRESENCE_TTL_SECONDS = 60
+PRESENCE_FLUSH_SECONDS = 30
+
+# Chat sockets: sends within this window share one transaction (0 = off)
+CHAT_SEND_COALESCE_MS = 5
+CHAT_PARTICIPANTS_CACHE_SECONDS = 60
+# Read/delivered state lives in Participant watermarks; True also keeps writing MessageReceipt
+# rows. Leave it on until nothing reads them any more (the admin still lists them).
+CHAT_PER_MESSAGE_RECEIPTS = True
+
+# Chunked uploads: parts are staged here until complete, then stored by SHA-256
+CHUNKED_UPLOAD_DIR = BASE_DIR / 'archives' / 'uploads'
+CHUNKED_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+CHUNKED_UPLOAD_EXPIRE_HOURS = 24
+
 
 # DEFAULT_FROM_EMAIL = 'noreply@jobsalign.com'
 
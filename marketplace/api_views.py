@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from django.apps import apps
+from django.conf import settings
 from .models import Project, Bid, Contract, Milestone, Skill
 from .serializers import (
     ProjectSerializer, ProjectCreateSerializer,
@@ -19,6 +20,8 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from jobsalign.pagination import KeysetPagination
 
 
 class ProjectCreateView(APIView):
@@ -54,6 +57,86 @@ class ProjectRetrieveUpdateView(generics.RetrieveUpdateAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [IsOwnerOrReadOnly]
 
+    def retrieve(self, request, *args, **kwargs):
+        project = self.get_object()
+        if project.owner_id != request.user.id:
+            # buffered + deduplicated; never writes the project row here
+            from .view_counter import record_view
+            record_view(project.id, viewer_key(request))
+        return Response(self.get_serializer(project).data)
+
+
+def viewer_key(request):
+    if request.user.is_authenticated:
+        return f"u{request.user.id}"
+    return "ip" + client_ip(request)
+
+
+def client_ip(request):
+    """
+    REMOTE_ADDR, or with TRUSTED_PROXY_COUNT proxies in front the address the
+    outermost trusted proxy saw; hops further left are client-supplied.
+    """
+    proxies = getattr(settings, "TRUSTED_PROXY_COUNT", 0)
+    hops = [h.strip() for h in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if h.strip()]
+    if proxies and len(hops) >= proxies:
+        return hops[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+class TrendingProjectsView(generics.ListAPIView):
+    """GET /projects/trending/?days=7&featured=1 — open projects by recent views, as project cards."""
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+    filter_backends = []
+
+    def get_queryset(self):
+        from .view_counter import trending_projects
+        try:
+            days = min(max(int(self.request.query_params.get("days", 7)), 1), 90)
+            limit = min(max(int(self.request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            raise ValidationError({"detail": "days and limit must be integers"})
+        featured = self.request.query_params.get("featured")
+        return trending_projects(days=days, limit=limit, featured=None if featured is None else featured in ("1", "true"))
+
+    def list(self, request, *args, **kwargs):
+        from .cards import get_cards
+        projects = list(self.get_queryset())
+        cards = {card["id"]: card for card in get_cards([p.pk for p in projects])}
+        # view totals change every flush, so they stay out of the cached card
+        return Response([
+            {**cards[str(p.pk)], "recent_views": p.recent_views} for p in projects if str(p.pk) in cards
+        ])
+
+
+class ProjectSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class ProjectSearchView(generics.ListAPIView):
+    """
+    GET /projects/search/?q=&status=&category=&skills=1,2&budget_min=&budget_max=&currency=
+    Relevance ordered when q is given, newest first otherwise. Rendered from project cards.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = ProjectSearchPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        from .search import search_projects
+        try:
+            return search_projects(self.request.query_params, ids_only=True)
+        except ValueError as e:
+            raise ValidationError({"detail": f"Invalid filter: {e}"})
+
+    def list(self, request, *args, **kwargs):
+        from .cards import get_cards
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(get_cards([p.pk for p in page]))
+
 
 class BidCreateView(generics.CreateAPIView):
     serializer_class = BidCreateSerializer
@@ -69,6 +152,7 @@ class BidCreateView(generics.CreateAPIView):
 class BidListView(generics.ListAPIView):
     serializer_class = BidSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         project_id = self.kwargs.get("project_id")
@@ -84,37 +168,13 @@ class AcceptBidView(views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsProjectOwner]
 
     def post(self, request, bid_id):
-        bid = get_object_or_404(Bid, id=bid_id)
-        project = bid.project
-        # permission check for owner
-        if project.owner != request.user:
-            return Response({"detail": "Forbidden"}, status=403)
-        # create Contract
-        contract = Contract.objects.create(
-            project=project,
-            bid=bid,
-            buyer=project.owner,
-            freelancer=bid.freelancer,
-            total_amount=bid.amount,
-            commission=utils.calculate_commission(bid.amount),
-        )
-        # set project status
-        project.status = "in_progress"
-        project.save(update_fields=["status", "updated_at"])
-        # create escrow via payments utils (async or sync)
-        escrow_ref = utils.create_escrow_for_contract(contract)
-        contract.escrow_reference = escrow_ref
-        contract.save(update_fields=["escrow_reference"])
-
-        # ✅ ✅ ✅ CHATS INTEGRATION ✅ ✅ ✅
-        # safely create chat conversation between buyer and freelancer
+        # whole flow is one transaction; chat/notifications run on commit
         try:
-            from .utils import create_conversation_for_contract
-            create_conversation_for_contract(contract)
-        except Exception as e:
-            print(f"[Chats Integration] Conversation creation failed: {e}")
-        # ✅ ✅ ✅ END CHATS INTEGRATION ✅ ✅ ✅
-
+            contract = utils.accept_bid(bid_id, request.user)
+        except Bid.DoesNotExist:
+            return Response({"detail": "Not found."}, status=404)
+        except utils.BidAcceptError as e:
+            return Response({"detail": str(e)}, status=e.status)
         return Response(ContractSerializer(contract).data, status=status.HTTP_201_CREATED)
 
 
@@ -168,7 +228,7 @@ class PortfolioListCreateView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request):
-        serializer = PortfolioSerializer(data=request.data)
+        serializer = PortfolioSerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
             serializer.save(user=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -180,4 +240,101 @@ def perform_create(self, serializer):
     user = self.request.user
     if user.profile_completion_score < 100:
         raise ValidationError("You must complete your profile (100%) before bidding.")
-    serializer.save(user=user)
\ No newline at end of file
+    serializer.save(user=user)
+
+# Chunked, resumable uploads (see marketplace.uploads)
+def _upload_session(request, upload_id):
+    from .models import UploadSession
+    return get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+
+
+def _upload_data(session):
+    from .uploads import received_parts
+    data = {
+        "id": str(session.id),
+        "purpose": session.purpose,
+        "filename": session.filename,
+        "size": session.size,
+        "part_size": session.part_size,
+        "part_count": session.part_count,
+        "status": session.status,
+        "expires_at": session.expires_at,
+    }
+    if session.status == "complete":
+        data["sha256"] = session.stored_file.sha256 if session.stored_file else None
+        data["file"] = session.stored_file.file.url if session.stored_file else None
+    else:
+        data["received_parts"] = received_parts(session)
+    return data
+
+
+class UploadInitView(APIView):
+    """POST uploads/ {purpose: project|portfolio, filename, size, sha256?}"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        from .uploads import init_upload, UploadError
+        try:
+            session = init_upload(request.user, request.data.get("purpose"), request.data.get("filename"),
+                                  request.data.get("size"), request.data.get("sha256"))
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=e.status)
+        return Response(_upload_data(session), status=status.HTTP_201_CREATED)
+
+
+class UploadDetailView(APIView):
+    """GET uploads/<id>/ -> progress; a resuming client re-sends parts not in received_parts."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        return Response(_upload_data(_upload_session(request, upload_id)))
+
+
+class UploadPartView(APIView):
+    """PUT uploads/<id>/parts/<n>/ with the raw part bytes as the request body."""
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, upload_id, number):
+        from .uploads import write_part, UploadError
+        session = _upload_session(request, upload_id)
+        # read the body straight off the socket instead of through a parser
+        stream = request.stream
+        if stream is None:
+            return Response({"detail": "Empty part"}, status=400)
+        try:
+            part = write_part(session, number, stream)
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=e.status)
+        return Response({"number": part.number, "size": part.size, "sha256": part.sha256})
+
+
+class UploadCompleteView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        from .uploads import complete_upload, UploadError
+        session = _upload_session(request, upload_id)
+        try:
+            complete_upload(session)
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=e.status)
+        session.refresh_from_db()
+        return Response(_upload_data(session))
+
+
+class ProjectAttachmentCreateView(APIView):
+    """POST projects/<id>/attachments/ {upload_id} attaches a finished upload."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        from .serializers import ProjectAttachmentSerializer
+        from .uploads import completed_session, attach_to_project, UploadError
+        project = get_object_or_404(Project, pk=pk)
+        if project.owner_id != request.user.id:
+            return Response({"detail": "Forbidden"}, status=403)
+        try:
+            session = completed_session(request.user, request.data.get("upload_id"), "project")
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=e.status)
+        attachment = attach_to_project(project, session)
+        return Response(ProjectAttachmentSerializer(attachment).data, status=status.HTTP_201_CREATED)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class MarketplaceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'marketplace'
+
+    def ready(self):
+        # register signals (search index sync, activity log)
+        try:
+            from . import signals  # noqa: F401
+        except Exception:
+            pass
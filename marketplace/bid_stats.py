@@ -0,0 +1,104 @@
+from decimal import Decimal
+from itertools import islice
+from django.db.models import Case, Count, DecimalField, F, Max, Min, Q, Sum, Value, When
+from django.db.models.functions import Greatest, Least
+from .cards import invalidate_cards
+from .models import Bid, Project
+
+# Denormalized bid statistics on Project (bid_count, bid_amount_sum, bid_min,
+# bid_max, last_bid_at). New bids are folded in with a single F() UPDATE;
+# removals (cancel, delete, amount edits) recompute the one project from its
+# indexed bids. repair_all() reconciles any drift periodically.
+
+COUNTED = ~Q(status="cancelled")
+
+
+def counts(status):
+    return status != "cancelled"
+
+
+def _money(value):
+    return Value(Decimal(value), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def add_bid(project_id, amount, at):
+    """Fold one new bid into the project's counters (single UPDATE, no read)."""
+    amount = _money(amount)
+    Project.objects.filter(pk=project_id).update(
+        bid_count=F("bid_count") + 1,
+        bid_amount_sum=F("bid_amount_sum") + amount,
+        # LEAST/GREATEST return NULL on SQLite when an argument is NULL
+        bid_min=Case(When(bid_min__isnull=True, then=amount), default=Least(F("bid_min"), amount)),
+        bid_max=Case(When(bid_max__isnull=True, then=amount), default=Greatest(F("bid_max"), amount)),
+        last_bid_at=Case(When(last_bid_at__isnull=True, then=Value(at)), default=Greatest(F("last_bid_at"), Value(at))),
+    )
+
+
+def _aggregate(qs):
+    return qs.filter(COUNTED).aggregate(
+        bid_count=Count("id"), bid_amount_sum=Sum("amount"), bid_min=Min("amount"),
+        bid_max=Max("amount"), last_bid_at=Max("created_at"),
+    )
+
+
+def repair_project(project_id):
+    stats = _aggregate(Bid.objects.filter(project_id=project_id))
+    stats["bid_amount_sum"] = stats["bid_amount_sum"] or Decimal("0.00")
+    Project.objects.filter(pk=project_id).update(**stats)
+
+
+def bid_changed(bid, previous):
+    """
+    Apply a saved bid to its project's counters. previous is (status, amount)
+    before the save, or None for a new bid.
+    """
+    if previous is None:
+        if counts(bid.status):
+            add_bid(bid.project_id, bid.amount, bid.created_at)
+        return
+    old_status, old_amount = previous
+    was, now = counts(old_status), counts(bid.status)
+    if was == now and (not now or Decimal(old_amount) == Decimal(bid.amount)):
+        return
+    if not was and now:
+        add_bid(bid.project_id, bid.amount, bid.created_at)
+    else:
+        # min/max cannot be un-folded; recount this one project
+        repair_project(bid.project_id)
+
+
+def repair_all(batch_size=1000):
+    """
+    Recompute every project's counters, one grouped query per batch of
+    projects; returns rows fixed. bulk_update sends no signals, so the cached
+    cards of fixed rows are dropped here batch by batch.
+    """
+    fields = ["bid_count", "bid_amount_sum", "bid_min", "bid_max", "last_bid_at"]
+    empty = {"bid_count": 0, "bid_amount_sum": Decimal("0.00"), "bid_min": None, "bid_max": None, "last_bid_at": None}
+
+    fixed = 0
+    projects = Project.objects.only("id", *fields).order_by("pk").iterator(chunk_size=batch_size)
+    while chunk := list(islice(projects, batch_size)):
+        actual = {
+            row.pop("project_id"): row
+            for row in Bid.objects.filter(COUNTED, project_id__in=[p.id for p in chunk]).values("project_id").annotate(
+                bid_count=Count("id"), bid_amount_sum=Sum("amount"), bid_min=Min("amount"),
+                bid_max=Max("amount"), last_bid_at=Max("created_at"),
+            ).order_by()
+        }
+        batch = []
+        for project in chunk:
+            want = actual.get(project.id, empty)
+            if any(getattr(project, f) != want[f] for f in fields):
+                for f in fields:
+                    setattr(project, f, want[f])
+                batch.append(project)
+        if batch:
+            fixed += _write(batch, fields)
+    return fixed
+
+
+def _write(batch, fields):
+    Project.objects.bulk_update(batch, fields)
+    invalidate_cards([p.id for p in batch])
+    return len(batch)
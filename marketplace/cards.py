@@ -0,0 +1,73 @@
+from decimal import Decimal
+from django.core.cache import cache
+from .models import Project
+
+# "Project card" read model for listing pages.
+# A card is a small JSON fragment (title, budget, skill names, bid count,
+# category, owner display name) cached per project. Pages fetch all their
+# cards with one get_many and build the misses in bulk with a fixed number of
+# queries; signals drop a card whenever something it shows changes.
+
+CARD_VERSION = 2
+CARD_TTL = 6 * 3600
+
+
+def card_key(project_id):
+    return f"mkt:card:v{CARD_VERSION}:{project_id}"
+
+
+def build_cards(project_ids):
+    """{project_id(str): card} for the given ids, straight from the database (2 queries)."""
+    ids = list(project_ids)
+    if not ids:
+        return {}
+    rows = Project.objects.filter(id__in=ids).values(
+        "id", "title", "budget_min", "budget_max", "currency", "status", "is_featured", "created_at",
+        "category__slug", "category__name", "owner_id", "owner__full_name", "owner__username",
+        "bid_count", "bid_amount_sum", "last_bid_at",
+    )
+    skills = {}
+    for pid, name in Project.skills.through.objects.filter(project_id__in=ids).values_list("project_id", "skill__name"):
+        skills.setdefault(pid, []).append(name)
+
+    cards = {}
+    for row in rows:
+        pid = row["id"]
+        cards[str(pid)] = {
+            "id": str(pid),
+            "title": row["title"],
+            "budget_min": str(row["budget_min"]),
+            "budget_max": str(row["budget_max"]),
+            "currency": row["currency"],
+            "status": row["status"],
+            "is_featured": row["is_featured"],
+            "created_at": row["created_at"].isoformat(),
+            "category": {"slug": row["category__slug"], "name": row["category__name"]} if row["category__slug"] else None,
+            "skills": sorted(skills.get(pid, [])),
+            "bid_count": row["bid_count"],
+            "bid_avg": str((row["bid_amount_sum"] / row["bid_count"]).quantize(Decimal("0.01"))) if row["bid_count"] else None,
+            "last_bid_at": row["last_bid_at"].isoformat() if row["last_bid_at"] else None,
+            "owner": {"id": row["owner_id"], "name": row["owner__full_name"] or row["owner__username"] or ""},
+        }
+    return cards
+
+
+def get_cards(project_ids):
+    """Cards in the order of project_ids; one cache round trip plus a bulk build for misses."""
+    ids = [str(pid) for pid in project_ids]
+    if not ids:
+        return []
+    found = cache.get_many([card_key(pid) for pid in ids])
+    cards = {pid: found[card_key(pid)] for pid in ids if card_key(pid) in found}
+    missing = [pid for pid in ids if pid not in cards]
+    if missing:
+        built = build_cards(missing)
+        cache.set_many({card_key(pid): card for pid, card in built.items()}, CARD_TTL)
+        cards.update(built)
+    return [cards[pid] for pid in ids if pid in cards]
+
+
+def invalidate_cards(project_ids):
+    keys = [card_key(pid) for pid in project_ids]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from marketplace.utils import backfill_contract_conversations
+
+
+class Command(BaseCommand):
+    help = "Link existing contracts to their chat conversations (Contract.conversation)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        linked = backfill_contract_conversations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Linked {linked} contracts to conversations."))
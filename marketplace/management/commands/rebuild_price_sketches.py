@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from marketplace.pricing import rebuild_sketches
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-category/per-skill price sketches from existing contracts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_sketches(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt price sketches from {total} contracts."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from marketplace.search import create_schema, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Backfill or repair the project full-text search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        create_schema()
+        total = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} projects."))
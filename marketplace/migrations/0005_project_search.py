@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of the full-text DDL at this point in history; later changes to
+# marketplace.search must not alter what this migration does.
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS marketplace_project_search (docid INTEGER PRIMARY KEY, project_id char(32) NOT NULL UNIQUE, title TEXT, description TEXT)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS marketplace_project_fts USING fts5(title, description, content='marketplace_project_search', content_rowid='docid', tokenize='porter unicode61')",
+    """CREATE TRIGGER IF NOT EXISTS marketplace_project_search_ai AFTER INSERT ON marketplace_project_search BEGIN
+        INSERT INTO marketplace_project_fts(rowid, title, description) VALUES (new.docid, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS marketplace_project_search_ad AFTER DELETE ON marketplace_project_search BEGIN
+        INSERT INTO marketplace_project_fts(marketplace_project_fts, rowid, title, description) VALUES ('delete', old.docid, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS marketplace_project_search_au AFTER UPDATE ON marketplace_project_search BEGIN
+        INSERT INTO marketplace_project_fts(marketplace_project_fts, rowid, title, description) VALUES ('delete', old.docid, old.title, old.description);
+        INSERT INTO marketplace_project_fts(rowid, title, description) VALUES (new.docid, new.title, new.description);
+    END""",
+]
+SQLITE_DROP = [
+    "DROP TABLE IF EXISTS marketplace_project_fts",
+    "DROP TABLE IF EXISTS marketplace_project_search",
+]
+POSTGRES_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS marketplace_project_search (
+        project_id uuid PRIMARY KEY REFERENCES marketplace_project(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS marketplace_project_search_document_idx ON marketplace_project_search USING GIN (document)",
+]
+POSTGRES_DROP = ["DROP TABLE IF EXISTS marketplace_project_search"]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_SCHEMA, 'postgresql': POSTGRES_SCHEMA})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_subcategory_has_test_subcategory_test_reference'),
+        ('marketplace', '0004_alter_portfolio_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', '-created_at'], name='project_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['currency', 'status'], name='project_currency_status_idx'),
+        ),
+        # full-text side tables; existing rows: manage.py rebuild_project_search_index
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_project_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='marketplace_project_b5de67_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='marketplace.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'project'], name='marketplace_day_6dc753_idx')],
+                'unique_together': {('project', 'day')},
+            },
+        ),
+    ]
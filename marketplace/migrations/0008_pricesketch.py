@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0007_projectviewdaily'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('category', 'Category'), ('skill', 'Skill')], max_length=20)),
+                ('key', models.CharField(max_length=64)),
+                ('metric', models.CharField(max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['metric', 'key'], name='marketplace_metric_1ec187_idx')],
+                'unique_together': {('scope', 'key', 'metric')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0002_keyset_indexes'),
+        ('marketplace', '0008_pricesketch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contract',
+            name='conversation',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='contract', to='chats.conversation'),
+        ),
+    ]
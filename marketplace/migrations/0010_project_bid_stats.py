@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:19
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_bid_stats(apps, schema_editor):
+    from marketplace.bid_stats import repair_all
+    repair_all()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_subcategory_has_test_subcategory_test_reference'),
+        ('marketplace', '0009_contract_conversation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='bid_amount_sum',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='bid_max',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='bid_min',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='last_bid_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'bid_count'], name='project_status_bids_idx'),
+        ),
+        migrations.RunPython(backfill_bid_stats, migrations.RunPython.noop),
+    ]
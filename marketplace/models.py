@@ -54,10 +54,61 @@ class Project(models.Model):
 
     view_count = models.PositiveIntegerField(default=0)
 
+    # Denormalized bid statistics (maintained by marketplace.bid_stats, cancelled bids excluded)
+    bid_count = models.PositiveIntegerField(default=0)
+    bid_amount_sum = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    bid_min = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    bid_max = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    last_bid_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def bid_avg(self):
+        return (self.bid_amount_sum / self.bid_count).quantize(Decimal("0.01")) if self.bid_count else None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"], name="project_status_created_idx"),
+            models.Index(fields=["currency", "status"], name="project_currency_status_idx"),
+            models.Index(fields=["status", "bid_count"], name="project_status_bids_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.owner})"
 
 
+class ProjectViewDaily(models.Model):
+    """Per-day view totals, written by the view counter flush; used for trending."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="daily_views")
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("project", "day")
+        indexes = [models.Index(fields=["day", "project"])]
+
+    def __str__(self):
+        return f"{self.project_id} {self.day}: {self.views}"
+
+
+class PriceSketch(models.Model):
+    """Quantile sketch of one price metric for a category or skill (see marketplace.pricing)."""
+    SCOPES = [("category", "Category"), ("skill", "Skill")]
+
+    scope = models.CharField(max_length=20, choices=SCOPES)
+    key = models.CharField(max_length=64)  # category uuid / skill id
+    metric = models.CharField(max_length=30)
+    count = models.PositiveIntegerField(default=0)
+    data = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("scope", "key", "metric")
+        indexes = [models.Index(fields=["metric", "key"])]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key} {self.metric} (n={self.count})"
+
+
 class ProjectAttachment(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="attachments")
     file = models.FileField(upload_to="marketplace/projects/")
@@ -85,6 +136,7 @@ class Bid(models.Model):
 
     class Meta:
         unique_together = ("project", "freelancer")
+        indexes = [models.Index(fields=["project", "created_at", "id"])]
 
 
 class Contract(models.Model):
@@ -104,6 +156,9 @@ class Contract(models.Model):
     completed_at = models.DateTimeField(blank=True, null=True)
     # link to payments.Escrow via external id or OneToOne later
     escrow_reference = models.CharField(max_length=255, blank=True, null=True)
+    conversation = models.OneToOneField(
+        "chats.Conversation", null=True, blank=True, on_delete=models.SET_NULL, related_name="contract"
+    )
 
     def __str__(self):
         return f"Contract {self.id} ({self.project.title})"
@@ -159,3 +214,59 @@ class Portfolio(models.Model):
 
     def __str__(self):
         return f"{self.user.full_name} - {self.title}"
+
+
+class StoredFile(models.Model):
+    """A content-addressed blob; identical uploads share one row and one file."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to="uploads/")
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+
+class UploadSession(models.Model):
+    """A chunked upload in progress (see marketplace.uploads)."""
+    PURPOSE_CHOICES = [
+        ("project", "Project attachment"),
+        ("portfolio", "Portfolio file"),
+    ]
+    STATUS_CHOICES = [
+        ("open", "Open"),
+        ("assembling", "Assembling"),
+        ("complete", "Complete"),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    part_size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True, null=True)  # declared by the client, checked on complete
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    stored_file = models.ForeignKey(StoredFile, on_delete=models.SET_NULL, blank=True, null=True, related_name="sessions")
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "expires_at"])]
+
+    @property
+    def part_count(self):
+        return max(1, -(-self.size // self.part_size))
+
+    def __str__(self):
+        return f"Upload {self.id} {self.filename} ({self.status})"
+
+
+class UploadPart(models.Model):
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name="parts")
+    number = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("session", "number")
@@ -0,0 +1,157 @@
+import math
+from decimal import Decimal
+from django.db import transaction
+from .models import PriceSketch
+
+# Price statistics for suggested bids and analytics.
+# Every accepted contract adds its numbers to small quantile sketches kept
+# per category and per skill, so percentiles are a lookup of a few rows
+# instead of a scan over bid history.
+
+ALPHA = 0.01  # relative accuracy of reported quantiles
+MAX_BINS = 512
+METRICS = ("amount", "delivery_days", "contract_total", "budget_ratio")
+
+
+class QuantileSketch:
+    """
+    DDSketch-style log-bucketed histogram of positive values: bucket i holds
+    values in (gamma^(i-1), gamma^i], so any quantile is returned within ALPHA
+    relative error. Mergeable (bin-wise sum) and JSON friendly.
+    """
+    gamma = (1 + ALPHA) / (1 - ALPHA)
+    log_gamma = math.log(gamma)
+
+    def __init__(self, bins=None, count=0, zeros=0):
+        self.bins = {int(k): int(v) for k, v in (bins or {}).items()}
+        self.count = count
+        self.zeros = zeros
+
+    def add(self, value, n=1):
+        value = float(value)
+        self.count += n
+        if value <= 0:
+            self.zeros += n
+            return
+        idx = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[idx] = self.bins.get(idx, 0) + n
+        if len(self.bins) > MAX_BINS:
+            self._collapse()
+
+    def _collapse(self):
+        # fold the lowest buckets together; keeps the tail (prices that matter) exact
+        keys = sorted(self.bins)
+        extra = len(keys) - MAX_BINS
+        folded = sum(self.bins.pop(k) for k in keys[:extra + 1])
+        self.bins[keys[extra]] = self.bins.get(keys[extra], 0) + folded
+
+    def merge(self, other):
+        for k, v in other.bins.items():
+            self.bins[k] = self.bins.get(k, 0) + v
+        self.count += other.count
+        self.zeros += other.zeros
+        if len(self.bins) > MAX_BINS:
+            self._collapse()
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for idx in sorted(self.bins):
+            seen += self.bins[idx]
+            if seen > rank:
+                return 2 * self.gamma ** idx / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {"bins": {str(k): v for k, v in self.bins.items()}, "count": self.count, "zeros": self.zeros}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get("bins"), data.get("count", 0), data.get("zeros", 0))
+
+
+def contract_values(contract):
+    """{metric: value} contributed by one contract."""
+    values = {"contract_total": contract.total_amount}
+    bid = contract.bid
+    if bid is not None:
+        values["amount"] = bid.amount
+        values["delivery_days"] = bid.delivery_days
+        project = contract.project
+        midpoint = (Decimal(project.budget_min) + Decimal(project.budget_max)) / 2
+        if midpoint > 0:
+            values["budget_ratio"] = Decimal(bid.amount) / midpoint
+    return values
+
+
+def add_values(scopes, values):
+    """
+    Fold values into every (scope, key) sketch; row-locked read-modify-write.
+    Runs in its own short transaction: call it after the caller's commit.
+    """
+    with transaction.atomic():
+        for scope, key in scopes:
+            for metric, value in values.items():
+                row, _ = PriceSketch.objects.select_for_update().get_or_create(scope=scope, key=key, metric=metric)
+                sketch = QuantileSketch.from_dict(row.data)
+                sketch.add(value)
+                row.data = sketch.to_dict()
+                row.count = sketch.count
+                row.save(update_fields=["data", "count", "updated_at"])
+
+
+def record_contract(contract):
+    add_values(project_scopes(contract.project), contract_values(contract))
+
+
+def lookup(scopes, metric):
+    """Merged sketch of `metric` over the given (scope, key) pairs."""
+    merged = QuantileSketch()
+    if not scopes:
+        return merged
+    keys = {(scope, key) for scope, key in scopes}
+    rows = PriceSketch.objects.filter(metric=metric, key__in=[k for _, k in keys])
+    for row in rows:
+        if (row.scope, row.key) in keys:
+            merged.merge(QuantileSketch.from_dict(row.data))
+    return merged
+
+
+def project_scopes(project):
+    scopes = [("skill", str(s.pk)) for s in project.skills.all()]
+    if project.category_id:
+        scopes.append(("category", str(project.category_id)))
+    return scopes
+
+
+def percentiles(scope, key, metric, qs=(0.25, 0.5, 0.75)):
+    """Percentiles of one category/skill metric, e.g. for analytics dashboards."""
+    sketch = lookup([(scope, key)], metric)
+    return {"count": sketch.count, **{f"p{int(q * 100)}": sketch.quantile(q) for q in qs}}
+
+
+def rebuild_sketches(batch_size=500):
+    """Recompute every sketch from accepted contracts (backfill / repair)."""
+    from .models import Contract
+    sketches = {}
+    contracts = Contract.objects.select_related("bid", "project").prefetch_related("project__skills")
+    total = 0
+    for contract in contracts.iterator(chunk_size=batch_size):
+        values = contract_values(contract)
+        for scope, key in project_scopes(contract.project):
+            for metric, value in values.items():
+                sketches.setdefault((scope, key, metric), QuantileSketch()).add(value)
+        total += 1
+    with transaction.atomic():
+        PriceSketch.objects.all().delete()
+        PriceSketch.objects.bulk_create([
+            PriceSketch(scope=scope, key=key, metric=metric, data=s.to_dict(), count=s.count)
+            for (scope, key, metric), s in sketches.items()
+        ], batch_size=batch_size)
+    return total
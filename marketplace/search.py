@@ -0,0 +1,258 @@
+import re
+import uuid
+from django.db import connection
+from django.db.models import Q
+from .models import Project
+
+# Full-text index over Project title/description.
+# SQLite: an external-content FTS5 table fed by triggers on a plain side table
+# (so upserts/deletes by project id are indexed lookups). PostgreSQL: a
+# tsvector side table with a GIN index. Other backends fall back to icontains.
+
+SEARCH_TABLE = 'marketplace_project_search'
+FTS_TABLE = 'marketplace_project_fts'
+TITLE_WEIGHT = 5.0
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_SCHEMA = [
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (docid INTEGER PRIMARY KEY, project_id char(32) NOT NULL UNIQUE, title TEXT, description TEXT)",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(title, description, content='{SEARCH_TABLE}', content_rowid='docid', tokenize='porter unicode61')",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.docid, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.docid, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE ON {SEARCH_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.docid, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.docid, new.title, new.description);
+    END""",
+]
+SQLITE_DROP = [
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+POSTGRES_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+        project_id uuid PRIMARY KEY REFERENCES marketplace_project(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL)""",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)",
+]
+POSTGRES_DROP = [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+
+def backend(conn=None):
+    vendor = (conn or connection).vendor
+    return vendor if vendor in ('sqlite', 'postgresql') else None
+
+
+def create_schema(conn=None):
+    conn = conn or connection
+    statements = {'sqlite': SQLITE_SCHEMA, 'postgresql': POSTGRES_SCHEMA}.get(backend(conn), [])
+    with conn.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def drop_schema(conn=None):
+    conn = conn or connection
+    statements = {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(backend(conn), [])
+    with conn.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def _db_id(project_id):
+    return Project._meta.pk.get_db_prep_value(project_id, connection)
+
+
+def index_project(project):
+    """Insert or refresh one project's document."""
+    engine = backend()
+    if engine is None:
+        return
+    with connection.cursor() as cursor:
+        if engine == 'sqlite':
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (project_id, title, description) VALUES (%s, %s, %s) "
+                f"ON CONFLICT(project_id) DO UPDATE SET title = excluded.title, description = excluded.description",
+                [_db_id(project.pk), project.title or '', project.description or ''],
+            )
+        else:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (project_id, document) VALUES "
+                f"(%s, setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B')) "
+                f"ON CONFLICT (project_id) DO UPDATE SET document = EXCLUDED.document",
+                [_db_id(project.pk), project.title or '', project.description or ''],
+            )
+
+
+def remove_project(project_id):
+    if backend() is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE project_id = %s", [_db_id(project_id)])
+
+
+def rebuild_index(batch_size=2000):
+    """Re-index every project (backfill / repair)."""
+    if backend() is None:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    total = 0
+    for project in Project.objects.only('id', 'title', 'description').iterator(chunk_size=batch_size):
+        index_project(project)
+        total += 1
+    return total
+
+
+def _fts_query(text):
+    # quote every word so user input can never be parsed as FTS5 syntax
+    words = WORD_RE.findall(text or '')
+    return ' '.join(f'"{w}"' for w in words)
+
+
+def filter_projects(params):
+    """
+    Project queryset for the structured filters. Raises ValueError on bad input.
+    params: status (comma list, default open; 'any' for all), category (id or slug),
+    skills (comma ids, any match), budget_min/budget_max (range overlap), currency,
+    max_bids (projects with at most that many live bids).
+    """
+    qs = Project.objects.all()
+
+    status = params.get('status') or 'open'
+    if status != 'any':
+        qs = qs.filter(status__in=[s for s in status.split(',') if s])
+
+    category = params.get('category')
+    if category:
+        try:
+            qs = qs.filter(category_id=uuid.UUID(category))
+        except ValueError:
+            qs = qs.filter(category__slug=category)
+
+    skills = params.get('skills')
+    if skills:
+        skill_ids = [int(s) for s in skills.split(',') if s.strip()]
+        qs = qs.filter(id__in=Project.skills.through.objects.filter(skill_id__in=skill_ids).values('project_id'))
+
+    if params.get('budget_min'):
+        qs = qs.filter(budget_max__gte=float(params['budget_min']))
+    if params.get('budget_max'):
+        qs = qs.filter(budget_min__lte=float(params['budget_max']))
+
+    currency = params.get('currency')
+    if currency:
+        qs = qs.filter(currency__iexact=currency)
+
+    if params.get('max_bids') not in (None, ''):
+        qs = qs.filter(bid_count__lte=int(params['max_bids']))
+    return qs
+
+
+# sort=... for listings; the bid orderings read the denormalized Project.bid_count
+SORTS = {
+    'newest': ('-created_at', 'id'),
+    'fewest_bids': ('bid_count', '-created_at', 'id'),
+    'most_bids': ('-bid_count', '-created_at', 'id'),
+}
+SORT_SQL = {
+    'newest': 'p.created_at DESC',
+    'fewest_bids': 'p.bid_count ASC',
+    'most_bids': 'p.bid_count DESC',
+}
+
+
+def _sort(params):
+    sort = params.get('sort') or ''
+    if sort and sort not in SORTS:
+        raise ValueError(f"Unknown sort '{sort}'")
+    return sort
+
+
+class RankedResults:
+    """
+    Lazily evaluated, relevance ordered projects matching a text query within
+    a filtered queryset. Slicing runs one LIMIT/OFFSET query against the index,
+    so it plugs straight into Django's Paginator.
+    """
+
+    def __init__(self, queryset, text, sort=''):
+        self.queryset = queryset
+        self.text = text
+        self.sort = sort
+        self.engine = backend()
+        self._count = None
+
+    def _sql(self, select, order=True):
+        sub_sql, sub_params = self.queryset.values('id').query.sql_with_params()
+        # an explicit sort outranks relevance; relevance then breaks ties
+        sort = f"{SORT_SQL[self.sort]}, " if self.sort else ''
+        join = f" JOIN {Project._meta.db_table} p ON p.id = s.project_id" if self.sort and order else ''
+        if self.engine == 'sqlite':
+            sql = (f"SELECT {select} FROM {FTS_TABLE} JOIN {SEARCH_TABLE} s ON s.docid = {FTS_TABLE}.rowid{join} "
+                   f"WHERE {FTS_TABLE} MATCH %s AND s.project_id IN ({sub_sql})")
+            if order:
+                sql += f" ORDER BY {sort}bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1.0), s.project_id"
+            return sql, [_fts_query(self.text), *sub_params]
+        sql = (f"SELECT {select} FROM {SEARCH_TABLE} s{join}, websearch_to_tsquery('english', %s) q "
+               f"WHERE s.document @@ q AND s.project_id IN ({sub_sql})")
+        if order:
+            sql += f" ORDER BY {sort}ts_rank(s.document, q) DESC, s.project_id"
+        return sql, [self.text, *sub_params]
+
+    def count(self):
+        if self._count is None:
+            if not self._has_terms():
+                self._count = 0
+            else:
+                sql, params = self._sql('COUNT(*)', order=False)
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def _has_terms(self):
+        return bool(_fts_query(self.text))
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        if not self._has_terms() or (stop is not None and stop <= start):
+            return []
+        sql, params = self._sql('s.project_id')
+        if stop is None:
+            sql += " LIMIT -1 OFFSET %s" if self.engine == 'sqlite' else " OFFSET %s"
+        else:
+            sql += " LIMIT %s OFFSET %s"
+            params.append(stop - start)
+        params.append(start)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            ids = [Project._meta.pk.to_python(row[0]) for row in cursor.fetchall()]
+        by_id = self.queryset.filter(id__in=ids).in_bulk()
+        return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def search_projects(params, ids_only=False):
+    """
+    Filtered projects, relevance ordered when params has a text query `q`
+    (newest first otherwise) unless `sort` picks one of SORTS.
+    ids_only loads bare rows (for rendering from project cards).
+    """
+    qs = filter_projects(params)
+    sort = _sort(params)
+    qs = qs.only('id') if ids_only else qs.select_related('owner', 'category').prefetch_related('skills')
+    text = (params.get('q') or '').strip()
+    if not text:
+        return qs.order_by(*SORTS[sort or 'newest'])
+    if backend() is None:
+        return qs.filter(Q(title__icontains=text) | Q(description__icontains=text)).order_by(*SORTS[sort or 'newest'])
+    return RankedResults(qs, text, sort)
@@ -36,14 +36,24 @@ class ProjectSerializer(serializers.ModelSerializer):
 class ProjectCreateSerializer(serializers.ModelSerializer):
     skill_ids = serializers.ListField(child=serializers.IntegerField(), write_only=True, required=False)
     attachments = serializers.ListField(child=serializers.FileField(), write_only=True, required=False)
+    # ids of finished chunked uploads (marketplace.uploads), preferred for large files
+    upload_ids = serializers.ListField(child=serializers.UUIDField(), write_only=True, required=False)
 
     class Meta:
         model = Project
-        fields = ("title","description","budget_min","budget_max","currency","skill_ids","attachments","is_featured")
+        fields = ("title","description","budget_min","budget_max","currency","skill_ids","attachments","upload_ids","is_featured")
+
+    def validate_upload_ids(self, value):
+        from .uploads import completed_session, UploadError
+        try:
+            return [completed_session(self.context["request"].user, pk, "project") for pk in value]
+        except UploadError as e:
+            raise serializers.ValidationError(str(e))
 
     def create(self, validated_data):
         skill_ids = validated_data.pop("skill_ids", [])
         attachments = validated_data.pop("attachments", [])
+        uploads = validated_data.pop("upload_ids", [])
         user = self.context["request"].user
         project = Project.objects.create(owner=user, **validated_data)
         if skill_ids:
@@ -51,6 +61,10 @@ class ProjectCreateSerializer(serializers.ModelSerializer):
             project.skills.set(skills)
         for f in attachments:
             ProjectAttachment.objects.create(project=project, file=f, name=getattr(f, "name", None))
+        if uploads:
+            from .uploads import attach_to_project
+            for session in uploads:
+                attach_to_project(project, session)
         return project
 
 
@@ -102,11 +116,27 @@ class ContractSerializer(serializers.ModelSerializer):
 
 
 class PortfolioSerializer(serializers.ModelSerializer):
+    # a finished chunked upload (marketplace.uploads) instead of a multipart file
+    upload_id = serializers.UUIDField(write_only=True, required=False)
+
     class Meta:
         model = Portfolio
         fields = "__all__"
         read_only_fields = ["user", "created_at"]
 
+    def validate_upload_id(self, value):
+        from .uploads import completed_session, UploadError
+        try:
+            return completed_session(self.context["request"].user, value, "portfolio")
+        except UploadError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, attrs):
+        session = attrs.pop("upload_id", None)
+        if session is not None:
+            attrs["file"] = session.stored_file.file.name
+        return attrs
+
 
 def validate(self, attrs):
     user = self.context['request'].user
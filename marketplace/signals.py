@@ -1,8 +1,13 @@
-from django.db.models.signals import post_save
+import logging
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.apps import apps
+from django.conf import settings
 
-from .models import Project, Bid, Contract
+from .models import Project, Bid, Contract, Skill
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Project)
 def project_created(sender, instance, created, **kwargs):
@@ -23,3 +28,138 @@ def bid_created(sender, instance, created, **kwargs):
             log_activity(instance.project, instance.freelancer, "bid_created", {"bid_id":str(instance.id)})
         except Exception:
             pass
+
+
+# Denormalized bid statistics on Project
+@receiver(pre_save, sender=Bid)
+def bid_remember_previous(sender, instance, **kwargs):
+    instance._bid_stats_previous = None
+    if instance._state.adding:
+        return
+    try:
+        instance._bid_stats_previous = Bid.objects.filter(pk=instance.pk).values_list("status", "amount").first()
+    except Exception:
+        pass
+
+
+@receiver(post_save, sender=Bid)
+def bid_saved_update_stats(sender, instance, created, **kwargs):
+    try:
+        from .bid_stats import bid_changed, repair_project
+        previous = getattr(instance, "_bid_stats_previous", None)
+        if not created and previous is None:
+            repair_project(instance.project_id)
+        else:
+            bid_changed(instance, None if created else previous)
+    except Exception:
+        logger.exception("Bid stats update failed for bid %s", instance.pk)
+
+
+@receiver(post_delete, sender=Bid)
+def bid_deleted_update_stats(sender, instance, **kwargs):
+    try:
+        from .bid_stats import repair_project
+        repair_project(instance.project_id)
+    except Exception:
+        logger.exception("Bid stats update failed for project %s", instance.project_id)
+
+
+@receiver(post_save, sender=Contract)
+def contract_created_update_price_stats(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    # after commit, so the sketch row locks are not held for the rest of accept_bid
+    def record():
+        try:
+            from .pricing import record_contract
+            record_contract(instance)
+        except Exception:
+            logger.exception("Price stats update failed for contract %s", instance.pk)
+
+    transaction.on_commit(record)
+
+
+# Keep the full-text search index in sync
+SEARCH_FIELDS = {"title", "description"}
+
+
+@receiver(post_save, sender=Project)
+def project_saved_update_search(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    try:
+        from .search import index_project
+        index_project(instance)
+    except Exception:
+        logger.exception("Search index update failed for %s", instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted_update_search(sender, instance, **kwargs):
+    try:
+        from .search import remove_project
+        remove_project(instance.pk)
+    except Exception:
+        logger.exception("Search index delete failed for %s", instance.pk)
+
+
+# Drop cached project cards when anything they show changes. After commit, so
+# a concurrent reader cannot refill the cache from the pre-commit rows.
+def _invalidate_cards(project_ids):
+    def invalidate():
+        try:
+            from .cards import invalidate_cards
+            invalidate_cards(project_ids)
+        except Exception:
+            logger.exception("Card invalidation failed")
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed_invalidate_card(sender, instance, **kwargs):
+    _invalidate_cards([instance.pk])
+
+
+@receiver(post_save, sender=Bid)
+@receiver(post_delete, sender=Bid)
+def bid_changed_invalidate_card(sender, instance, **kwargs):
+    _invalidate_cards([instance.project_id])
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def project_skills_changed_invalidate_card(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:
+        _invalidate_cards([instance.pk])
+    elif action == "pre_clear":
+        _invalidate_cards(list(instance.projects.values_list("id", flat=True)))
+    elif action != "post_clear":
+        _invalidate_cards(list(pk_set or []))
+
+
+@receiver(post_save, sender=Skill)
+def skill_renamed_invalidate_cards(sender, instance, created, **kwargs):
+    if not created:
+        _invalidate_cards(list(instance.projects.values_list("id", flat=True)))
+
+
+try:
+    from categories.models import Category
+
+    @receiver(post_save, sender=Category)
+    def category_renamed_invalidate_cards(sender, instance, created, **kwargs):
+        if not created:
+            _invalidate_cards(list(instance.projects.values_list("id", flat=True)))
+except ImportError:
+    pass
+
+
+@receiver(post_save, sender=apps.get_model(settings.AUTH_USER_MODEL))
+def owner_renamed_invalidate_cards(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not {"full_name", "username"}.intersection(update_fields)):
+        return
+    _invalidate_cards(list(Project.objects.filter(owner_id=instance.pk).values_list("id", flat=True)))
@@ -1,28 +1,53 @@
 from celery import shared_task
-from decimal import Decimal
 from .models import Bid, Project
 
+@shared_task
+def flush_project_views():
+    """
+    Write buffered project views to the database (runs every few seconds).
+    """
+    from .view_counter import flush
+    return flush()
+
+
+@shared_task
+def repair_bid_stats():
+    """
+    Reconcile the denormalized bid counters on Project with the bids table
+    (hourly safety net for writes that bypassed the signals, e.g. bulk updates).
+    """
+    from .bid_stats import repair_all
+    return repair_all()
+
+
+@shared_task
+def purge_expired_uploads():
+    """
+    Delete chunked upload sessions that were never completed, and their parts.
+    """
+    from .uploads import purge_expired
+    return purge_expired()
+
+
 @shared_task
 def compute_suggested_bid(project_id):
     """
-    Dummy AI task to compute a suggested bid range for a project.
-    In production, this can call an external ML API.
+    Compute the suggested bid for a project once and apply it to all of its
+    pending bids in one bulk_update. Scheduled (coalesced) by
+    utils.enqueue_suggested_bid.
     """
+    from django.core.cache import cache
+    from .utils import suggest_bid
+    # bids placed from now on schedule a fresh run
+    cache.delete(f"mkt:suggest:{project_id}")
     try:
         project = Project.objects.get(id=project_id)
-        avg_budget = (project.budget_min + project.budget_max) / 2
-
-        # Example “AI” logic (later replace with real model)
-        suggestion = {
-            "suggested_price": str(round(avg_budget * Decimal("0.9"), 2)),
-            "confidence": 0.82,
-            "comment": "Suggested bid based on similar project patterns."
-        }
-
-        # Update all pending bids
-        for bid in project.bids.filter(status="pending"):
-            bid.suggested_by_ai = suggestion
-            bid.save(update_fields=["suggested_by_ai"])
-        return True
     except Project.DoesNotExist:
-        return False
+        return 0
+
+    suggestion = suggest_bid(project)
+    bids = list(Bid.objects.filter(project_id=project.id, status="pending").only("id", "suggested_by_ai"))
+    for bid in bids:
+        bid.suggested_by_ai = suggestion
+    Bid.objects.bulk_update(bids, ["suggested_by_ai"], batch_size=500)
+    return len(bids)
@@ -1,3 +1,328 @@
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from .models import Project, Skill, Bid, Contract
+from .search import search_projects
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ProjectSearchTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', full_name='O', password='pass')
+        self.python = Skill.objects.create(name='Python', slug='python')
+        self.api = Project.objects.create(owner=self.owner, title='Django REST API', description='Build endpoints',
+                                          budget_min=100, budget_max=300)
+        self.api.skills.set([self.python])
+        self.logo = Project.objects.create(owner=self.owner, title='Logo design', description='Brand refresh, no API work',
+                                           budget_min=50, budget_max=80, currency='USD')
+        self.closed = Project.objects.create(owner=self.owner, title='Old API job', description='api',
+                                             budget_min=10, budget_max=20, status='completed')
+
+    def ids(self, **params):
+        return [p.id for p in search_projects(params)[:10]]
+
+    def test_text_search_ranks_title_matches_first(self):
+        self.assertEqual(self.ids(q='api'), [self.api.id, self.logo.id])
+        self.assertEqual(len(self.ids(q='api', status='any')), 3)
+        self.assertEqual(self.ids(q='"); DROP'), [])
+
+    def test_filters_and_index_sync(self):
+        self.assertEqual(self.ids(skills=str(self.python.id)), [self.api.id])
+        self.assertEqual(self.ids(budget_min='90'), [self.api.id])
+        self.assertEqual(self.ids(currency='usd'), [self.logo.id])
+        self.logo.title = 'Logo and landing page'
+        self.logo.save()
+        self.assertEqual(self.ids(q='landing'), [self.logo.id])
+        self.logo.delete()
+        self.assertEqual(self.ids(q='landing'), [])
+
+    def test_search_endpoint_paginates(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        res = client.get('/api/marketplace/projects/search/', {'q': 'api', 'page_size': 1})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(res.data['results'][0]['title'], 'Django REST API')
+        self.assertEqual(client.get('/api/marketplace/projects/search/', {'budget_min': 'x'}).status_code, 400)
+
+
+class ProjectViewCounterTests(TestCase):
+    def setUp(self):
+        from . import view_counter
+        self.vc = view_counter
+        view_counter._buffer = view_counter.LocalViewBuffer()
+        self.owner = User.objects.create_user(email='owner@example.com', full_name='O', password='pass')
+        self.a = Project.objects.create(owner=self.owner, title='A', description='a', budget_min=1, budget_max=2)
+        self.b = Project.objects.create(owner=self.owner, title='B', description='b', budget_min=1, budget_max=2)
+
+    def test_views_are_deduplicated_and_flushed_with_f_updates(self):
+        self.assertTrue(self.vc.record_view(self.a.id, 'u1'))
+        self.assertFalse(self.vc.record_view(self.a.id, 'u1'))
+        for viewer in ('u2', 'u3'):
+            self.vc.record_view(self.a.id, viewer)
+        self.vc.record_view(self.b.id, 'u1')
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.view_count, 0)
+
+        self.assertEqual(self.vc.flush(), 4)
+        self.assertEqual(self.vc.flush(), 0)
+        self.a.refresh_from_db()
+        self.b.refresh_from_db()
+        self.assertEqual((self.a.view_count, self.b.view_count), (3, 1))
+        self.assertEqual([p.id for p in self.vc.trending_projects()], [self.a.id, self.b.id])
+        self.assertEqual(self.vc.trending_projects()[0].recent_views, 3)
+
+    def test_local_buffer_prunes_seen_viewers_on_insert(self):
+        buf = self.vc.LocalViewBuffer()
+        buf.max_seen = 3
+        buf.first_view(self.a.id, 'gone', 0)
+        buf.first_view(self.a.id, 'u0', 60)
+        self.assertNotIn((str(self.a.id), 'gone'), buf._seen)
+        for i in range(1, 10):
+            buf.first_view(self.a.id, f'u{i}', 60)
+        self.assertEqual(list(buf._seen), [(str(self.a.id), f'u{i}') for i in (7, 8, 9)])
+
+    def test_anonymous_viewer_key_ignores_spoofed_forwarded_for(self):
+        from django.test import RequestFactory, override_settings
+        from django.contrib.auth.models import AnonymousUser
+        from .api_views import viewer_key
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 9.9.9.9', REMOTE_ADDR='10.0.0.1')
+        request.user = AnonymousUser()
+        self.assertEqual(viewer_key(request), 'ip10.0.0.1')
+        with override_settings(TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(viewer_key(request), 'ip9.9.9.9')
+
+
+class SuggestedBidTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', full_name='O', password='pass')
+        skill = Skill.objects.create(name='Python', slug='python')
+        self.project = Project.objects.create(owner=self.owner, title='P', description='p', budget_min=100, budget_max=300)
+        self.project.skills.set([skill])
+        done = Project.objects.create(owner=self.owner, title='Done', description='d', budget_min=100, budget_max=100,
+                                      status='completed')
+        done.skills.set([skill])
+        freelancers = [User.objects.create_user(email=f'f{i}@example.com', full_name='F', password='pass',
+                                                user_type='freelancer') for i in range(4)]
+        accepted = Bid.objects.create(project=done, freelancer=freelancers[0], amount=80, delivery_days=4, status='accepted')
+        # contract creation feeds the price sketches once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            Contract.objects.create(project=done, bid=accepted, buyer=self.owner, freelancer=freelancers[0], total_amount=80)
+        for f in freelancers[1:]:
+            Bid.objects.create(project=self.project, freelancer=f, amount=150)
+
+    def test_one_suggestion_applied_to_all_pending_bids(self):
+        from .tasks import compute_suggested_bid
+        with self.assertNumQueries(6):
+            self.assertEqual(compute_suggested_bid(str(self.project.id)), 3)
+        suggestions = [b.suggested_by_ai for b in self.project.bids.all()]
+        self.assertEqual(len({str(s) for s in suggestions}), 1)
+        # midpoint 200 scaled by the 0.8 accepted/budget ratio of the similar project
+        self.assertAlmostEqual(float(suggestions[0]['suggested_price']), 160, delta=160 * 0.01)
+        self.assertEqual(suggestions[0]['suggested_delivery_days'], 4)
+
+        from .pricing import rebuild_sketches
+        from .utils import suggest_bid
+        self.assertEqual(rebuild_sketches(), 1)
+        self.assertEqual(suggest_bid(self.project), suggestions[0])
+
+
+class PriceSketchTests(TestCase):
+    def test_quantiles_within_relative_error_and_mergeable(self):
+        import random
+        from .pricing import QuantileSketch, ALPHA
+        rng = random.Random(1)
+        values = [rng.lognormvariate(5, 1) for _ in range(5000)]
+        a, b = QuantileSketch(), QuantileSketch()
+        for i, v in enumerate(values):
+            (a if i % 2 else b).add(v)
+        merged = QuantileSketch.from_dict(a.to_dict()).merge(b)
+        ordered = sorted(values)
+        for q in (0.1, 0.5, 0.9):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertLessEqual(abs(merged.quantile(q) - exact) / exact, ALPHA * 1.01)
+        self.assertEqual(merged.count, 5000)
+
+
+class AcceptBidTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', full_name='O', password='pass')
+        self.project = Project.objects.create(owner=self.owner, title='P', description='p', budget_min=100, budget_max=300)
+        self.f1 = User.objects.create_user(email='f1@example.com', full_name='F1', password='pass', user_type='freelancer')
+        self.f2 = User.objects.create_user(email='f2@example.com', full_name='F2', password='pass', user_type='freelancer')
+        self.bid = Bid.objects.create(project=self.project, freelancer=self.f1, amount=150)
+        self.other = Bid.objects.create(project=self.project, freelancer=self.f2, amount=120)
+
+    def test_accept_is_atomic_and_rejects_competing_bids(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = f'/api/marketplace/bids/{self.bid.id}/accept/'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            res = client.post(url)
+        self.assertEqual(res.status_code, 201)
+        # the accept's own side effects run once, next to the signal work deferred to commit
+        self.assertEqual(sorted(c.__qualname__.split('.')[0] for c in callbacks),
+                         ['_invalidate_cards', 'accept_bid', 'contract_created_update_price_stats'])
+        self.bid.refresh_from_db()
+        self.other.refresh_from_db()
+        self.project.refresh_from_db()
+        self.assertEqual((self.bid.status, self.other.status, self.project.status), ('accepted', 'rejected', 'in_progress'))
+        self.assertEqual(Contract.objects.get(project=self.project).escrow_reference, f"ESCROW-{res.data['id']}")
+        contract = Contract.objects.get(project=self.project)
+        self.assertEqual(contract.conversation.participants.count(), 2)
+
+        from payments.utils import send_payment_system_message
+        from .utils import resolve_contract_conversation, create_conversation_for_contract, backfill_contract_conversations
+        self.assertEqual(resolve_contract_conversation(contract.id), contract.conversation)
+        self.assertEqual(create_conversation_for_contract(contract), contract.conversation)
+        send_payment_system_message(contract, 'paid')
+        self.assertEqual(contract.conversation.messages.get().content, 'paid')
+
+        # legacy rows linked only by title are picked up by the backfill
+        legacy = contract.conversation
+        Contract.objects.filter(pk=contract.pk).update(conversation=None)
+        self.assertEqual(backfill_contract_conversations(), 1)
+        self.assertEqual(Contract.objects.get(pk=contract.pk).conversation_id, legacy.id)
+
+        self.assertEqual(client.post(f'/api/marketplace/bids/{self.other.id}/accept/').status_code, 409)
+        client.force_authenticate(self.f2)
+        self.assertEqual(client.post(url).status_code, 403)
+
+
+class ProjectCardTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', full_name='Owner Name', password='pass')
+        self.skill = Skill.objects.create(name='Python', slug='python')
+        self.projects = [Project.objects.create(owner=self.owner, title=f'P{i}', description='p', budget_min=1, budget_max=2)
+                         for i in range(3)]
+        self.projects[0].skills.set([self.skill])
+
+    def test_cards_are_cached_and_invalidated(self):
+        from django.core.cache import cache
+        from .cards import get_cards
+        cache.clear()
+        ids = [p.id for p in self.projects]
+        with self.assertNumQueries(2):
+            cards = get_cards(ids)
+        self.assertEqual([c['title'] for c in cards], ['P0', 'P1', 'P2'])
+        self.assertEqual((cards[0]['skills'], cards[0]['owner']['name']), (['Python'], 'Owner Name'))
+        with self.assertNumQueries(0):
+            get_cards(ids)
+
+        freelancer = User.objects.create_user(email='f@example.com', full_name='F', password='pass', user_type='freelancer')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Bid.objects.create(project=self.projects[0], freelancer=freelancer, amount=1)
+            self.skill.name = 'Python 3'
+            self.skill.save()
+            # invalidation waits for the commit
+            self.assertEqual(get_cards([self.projects[0].id])[0]['bid_count'], 0)
+        self.assertTrue(callbacks)
+        card = get_cards([self.projects[0].id])[0]
+        self.assertEqual((card['bid_count'], card['skills']), (1, ['Python 3']))
+
+
+class BidStatsTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', full_name='O', password='pass')
+        self.project = Project.objects.create(owner=self.owner, title='P', description='p', budget_min=100, budget_max=300)
+        self.freelancers = [User.objects.create_user(email=f'f{i}@example.com', full_name=f'F{i}', password='pass',
+                                                     user_type='freelancer') for i in range(3)]
+
+    def stats(self):
+        self.project.refresh_from_db()
+        p = self.project
+        return p.bid_count, p.bid_min, p.bid_max, p.bid_avg
+
+    def test_counters_follow_bid_lifecycle_and_repair(self):
+        from decimal import Decimal as D
+        from .bid_stats import repair_all
+        bids = [Bid.objects.create(project=self.project, freelancer=f, amount=a)
+                for f, a in zip(self.freelancers, (150, 120, 240))]
+        self.assertEqual(self.stats(), (3, D('120.00'), D('240.00'), D('170.00')))
+        self.assertEqual(self.project.last_bid_at, bids[-1].created_at)
+
+        bids[1].status = 'cancelled'
+        bids[1].save()
+        self.assertEqual(self.stats(), (2, D('150.00'), D('240.00'), D('195.00')))
+        bids[2].delete()
+        self.assertEqual(self.stats(), (1, D('150.00'), D('150.00'), D('150.00')))
+
+        # writes that skip signals drift until the periodic repair
+        from .cards import get_cards
+        Bid.objects.filter(pk=bids[1].pk).update(status='pending')
+        self.assertEqual(get_cards([self.project.id])[0]['bid_count'], 1)
+        self.assertEqual(repair_all(), 1)
+        self.assertEqual(self.stats(), (2, D('120.00'), D('150.00'), D('135.00')))
+        self.assertEqual(get_cards([self.project.id])[0]['bid_count'], 2)
+        self.assertEqual(repair_all(), 0)
+
+    def test_search_sorts_by_bid_count(self):
+        quiet = Project.objects.create(owner=self.owner, title='P quiet', description='p', budget_min=1, budget_max=2)
+        Bid.objects.create(project=self.project, freelancer=self.freelancers[0], amount=150)
+        ids = lambda **params: [p.id for p in search_projects(params)[:10]]
+        self.assertEqual(ids(sort='fewest_bids'), [quiet.id, self.project.id])
+        self.assertEqual(ids(q='p', sort='most_bids'), [self.project.id, quiet.id])
+        self.assertEqual(ids(max_bids='0'), [quiet.id])
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        self.tmp = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.tmp, CHUNKED_UPLOAD_DIR=self.tmp + '/parts',
+                                                   CHUNKED_UPLOAD_PART_SIZE=4)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(email='f@example.com', full_name='F', password='pass', user_type='freelancer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def upload(self, data, parts_order, filename='demo.zip'):
+        import hashlib
+        res = self.client.post('/api/marketplace/uploads/', {'purpose': 'portfolio', 'filename': filename,
+                                                             'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()})
+        self.assertEqual(res.status_code, 201)
+        url = f"/api/marketplace/uploads/{res.data['id']}/"
+        for n in parts_order:
+            res = self.client.put(f'{url}parts/{n}/', data[(n - 1) * 4:n * 4], content_type='application/octet-stream')
+            self.assertEqual(res.status_code, 200)
+        return url
+
+    def test_resumable_upload_dedupes_and_attaches(self):
+        data = b'0123456789'
+        url = self.upload(data, [3, 1])
+        # connection dropped: the client asks what arrived and sends the rest
+        self.assertEqual(self.client.get(url).data['received_parts'], [1, 3])
+        self.assertEqual(self.client.post(url + 'complete/').status_code, 409)
+        self.assertEqual(self.client.put(url + 'parts/2/', b'45', content_type='application/octet-stream').status_code, 400)
+        self.client.put(url + 'parts/2/', b'4567', content_type='application/octet-stream')
+        first = self.client.post(url + 'complete/').data
+        self.assertEqual(first['status'], 'complete')
+
+        again = self.client.post(self.upload(data, [1, 2, 3]) + 'complete/').data
+        self.assertEqual(again['file'], first['file'])
+        from .models import StoredFile
+        self.assertEqual(StoredFile.objects.count(), 1)
+        with StoredFile.objects.get().file.open('rb') as fh:
+            self.assertEqual(fh.read(), data)
+
+        res = self.client.post('/api/marketplace/portfolio/', {'title': 'Demo', 'upload_id': again['id']})
+        self.assertEqual(res.status_code, 201)
+        self.assertTrue(res.data['file'].endswith('.zip'))
+        self.assertEqual(self.client.post('/api/marketplace/uploads/', {'purpose': 'portfolio', 'filename': 'x.exe',
+                                                                        'size': 1}).status_code, 400)
+
+    def test_failed_complete_reopens_session(self):
+        url = self.upload(b'0123456789', [1, 2, 3])
+        # a corrupted part: the checksum no longer matches the declared one
+        self.client.put(url + 'parts/1/', b'xxxx', content_type='application/octet-stream')
+        self.assertEqual(self.client.post(url + 'complete/').status_code, 422)
+        self.assertEqual(self.client.get(url).data['status'], 'open')
+        self.client.put(url + 'parts/1/', b'0123', content_type='application/octet-stream')
+        self.assertEqual(self.client.post(url + 'complete/').data['status'], 'complete')
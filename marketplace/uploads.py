@@ -0,0 +1,228 @@
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import StoredFile, UploadSession, UploadPart, ProjectAttachment
+
+# Chunked, resumable uploads.
+# init -> PUT each part (raw body, any order, re-sendable) -> complete.
+# Parts are streamed to CHUNKED_UPLOAD_DIR/<session>/<n>.part in small
+# buffers, so a worker never holds more than COPY_BUFFER bytes of a file.
+# complete() concatenates the parts while hashing (SHA-256), then either
+# reuses the StoredFile with that hash or saves one new blob to storage.
+# A client that lost its connection asks for the session and re-sends only
+# the parts that are missing.
+
+COPY_BUFFER = 64 * 1024
+HEX_RE = re.compile(r"^[0-9a-f]{64}$")
+
+ALLOWED_EXTENSIONS = {
+    "project": None,  # any file type, as before
+    "portfolio": {"jpg", "jpeg", "png", "pdf", "mp4", "zip", "docx"},
+}
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def part_dir(session):
+    return os.path.join(str(_setting("CHUNKED_UPLOAD_DIR", settings.BASE_DIR / "archives" / "uploads")), str(session.id))
+
+
+def part_path(session, number):
+    return os.path.join(part_dir(session), f"{number}.part")
+
+
+def init_upload(user, purpose, filename, size, sha256=None):
+    if purpose not in ALLOWED_EXTENSIONS:
+        raise UploadError(f"Unknown purpose '{purpose}'")
+    filename = os.path.basename(str(filename or "")).strip()
+    if not filename:
+        raise UploadError("filename is required")
+    allowed = ALLOWED_EXTENSIONS[purpose]
+    if allowed is not None and os.path.splitext(filename)[1].lower().lstrip(".") not in allowed:
+        raise UploadError(f"File type not allowed; use one of: {', '.join(sorted(allowed))}")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("size must be an integer")
+    if size <= 0 or size > _setting("CHUNKED_UPLOAD_MAX_SIZE", 2 * 1024 ** 3):
+        raise UploadError("size out of range")
+    if sha256 and not HEX_RE.match(sha256.lower()):
+        raise UploadError("sha256 must be 64 hex characters")
+
+    return UploadSession.objects.create(
+        user=user,
+        purpose=purpose,
+        filename=filename,
+        size=size,
+        part_size=_setting("CHUNKED_UPLOAD_PART_SIZE", 8 * 1024 * 1024),
+        sha256=sha256.lower() if sha256 else None,
+        expires_at=timezone.now() + timedelta(hours=_setting("CHUNKED_UPLOAD_EXPIRE_HOURS", 24)),
+    )
+
+
+def expected_part_size(session, number):
+    if number < 1 or number > session.part_count:
+        raise UploadError(f"Part number must be between 1 and {session.part_count}")
+    if number < session.part_count:
+        return session.part_size
+    return session.size - session.part_size * (session.part_count - 1)
+
+
+def write_part(session, number, stream):
+    """
+    Stream one part from `stream` (anything with read(n)) to disk.
+    Re-sending a part replaces it; a part cut off mid-way is discarded.
+    """
+    if session.status != "open":
+        raise UploadError("Upload already completed" if session.status == "complete" else "Upload is being completed",
+                          status=409)
+    if session.expires_at <= timezone.now():
+        raise UploadError("Upload expired", status=410)
+    expected = expected_part_size(session, number)
+
+    os.makedirs(part_dir(session), exist_ok=True)
+    final = part_path(session, number)
+    tmp = f"{final}.{uuid.uuid4().hex}.tmp"
+    digest, written = hashlib.sha256(), 0
+    try:
+        with open(tmp, "wb") as out:
+            while True:
+                # never read past the expected size, oversize bodies are rejected below
+                chunk = stream.read(min(COPY_BUFFER, expected + 1 - written))
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > expected:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+        if written != expected:
+            raise UploadError(f"Part {number} must be exactly {expected} bytes")
+        os.replace(tmp, final)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    part, _ = UploadPart.objects.update_or_create(
+        session=session, number=number,
+        defaults={"size": written, "sha256": digest.hexdigest(), "created_at": timezone.now()},
+    )
+    return part
+
+
+def received_parts(session):
+    return list(session.parts.order_by("number").values_list("number", flat=True))
+
+
+def _assemble(session, target):
+    """Concatenate the parts into `target` and return their SHA-256."""
+    digest = hashlib.sha256()
+    with open(target, "wb") as out:
+        for number in range(1, session.part_count + 1):
+            with open(part_path(session, number), "rb") as part:
+                for chunk in iter(lambda: part.read(COPY_BUFFER), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+    return digest.hexdigest()
+
+
+def _store(path, sha256, size, filename):
+    """The StoredFile for this content, saving the blob only if it is new."""
+    existing = StoredFile.objects.filter(sha256=sha256).first()
+    if existing:
+        return existing
+    ext = os.path.splitext(filename)[1].lower()
+    with open(path, "rb") as fh:
+        name = default_storage.save(f"uploads/{sha256[:2]}/{sha256}{ext}", File(fh))
+    try:
+        with transaction.atomic():
+            return StoredFile.objects.create(sha256=sha256, file=name, size=size)
+    except IntegrityError:
+        # another upload of the same bytes won the race
+        default_storage.delete(name)
+        return StoredFile.objects.get(sha256=sha256)
+
+
+def complete_upload(session):
+    """
+    Verify and assemble the parts; returns the (possibly shared) StoredFile.
+    The session is claimed with a conditional status UPDATE, so no lock is
+    held while the parts are copied and hashed; a failure reopens it.
+    """
+    session = UploadSession.objects.select_related("stored_file").get(pk=session.pk)
+    if session.status == "complete":
+        return session.stored_file
+    parts = dict(session.parts.values_list("number", "size"))
+    missing = [n for n in range(1, session.part_count + 1) if n not in parts]
+    if missing:
+        raise UploadError(f"Missing parts: {missing[:50]}", status=409)
+    if sum(parts.values()) != session.size:
+        raise UploadError("Uploaded size does not match", status=409)
+
+    # one completer wins; this also stops further part writes
+    if not UploadSession.objects.filter(pk=session.pk, status="open").update(status="assembling"):
+        session.refresh_from_db()
+        if session.status == "complete":
+            return session.stored_file
+        raise UploadError("Upload is already being completed", status=409)
+
+    assembled = os.path.join(part_dir(session), "assembled")
+    try:
+        sha256 = _assemble(session, assembled)
+        if session.sha256 and session.sha256 != sha256:
+            raise UploadError("Checksum mismatch, re-upload the file", status=422)
+        stored = _store(assembled, sha256, session.size, session.filename)
+    except Exception:
+        UploadSession.objects.filter(pk=session.pk, status="assembling").update(status="open")
+        raise
+    finally:
+        if os.path.exists(assembled):
+            os.remove(assembled)
+
+    with transaction.atomic():
+        UploadSession.objects.filter(pk=session.pk).update(stored_file=stored, status="complete")
+    session.stored_file, session.status = stored, "complete"
+    shutil.rmtree(part_dir(session), ignore_errors=True)
+    return stored
+
+
+def completed_session(user, upload_id, purpose):
+    """A finished upload owned by user, for attaching to a project/portfolio."""
+    try:
+        session = UploadSession.objects.select_related("stored_file").get(
+            pk=upload_id, user=user, purpose=purpose, status="complete")
+    except (UploadSession.DoesNotExist, ValueError, TypeError):
+        raise UploadError(f"Unknown or unfinished upload {upload_id}")
+    if session.stored_file is None:
+        raise UploadError(f"Upload {upload_id} has no file")
+    return session
+
+
+def attach_to_project(project, session):
+    return ProjectAttachment.objects.create(project=project, file=session.stored_file.file.name, name=session.filename)
+
+
+def purge_expired():
+    """Drop unfinished sessions past their expiry along with their parts on disk."""
+    # "assembling" past expiry means the completing worker died
+    expired = list(UploadSession.objects.filter(status__in=["open", "assembling"], expires_at__lte=timezone.now()))
+    for session in expired:
+        shutil.rmtree(part_dir(session), ignore_errors=True)
+    UploadSession.objects.filter(pk__in=[s.pk for s in expired]).delete()
+    return len(expired)
@@ -6,6 +6,8 @@ from .api_views import PortfolioListCreateView
 urlpatterns = [
 
     path("projects/", views.ProjectCreateView.as_view(), name="project-create"),
+    path("projects/trending/", views.TrendingProjectsView.as_view(), name="project-trending"),
+    path("projects/search/", views.ProjectSearchView.as_view(), name="project-search"),
     path("projects/<uuid:pk>/", views.ProjectRetrieveUpdateView.as_view(), name="project-detail"),
     path("projects/<uuid:project_id>/bids/", views.BidListView.as_view(), name="project-bids"),
     path("bids/create/", views.BidCreateView.as_view(), name="bid-create"),
@@ -14,4 +16,9 @@ urlpatterns = [
     path("milestones/create/", views.MilestoneCreateView.as_view(), name="milestone-create"),
     path("milestones/<uuid:milestone_id>/approve/", views.MilestoneApproveView.as_view(), name="milestone-approve"),
     path("portfolio/", PortfolioListCreateView.as_view(), name="portfolio-list-create"),
+    path("projects/<uuid:pk>/attachments/", views.ProjectAttachmentCreateView.as_view(), name="project-attachment-create"),
+    path("uploads/", views.UploadInitView.as_view(), name="upload-init"),
+    path("uploads/<uuid:upload_id>/", views.UploadDetailView.as_view(), name="upload-detail"),
+    path("uploads/<uuid:upload_id>/parts/<int:number>/", views.UploadPartView.as_view(), name="upload-part"),
+    path("uploads/<uuid:upload_id>/complete/", views.UploadCompleteView.as_view(), name="upload-complete"),
 ]
@@ -1,9 +1,12 @@
+import logging
 from django.apps import apps
 from decimal import Decimal
 from django.conf import settings
 from django.db import transaction
 from .models import ProjectActivityLog
 
+logger = logging.getLogger(__name__)
+
 
 def calculate_commission(amount):
     # platform commission (example: 10%)
@@ -12,16 +15,64 @@ def calculate_commission(amount):
     return fee
 
 
+def suggested_bid_window():
+    return getattr(settings, "SUGGESTED_BID_COALESCE_SECONDS", 10)
+
+
 def enqueue_suggested_bid(bid):
-    # placeholder: enqueue background job to compute suggested bid using AI/ML
-    # implement Celery task later
+    """
+    Schedule one suggested-bid run per project: bids arriving within the
+    coalescing window share a single task, which updates every pending bid.
+    """
+    from django.core.cache import cache
+    window = suggested_bid_window()
+    key = f"mkt:suggest:{bid.project_id}"
+    if not cache.add(key, 1, timeout=window * 6):
+        return False  # a run is already scheduled for this project
     try:
         from .tasks import compute_suggested_bid  # celery task
-        compute_suggested_bid.delay(str(bid.id))
+        compute_suggested_bid.apply_async((str(bid.project_id),), countdown=window)
+        return True
     except Exception:
-        # fallback quick heuristic
-        bid.suggested_by_ai = {"price": float(bid.amount), "note": "heuristic"}
-        bid.save(update_fields=["suggested_by_ai"])
+        cache.delete(key)
+        # fallback: suggestion for this bid only
+        from .models import Bid
+        Bid.objects.filter(pk=bid.pk).update(suggested_by_ai=suggest_bid(bid.project))
+        return False
+
+
+def suggest_bid(project):
+    """
+    Suggested price for a project: the budget midpoint scaled by the median
+    accepted-amount/budget ratio of its skills and category, read from the
+    price sketches (a few row lookups, no history scan).
+    """
+    from .pricing import lookup, project_scopes
+    scopes = project_scopes(project)
+    ratio = lookup(scopes, "budget_ratio")
+    days = lookup(scopes, "delivery_days")
+
+    lo, hi = Decimal(project.budget_min), Decimal(project.budget_max)
+    midpoint = (lo + hi) / 2
+
+    def clamp(value):
+        return min(max(value, lo), hi) if hi > 0 else value
+
+    def scaled(q):
+        return clamp(midpoint * Decimal(str(round(ratio.quantile(q), 4)))).quantize(Decimal("0.01"))
+
+    n = ratio.count
+    suggestion = {
+        "suggested_price": str(scaled(0.5) if n else midpoint.quantize(Decimal("0.01"))),
+        "confidence": round(min(0.95, 0.5 + n / 100), 2),
+        "based_on": n,
+        "comment": "Suggested bid based on budget and similar accepted contracts." if n else "Suggested bid based on project budget.",
+    }
+    if n:
+        suggestion["price_range"] = [str(scaled(0.25)), str(scaled(0.75))]
+    if days.count:
+        suggestion["suggested_delivery_days"] = max(1, int(round(days.quantile(0.5))))
+    return suggestion
 
 
 def create_escrow_for_contract(contract):
@@ -41,6 +92,87 @@ def create_escrow_for_contract(contract):
     return f"ESCROW-{contract.id}"
 
 
+class BidAcceptError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def accept_bid(bid_id, user):
+    """
+    Accept a bid in one transaction: lock the project row, create the
+    contract, accept this bid and reject the competing pending ones in a
+    single UPDATE. Chat and notifications run after commit.
+    Raises Bid.DoesNotExist / BidAcceptError.
+    """
+    from django.db import IntegrityError
+    from django.db.models import Case, Value, When
+    from django.utils import timezone
+    from .models import Bid, Contract, Project
+
+    with transaction.atomic():
+        project_id = Bid.objects.values_list("project_id", flat=True).get(id=bid_id)
+        # serializes concurrent accepts on the same project
+        project = Project.objects.select_for_update().get(id=project_id)
+        if project.owner_id != user.id:
+            raise BidAcceptError("Forbidden", status=403)
+        bid = Bid.objects.select_related("freelancer").get(id=bid_id)
+        if bid.status != "pending" or Contract.objects.filter(project_id=project.id).exists():
+            raise BidAcceptError("This project already has an accepted bid.", status=409)
+
+        contract = Contract(
+            project=project,
+            bid=bid,
+            buyer=user,
+            freelancer=bid.freelancer,
+            total_amount=bid.amount,
+            commission=calculate_commission(bid.amount),
+        )
+        # default reference is known up front, so the common path is a single insert
+        contract.escrow_reference = f"ESCROW-{contract.id}"
+        try:
+            with transaction.atomic():
+                contract.save(force_insert=True)
+        except IntegrityError:
+            raise BidAcceptError("This project already has an accepted bid.", status=409)
+
+        now = timezone.now()
+        Bid.objects.filter(project_id=project.id, status="pending").update(
+            status=Case(When(pk=bid.pk, then=Value("accepted")), default=Value("rejected")),
+            updated_at=now,
+        )
+        bid.status = "accepted"
+        project.status = "in_progress"
+        project.save(update_fields=["status", "updated_at"])
+
+        escrow_ref = create_escrow_for_contract(contract)
+        if escrow_ref != contract.escrow_reference:
+            contract.escrow_reference = escrow_ref
+            contract.save(update_fields=["escrow_reference"])
+
+        transaction.on_commit(lambda: _after_bid_accepted(contract))
+    return contract
+
+
+def _after_bid_accepted(contract):
+    try:
+        create_conversation_for_contract(contract)
+    except Exception:
+        logger.exception("Conversation creation failed for contract %s", contract.id)
+    try:
+        from notifications.utils import create_notification
+        create_notification(
+            user=contract.freelancer,
+            verb="bid_accepted",
+            title="Your bid was accepted",
+            message=f'Your bid on "{contract.project.title}" was accepted.',
+            actor=contract.buyer,
+            data={"contract_id": str(contract.id), "project_id": str(contract.project_id)},
+        )
+    except Exception:
+        logger.exception("Bid accepted notification failed for contract %s", contract.id)
+
+
 def release_milestone_payment(contract, milestone):
     try:
         payments_utils = apps.get_app_config("payments").module.utils
@@ -57,31 +189,108 @@ def log_activity(project, actor, action, meta=None):
 
 
 # ✅ ✅ ✅  --- CHATS INTEGRATION (added section below) ---
+CONTRACT_CONVERSATION_TTL = 24 * 3600
+
+
+def _contract_conversation_key(contract_id):
+    return f"mkt:contract-conv:{contract_id}"
+
+
+def resolve_contract_conversation(contract):
+    """
+    Chat conversation of a contract (instance or id) via Contract.conversation;
+    the contract -> conversation id mapping is cached. Returns None if unlinked.
+    """
+    from django.core.cache import cache
+    from .models import Contract
+    Conversation = apps.get_model('chats', 'Conversation')
+
+    conv_id = getattr(contract, "conversation_id", None)
+    if conv_id is None:
+        contract_id = getattr(contract, "pk", contract)
+        key = _contract_conversation_key(contract_id)
+        conv_id = cache.get(key)
+        if conv_id is None:
+            conv_id = Contract.objects.filter(pk=contract_id).values_list("conversation_id", flat=True).first()
+            if conv_id is None:
+                return None
+            cache.set(key, conv_id, CONTRACT_CONVERSATION_TTL)
+    return Conversation.objects.filter(pk=conv_id).first()
+
+
 def create_conversation_for_contract(contract):
     """
     Auto create chat between buyer and freelancer when a contract is made.
-    Integrated with chats app.
+    Integrated with chats app. Returns the existing conversation if linked.
     """
+    from django.core.cache import cache
+    from .models import Contract
     try:
         Conversation = apps.get_model('chats', 'Conversation')
         Participant = apps.get_model('chats', 'Participant')
     except LookupError:
         return None
 
-    with transaction.atomic():
-        # avoid duplicate conversation creation for same contract
-        existing = Conversation.objects.filter(
-            title__icontains=str(contract.id)
-        ).first()
-        if existing:
-            return existing
+    existing = resolve_contract_conversation(contract)
+    if existing:
+        return existing
 
+    with transaction.atomic():
         conv = Conversation.objects.create(
             title=f"Contract {contract.id} - {contract.project.title}",
             created_by=contract.buyer,
             is_group=False
         )
-        Participant.objects.create(conversation=conv, user=contract.buyer, is_admin=True)
-        Participant.objects.create(conversation=conv, user=contract.freelancer, is_admin=False)
+        # conditional link: a concurrent creator that got there first wins
+        if not Contract.objects.filter(pk=contract.pk, conversation__isnull=True).update(conversation=conv):
+            transaction.set_rollback(True)
+            conv = None
+        else:
+            Participant.objects.bulk_create([
+                Participant(conversation=conv, user=contract.buyer, is_admin=True),
+                Participant(conversation=conv, user=contract.freelancer, is_admin=False),
+            ])
+    if conv is None:
+        contract.conversation_id = None
+        return resolve_contract_conversation(contract.pk)
+    contract.conversation = conv
+    cache.set(_contract_conversation_key(contract.pk), conv.pk, CONTRACT_CONVERSATION_TTL)
     return conv
 
+
+def backfill_contract_conversations(batch_size=500):
+    """
+    Link contracts to the conversations created before Contract.conversation
+    existed (found by their "Contract <id> - ..." title). One pass over the
+    conversation titles, then bulk updates.
+    """
+    import re
+    import uuid
+    from .models import Contract
+    Conversation = apps.get_model('chats', 'Conversation')
+    title_re = re.compile(r"^Contract ([0-9a-fA-F-]{32,36})\b")
+
+    by_contract = {}
+    titles = Conversation.objects.filter(title__startswith="Contract ", contract__isnull=True).order_by("created_at")
+    for conv_id, title in titles.values_list("id", "title").iterator(chunk_size=batch_size):
+        match = title_re.match(title or "")
+        if match:
+            try:
+                by_contract.setdefault(uuid.UUID(match.group(1)), conv_id)  # oldest wins
+            except ValueError:
+                continue
+
+    linked = 0
+    pending = Contract.objects.filter(conversation__isnull=True, id__in=list(by_contract)).only("id")
+    batch = []
+    for contract in pending.iterator(chunk_size=batch_size):
+        contract.conversation_id = by_contract[contract.id]
+        batch.append(contract)
+        if len(batch) >= batch_size:
+            linked += len(batch)
+            Contract.objects.bulk_update(batch, ["conversation"])
+            batch = []
+    if batch:
+        linked += len(batch)
+        Contract.objects.bulk_update(batch, ["conversation"])
+    return linked
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import Project, ProjectViewDaily
+
+logger = logging.getLogger(__name__)
+
+# Write-behind project view counting.
+# Views are deduplicated per viewer within a window and accumulated in a
+# buffer; flush() drains the buffer and applies the aggregated deltas with
+# grouped F('view_count') + n updates, so request threads never touch (or
+# lock) the project row. The buffer is Redis (PROJECT_VIEW_BUFFER_URL, the
+# Celery broker by default), shared by every web process and drained by the
+# beat task. With the URL set empty it is a process-local stand-in for tests
+# and dev servers, drained by a daemon thread in that same process.
+
+PENDING_KEY = "mkt:views:pending"
+
+
+def dedupe_seconds():
+    return getattr(settings, "PROJECT_VIEW_DEDUPE_SECONDS", 30 * 60)
+
+
+def flush_seconds():
+    return getattr(settings, "PROJECT_VIEW_FLUSH_SECONDS", 5)
+
+
+class LocalViewBuffer:
+    """In-process buffer (tests, single-process dev servers)."""
+    shared = False
+    max_seen = 100_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._seen = {}  # (project, viewer) -> expires (monotonic), in insertion order
+
+    def _prune(self, now):
+        # entries share one window, so the oldest inserted expire first
+        while self._seen:
+            key, exp = next(iter(self._seen.items()))
+            if exp > now and len(self._seen) < self.max_seen:
+                break
+            del self._seen[key]
+
+    def first_view(self, project_id, viewer, window):
+        key = (str(project_id), str(viewer))
+        now = time.monotonic()
+        with self._lock:
+            if self._seen.get(key, 0) > now:
+                return False
+            self._prune(now)
+            self._seen.pop(key, None)
+            self._seen[key] = now + window
+            return True
+
+    def incr(self, project_id, n=1):
+        with self._lock:
+            self._pending[str(project_id)] += n
+
+    def drain(self):
+        now = time.monotonic()
+        with self._lock:
+            pending, self._pending = dict(self._pending), defaultdict(int)
+            self._prune(now)
+        return pending
+
+
+class RedisViewBuffer:
+    """Shared buffer: HINCRBY into one hash, drained by an atomic RENAME."""
+    shared = True
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def first_view(self, project_id, viewer, window):
+        return bool(self.client.set(f"mkt:viewed:{project_id}:{viewer}", 1, nx=True, ex=window))
+
+    def incr(self, project_id, n=1):
+        self.client.hincrby(PENDING_KEY, str(project_id), n)
+
+    def drain(self):
+        batch = f"{PENDING_KEY}:{uuid.uuid4().hex}"
+        try:
+            self.client.rename(PENDING_KEY, batch)
+        except Exception:
+            return {}  # nothing pending
+        pending = self.client.hgetall(batch)
+        self.client.delete(batch)
+        return {k.decode(): int(v) for k, v in pending.items()}
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def _flush_forever(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        finally:
+            close_old_connections()
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            url = getattr(settings, "PROJECT_VIEW_BUFFER_URL", None)
+            _buffer = RedisViewBuffer(url) if url else LocalViewBuffer()
+            # nobody else can drain a process-local buffer
+            if not _buffer.shared and flush_seconds() > 0:
+                threading.Thread(target=_flush_forever, args=(flush_seconds(),), daemon=True).start()
+    return _buffer
+
+
+def record_view(project_id, viewer):
+    """
+    Count one view of a project unless this viewer was already counted within
+    the dedupe window. Returns True if the view was counted.
+    """
+    buf = get_buffer()
+    try:
+        if not buf.first_view(project_id, viewer, dedupe_seconds()):
+            return False
+        buf.incr(project_id)
+    except Exception:
+        logger.exception("View buffer unavailable")
+        return False
+    return True
+
+
+def apply_deltas(deltas, day=None):
+    """Apply {project_id: n} with one UPDATE per distinct n, plus the daily rollup."""
+    if not deltas:
+        return 0
+    day = day or timezone.localdate()
+    by_delta = defaultdict(list)
+    for pid, n in deltas.items():
+        if n > 0:
+            by_delta[n].append(pid)
+    with transaction.atomic():
+        existing = set(str(pid) for pid in Project.objects.filter(id__in=list(deltas)).values_list("id", flat=True))
+        ProjectViewDaily.objects.bulk_create(
+            [ProjectViewDaily(project_id=pid, day=day, views=0) for pid in existing],
+            ignore_conflicts=True,
+        )
+        for n, pids in by_delta.items():
+            Project.objects.filter(id__in=pids).update(view_count=F("view_count") + n)
+            ProjectViewDaily.objects.filter(project_id__in=pids, day=day).update(views=F("views") + n)
+    return sum(deltas.values())
+
+
+def flush():
+    """Drain the buffer into the database. Returns the number of views written."""
+    deltas = get_buffer().drain()
+    try:
+        return apply_deltas(deltas)
+    except Exception:
+        # put the counts back so the next flush retries them
+        buf = get_buffer()
+        for pid, n in deltas.items():
+            buf.incr(pid, n)
+        logger.exception("View flush failed")
+        return 0
+
+
+def trending_projects(days=7, limit=20, featured=None):
+    """Open projects (bare rows, .recent_views annotated) ordered by views over the last `days` days."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    qs = Project.objects.filter(status="open", daily_views__day__gte=since)
+    if featured is not None:
+        qs = qs.filter(is_featured=featured)
+    return (
+        qs.annotate(recent_views=Sum("daily_views__views"))
+        .order_by("-recent_views", "-created_at")
+        .only("id")[:limit]
+    )
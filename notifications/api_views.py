@@ -4,10 +4,12 @@ from django.shortcuts import get_object_or_404
 from .models import Notification, NotificationPreference
 from .serializers import NotificationSerializer, NotificationCreateSerializer, PreferenceSerializer
 from . import utils
+from jobsalign.pagination import KeysetPagination
 
 class NotificationListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = NotificationSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         qs = Notification.objects.filter(user=self.request.user, archived=False)
@@ -28,6 +28,7 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['user','read']),
             models.Index(fields=['group_key','created_at']),
+            models.Index(fields=['user','created_at','id']),
         ]
 
     def __str__(self):
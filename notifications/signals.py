@@ -81,18 +81,9 @@ try:
     @receiver(post_save, sender=Message)
     def on_message_created(sender, instance, created, **kwargs):
         if created and instance.sender:
-            # notify other participants
+            # notify other participants (socket sends are bulk-created and call this themselves)
             try:
-                for p in instance.conversation.participants.exclude(user=instance.sender):
-                    utils.create_notification(
-                        user=p.user,
-                        actor=instance.sender,
-                        verb='new_message',
-                        title=f'New message from {instance.sender.full_name}',
-                        message=instance.content or 'You received a new message',
-                        data={'conversation_id': str(instance.conversation_id), 'message_id': str(instance.id)},
-                        group_key=f'chat_unread:{instance.conversation_id}:{p.user.id}'
-                    )
+                utils.notify_new_messages([instance])
             except Exception:
                 pass
 except ImportError:
@@ -14,3 +14,33 @@ class NotificationBasicTest(TestCase):
         notif = utils.create_notification(user=self.u1, verb='test', title='Hello', message='World', actor=self.u2)
         self.assertTrue(Notification.objects.filter(id=notif.id).exists())
         self.assertEqual(notif.title, 'Hello')
+
+
+class NotificationKeysetPaginationTest(TestCase):
+    def setUp(self):
+        from django.utils import timezone
+        self.user = User.objects.create_user(email='pager@example.com', full_name='P', password='pass')
+        now = timezone.now()
+        # three rows share a timestamp, so the id tiebreaker matters
+        Notification.objects.bulk_create([
+            Notification(user=self.user, verb='test', title=str(i), created_at=now if i < 3 else now - timezone.timedelta(minutes=i))
+            for i in range(5)
+        ])
+
+    def test_cursor_walk_covers_every_row_once(self):
+        from rest_framework.test import APIClient
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url, seen, pages = '/api/notifications/?page_size=2', [], []
+        while url:
+            data = client.get(url).data
+            pages.append([n['id'] for n in data['results']])
+            seen += pages[-1]
+            url = data['next']
+        expected = [str(n.id) for n in Notification.objects.filter(user=self.user).order_by('-created_at', '-id')]
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+
+        back = client.get(data['previous']).data
+        self.assertEqual([n['id'] for n in back['results']], pages[1])
+        self.assertEqual(client.get('/api/notifications/?cursor=bogus').status_code, 404)
@@ -97,6 +97,30 @@ def create_notification(user, verb, title, message=None, actor=None, data=None,
 
     return notif
 
+def notify_new_messages(messages):
+    """In-app 'new_message' notifications to the other participants of each chat message."""
+    from chats.models import Participant
+    recipients = {}
+    for message in messages:
+        if not message.sender:
+            continue
+        if message.conversation_id not in recipients:
+            recipients[message.conversation_id] = list(
+                Participant.objects.filter(conversation_id=message.conversation_id).select_related('user')
+            )
+        for p in recipients[message.conversation_id]:
+            if p.user_id == message.sender_id:
+                continue
+            create_notification(
+                user=p.user,
+                actor=message.sender,
+                verb='new_message',
+                title=f'New message from {message.sender.full_name}',
+                message=message.content or 'You received a new message',
+                data={'conversation_id': str(message.conversation_id), 'message_id': str(message.id)},
+                group_key=f'chat_unread:{message.conversation_id}:{p.user.id}'
+            )
+
 def create_notification_via_api(requesting_user, user_id, verb, title, message=None, actor_id=None, data=None, group_key=None, level='info'):
     
     from django.contrib.auth import get_user_model
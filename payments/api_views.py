@@ -5,6 +5,7 @@ from .serializers import WalletSerializer, TransactionSerializer, PaymentInitSer
 from .utils import initiate_payment_gateway
 from django.shortcuts import get_object_or_404
 from .utils import send_payment_system_message
+from jobsalign.pagination import KeysetPagination
 
 
 class WalletDetailView(generics.RetrieveAPIView):
@@ -16,6 +17,7 @@ class WalletDetailView(generics.RetrieveAPIView):
 class TransactionListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TransactionSerializer
+    pagination_class = KeysetPagination
     def get_queryset(self):
         return Transaction.objects.filter(user=self.request.user)
 
@@ -70,6 +70,7 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "created_at", "id"])]
 
     def __str__(self):
         return f"{self.user.email} - {self.type} ({self.amount})"
@@ -13,11 +13,11 @@ def send_payment_system_message(contract, text):
     Send a system message to the chat conversation related to this contract.
     """
     try:
-        Conversation = apps.get_model('chats', 'Conversation')
+        from marketplace.utils import resolve_contract_conversation
         Message = apps.get_model('chats', 'Message')
 
-        # contract.id এর মাধ্যমে relevant chat conversation খোঁজা
-        conv = Conversation.objects.filter(title__icontains=str(contract.id)).first()
+        # contract.conversation (cached) দিয়ে relevant chat conversation খোঁজা
+        conv = resolve_contract_conversation(contract)
         if not conv:
             return None
 
@@ -4,8 +4,7 @@ from django.shortcuts import get_object_or_404
 from .models import ProjectRecommendation, UserRecommendation
 from .serializers import ProjectRecommendationSerializer, UserRecommendationSerializer
 from . import tasks
-from django.utils import timezone
-from datetime import timedelta
+from . import cache as rec_cache
 
 class ProjectRecommendationView(generics.RetrieveAPIView):
     
@@ -16,19 +15,10 @@ class ProjectRecommendationView(generics.RetrieveAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         project_id = kwargs.get('project_id')
-        rec = ProjectRecommendation.objects.filter(project_id=project_id).order_by('-computed_at').first()
-        stale = True
-        if rec:
-            if (timezone.now() - rec.computed_at).total_seconds() < rec.ttl_seconds:
-                stale = False
-        if not rec or stale:
-            
-            try:
-                tasks.compute_recommendations_for_project.delay(str(project_id))
-            except Exception:
-                pass
-        if rec:
-            return Response(ProjectRecommendationSerializer(rec).data)
+        # read-through cache; stale data is served while one refresh runs in background
+        data = rec_cache.project_recommendations.get(project_id)
+        if data is not None:
+            return Response(data)
         return Response({"detail":"Recommendation compute scheduled"}, status=status.HTTP_202_ACCEPTED)
 
 class UserRecommendationView(generics.RetrieveAPIView):
@@ -40,18 +30,9 @@ class UserRecommendationView(generics.RetrieveAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         user_id = kwargs.get('user_id')
-        rec = UserRecommendation.objects.filter(user_id=user_id).order_by('-computed_at').first()
-        stale = True
-        if rec:
-            if (timezone.now() - rec.computed_at).total_seconds() < rec.ttl_seconds:
-                stale = False
-        if not rec or stale:
-            try:
-                tasks.compute_recommendations_for_user.delay(str(user_id))
-            except Exception:
-                pass
-        if rec:
-            return Response(UserRecommendationSerializer(rec).data)
+        data = rec_cache.user_recommendations.get(user_id)
+        if data is not None:
+            return Response(data)
         return Response({"detail":"Recommendation compute scheduled"}, status=status.HTTP_202_ACCEPTED)
 
 class TriggerProjectRecommendation(generics.GenericAPIView):
@@ -65,3 +46,14 @@ class TriggerProjectRecommendation(generics.GenericAPIView):
             return Response({"detail":"Forbidden"}, status=status.HTTP_403_FORBIDDEN)
         tasks.compute_recommendations_for_project.delay(str(project_id))
         return Response({"detail":"Recommendation job scheduled"}, status=status.HTTP_202_ACCEPTED)
+
+
+class RecommendationCacheStatsView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        # counters are per worker process
+        return Response({
+            "project": rec_cache.project_recommendations.stats(),
+            "user": rec_cache.user_recommendations.stats(),
+        })
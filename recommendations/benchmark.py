@@ -0,0 +1,194 @@
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from accounts.models import User
+from marketplace.models import Project, Skill, Bid, Contract
+from reviews.models import Review
+
+# Benchmark harness for the recommendation paths.
+# Synthetic rows are written with bulk_create (no signals, so nothing is
+# enqueued), the derived tables are rebuilt once, every path is measured and
+# the whole marketplace is rolled back afterwards.
+
+PROJECT_STATUSES = ['open'] * 6 + ['in_progress', 'completed', 'completed', 'cancelled']
+
+
+def _skill_weights(n):
+    # a few popular skills and a long tail, like a real catalog
+    return [1.0 / (i + 1) for i in range(n)]
+
+
+def generate_marketplace(users=1000, projects=None, skills=60, freelancer_ratio=0.7, contract_ratio=0.3,
+                         seed=42, batch_size=1000):
+    """
+    Create a synthetic marketplace and return the ids a benchmark needs.
+    Call inside a transaction that is rolled back.
+    """
+    from .features import rebuild_features
+    from .index import rebuild_index
+    from marketplace.bid_stats import repair_all
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    tag = uuid.uuid4().hex[:8]
+    projects = projects if projects is not None else max(users // 5, 1)
+
+    catalog = Skill.objects.bulk_create(
+        [Skill(name=f"bench-{tag}-skill-{i}", slug=f"bench-{tag}-skill-{i}") for i in range(skills)],
+        batch_size=batch_size,
+    )
+    weights = _skill_weights(skills)
+
+    def pick_skills(lo, hi):
+        return list({s.pk: s for s in rng.choices(catalog, weights=weights, k=rng.randint(lo, hi))}.values())
+
+    people = []
+    for i in range(users):
+        is_freelancer = rng.random() < freelancer_ratio
+        total = rng.randint(0, 50) if is_freelancer else 0
+        people.append(User(
+            email=f"bench-{tag}-{i}@example.com",
+            username=f"bench{tag}{i}",
+            full_name=f"Bench User {i}",
+            password='!',
+            user_type='freelancer' if is_freelancer else 'buyer',
+            skills=[s.name for s in pick_skills(3, 8)] if is_freelancer else [],
+            rating=Decimal(str(round(rng.uniform(0, 5), 2))),
+            trust_score=Decimal(str(round(rng.uniform(0, 100), 2))),
+            total_projects=total,
+            completed_orders=rng.randint(0, total),
+            last_seen=now - timedelta(days=rng.uniform(0, 60)) if is_freelancer else None,
+        ))
+    people = User.objects.bulk_create(people, batch_size=batch_size)
+    if people and people[0].pk is None:
+        # backends that cannot return ids from a bulk insert
+        people = list(User.objects.filter(email__startswith=f"bench-{tag}-"))
+    freelancers = [u for u in people if u.user_type == 'freelancer']
+    buyers = [u for u in people if u.user_type == 'buyer'] or people
+
+    rows, links = [], []
+    for i in range(projects):
+        budget = rng.randint(50, 5000)
+        project = Project(
+            owner=rng.choice(buyers),
+            title=f"Bench project {i}",
+            description="Synthetic project",
+            budget_min=Decimal(budget),
+            budget_max=Decimal(budget * 2),
+            status=rng.choice(PROJECT_STATUSES),
+            created_at=now - timedelta(days=rng.uniform(0, 90)),
+        )
+        rows.append(project)
+        links.extend(Project.skills.through(project_id=project.id, skill_id=s.pk) for s in pick_skills(2, 6))
+    Project.objects.bulk_create(rows, batch_size=batch_size)
+    Project.skills.through.objects.bulk_create(links, batch_size=batch_size)
+
+    bids, contracts, reviews = [], [], []
+    for project in rows:
+        if not freelancers or project.status not in ('in_progress', 'completed') or rng.random() > contract_ratio * 3:
+            continue
+        freelancer = rng.choice(freelancers)
+        bid = Bid(project=project, freelancer=freelancer, amount=project.budget_min, status='accepted')
+        contract = Contract(project=project, bid=bid, buyer=project.owner, freelancer=freelancer,
+                            total_amount=project.budget_min)
+        bids.append(bid)
+        contracts.append(contract)
+        if project.status == 'completed':
+            reviews.append(Review(contract=contract, reviewer=project.owner, reviewee=freelancer,
+                                  rating=Decimal(str(round(rng.uniform(1, 5), 2)))))
+    Bid.objects.bulk_create(bids, batch_size=batch_size)
+    Contract.objects.bulk_create(contracts, batch_size=batch_size)
+    Review.objects.bulk_create(reviews, batch_size=batch_size)
+
+    # derived tables the scoring paths read from (bulk_create skips the bid counters)
+    repair_all(batch_size=batch_size)
+    rebuild_features(batch_size=batch_size)
+    rebuild_index(batch_size=batch_size)
+
+    return {
+        'project_ids': [p.id for p in rows if p.status == 'open'],
+        'freelancer_ids': [u.pk for u in freelancers],
+        'counts': {'users': len(people), 'freelancers': len(freelancers), 'projects': len(rows),
+                   'contracts': len(contracts), 'reviews': len(reviews)},
+    }
+
+
+def measure(fn, *args, **kwargs):
+    """Wall time, query count and peak traced memory (KiB) of one call."""
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            fn(*args, **kwargs)
+            seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': seconds, 'queries': len(ctx.captured_queries), 'peak_kb': peak / 1024}
+
+
+def recommendation_paths():
+    from . import tasks
+    from .utils import calculate_recommendations
+    return [
+        ('compute_recommendations_for_project', tasks.compute_recommendations_for_project, 'project_ids'),
+        ('compute_recommendations_for_user', tasks.compute_recommendations_for_user, 'freelancer_ids'),
+        ('calculate_recommendations', calculate_recommendations, 'project_ids'),
+    ]
+
+
+def _forget_cached_recommendations(data):
+    # the rollback leaves the synthetic ids in the shared cache and local LRU
+    from django.core.cache import cache
+    from .cache import project_recommendations, user_recommendations
+    for recs, ids in ((project_recommendations, data['project_ids']), (user_recommendations, data['freelancer_ids'])):
+        keys = [recs.key(object_id) for object_id in ids]
+        cache.delete_many(keys + [f"{key}:refresh" for key in keys])
+        for key in keys:
+            recs.local.delete(key)
+
+
+def run_benchmark(sizes=(100, 1000, 5000), samples=5, seed=42, paths=None, **generator_options):
+    """
+    Measure every recommendation path at each marketplace size.
+    Returns one row per (size, path) with median time/queries and max peak memory.
+    """
+    results = []
+    for size in sizes:
+        data = None
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                data = generate_marketplace(users=size, seed=seed, **generator_options)
+                setup_seconds = time.perf_counter() - started
+                rng = random.Random(seed)
+                for name, fn, id_key in recommendation_paths():
+                    if paths and name not in paths:
+                        continue
+                    ids = data[id_key]
+                    picked = rng.sample(ids, min(samples, len(ids)))
+                    runs = [measure(fn, object_id) for object_id in picked]
+                    if not runs:
+                        continue
+                    results.append({
+                        'size': size,
+                        'path': name,
+                        'samples': len(runs),
+                        'seconds': round(statistics.median(r['seconds'] for r in runs), 5),
+                        'queries': int(statistics.median(r['queries'] for r in runs)),
+                        'peak_kb': round(max(r['peak_kb'] for r in runs), 1),
+                        'setup_seconds': round(setup_seconds, 2),
+                        **{f"n_{k}": v for k, v in data['counts'].items()},
+                    })
+                transaction.set_rollback(True)
+        finally:
+            if data is not None:
+                _forget_cached_recommendations(data)
+    return results
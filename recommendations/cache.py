@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .models import ProjectRecommendation, UserRecommendation
+from .serializers import ProjectRecommendationSerializer, UserRecommendationSerializer
+from .incremental import stale_at
+
+# Two-level read-through cache for recommendation payloads:
+# per-process LRU -> Django cache -> latest DB row.
+# Stale entries are still served while at most one background refresh per key
+# is scheduled (stale-while-revalidate).
+
+
+class LocalLRU:
+    """Small thread-safe LRU with a per-entry TTL."""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RecommendationCache:
+
+    def __init__(self, prefix, model, lookup, serializer_class, task_name):
+        self.prefix = prefix
+        self.model = model
+        self.lookup = lookup
+        self.serializer_class = serializer_class
+        self.task_name = task_name
+        self.local = LocalLRU(
+            maxsize=getattr(settings, 'RECOMMENDATIONS_LOCAL_CACHE_SIZE', 1024),
+            ttl=getattr(settings, 'RECOMMENDATIONS_LOCAL_CACHE_TTL', 30),
+        )
+        self.counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'refreshes': 0}
+        self._counter_lock = threading.Lock()
+
+    def key(self, object_id):
+        return f"recs:{self.prefix}:{object_id}"
+
+    def _count(self, name):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def _entry(self, rec):
+        return {'data': dict(self.serializer_class(rec).data), 'stale_at': stale_at(rec)}
+
+    def _timeout(self):
+        return getattr(settings, 'RECOMMENDATIONS_SHARED_CACHE_TTL', 86400)
+
+    def store(self, object_id, rec):
+        """Write-through after a new or patched row was saved."""
+        entry = self._entry(rec)
+        key = self.key(object_id)
+        cache.set(key, entry, timeout=self._timeout())
+        self.local.set(key, entry)
+        return entry
+
+    def store_many(self, recs):
+        """Write-through for rows inserted with bulk_create (no post_save)."""
+        entries = {self.key(getattr(rec, self.lookup)): self._entry(rec) for rec in recs}
+        cache.set_many(entries, timeout=self._timeout())
+        for key in entries:
+            self.local.delete(key)
+
+    def get(self, object_id):
+        """
+        Latest serialized recommendation for object_id, or None when nothing
+        is computed yet. Schedules a refresh for missing or stale entries.
+        """
+        key = self.key(object_id)
+        entry = self.local.get(key)
+        if entry is not None:
+            self._count('local_hits')
+        else:
+            entry = cache.get(key)
+            if entry is not None:
+                self._count('shared_hits')
+                self.local.set(key, entry)
+            else:
+                self._count('misses')
+                rec = self.model.objects.filter(**{self.lookup: object_id}).order_by('-computed_at').first()
+                entry = self.store(object_id, rec) if rec else None
+
+        if entry is None or timezone.now() >= entry['stale_at']:
+            self.refresh(object_id)
+        return entry['data'] if entry else None
+
+    def refresh(self, object_id):
+        # cache.add is atomic: only one caller per key gets to schedule the task
+        lock = f"{self.key(object_id)}:refresh"
+        if not cache.add(lock, 1, timeout=getattr(settings, 'RECOMMENDATIONS_REFRESH_LOCK_SECONDS', 300)):
+            return False
+        try:
+            from . import tasks
+            getattr(tasks, self.task_name).delay(str(object_id))
+        except Exception:
+            cache.delete(lock)
+            return False
+        self._count('refreshes')
+        return True
+
+    def release(self, object_id):
+        # only the refresh task itself lets the next refresh in; stores from
+        # patches or batch runs leave a running refresh's lock alone
+        cache.delete(f"{self.key(object_id)}:refresh")
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self.counters)
+        stats['local_size'] = len(self.local._data)
+        return stats
+
+
+project_recommendations = RecommendationCache(
+    'project', ProjectRecommendation, 'project_id', ProjectRecommendationSerializer, 'compute_recommendations_for_project'
+)
+user_recommendations = RecommendationCache(
+    'user', UserRecommendation, 'user_id', UserRecommendationSerializer, 'compute_recommendations_for_user'
+)
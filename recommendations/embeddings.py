@@ -0,0 +1,301 @@
+import json
+import os
+import re
+import zlib
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Offline text matching of projects to freelancers.
+# Texts are embedded with signed feature hashing over word uni/bi-grams (no
+# vocabulary, so new rows never require refitting), vectors live in a
+# memory-mapped float32 matrix and a random-projection LSH index narrows a
+# query down to a few buckets before exact cosine re-ranking. CPU/NumPy only.
+
+DIM = 512
+EXACT_BELOW = 2048
+TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+
+
+def _tokens(text):
+    words = TOKEN_RE.findall((text or '').lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def embed_text(text, dim=DIM):
+    """L2-normalized hashed n-gram vector with sublinear term frequency."""
+    counts = {}
+    for tok in _tokens(text):
+        h = zlib.crc32(tok.encode('utf-8'))
+        counts[h] = counts.get(h, 0) + 1
+    vec = np.zeros(dim, dtype=np.float32)
+    for h, tf in counts.items():
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        vec[h % dim] += sign * (1.0 + np.log(tf))
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+def freelancer_text(user):
+    skills = ' '.join(str(s) for s in (user.skills or []))
+    return ' '.join(filter(None, [user.tagline, user.bio, user.summary, skills]))
+
+
+def project_text(project, skills=None):
+    if skills is None:
+        skills = [s.name for s in project.skills.all()]
+    return ' '.join(filter(None, [project.title, project.description, ' '.join(skills)]))
+
+
+class AnnIndex:
+    """
+    Random-projection LSH over a memory-mapped vector matrix.
+
+    Files in `path`: vectors.npy (capacity x dim float32), codes.npy
+    (capacity x tables uint32 bucket codes), meta.json (ids per row,
+    parameters, last build time) and, per table, the live rows sorted by
+    code (bucket_codes.npy / bucket_rows.npy) so a query finds its buckets
+    with a binary search. Rows are updated in place; the files are only
+    rewritten when capacity has to grow.
+    """
+
+    def __init__(self, path, dim=DIM, tables=8, bits=12, seed=7, capacity=1024):
+        self.path = str(path)
+        self.dim, self.tables, self.bits, self.seed = dim, tables, bits, seed
+        self.ids = []
+        self.built_at = None
+        self._free = []
+        self._sorted = None
+        self._planes = np.random.default_rng(seed).standard_normal((tables, bits, dim)).astype(np.float32)
+        self._powers = (1 << np.arange(bits, dtype=np.uint32)).astype(np.uint32)
+        os.makedirs(self.path, exist_ok=True)
+        self.vectors = self._create('vectors.npy', (capacity, dim), np.float32)
+        self.codes = self._create('codes.npy', (capacity, tables), np.uint32)
+
+    # -- storage ---------------------------------------------------------
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _create(self, name, shape, dtype, copy_from=None):
+        tmp = self._file(name + '.tmp')
+        arr = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtype, shape=shape)
+        if copy_from is not None:
+            arr[:len(copy_from)] = copy_from
+        arr.flush()
+        del arr
+        os.replace(tmp, self._file(name))
+        return np.load(self._file(name), mmap_mode='r+')
+
+    @classmethod
+    def open(cls, path):
+        with open(os.path.join(str(path), 'meta.json')) as fh:
+            meta = json.load(fh)
+        index = cls.__new__(cls)
+        index.path = str(path)
+        index.dim, index.tables, index.bits, index.seed = meta['dim'], meta['tables'], meta['bits'], meta['seed']
+        index.ids = meta['ids']
+        index.built_at = parse_datetime(meta['built_at']) if meta.get('built_at') else None
+        index._free = [i for i, uid in enumerate(index.ids) if uid is None]
+        index._sorted = None
+        index._planes = np.random.default_rng(index.seed).standard_normal(
+            (index.tables, index.bits, index.dim)).astype(np.float32)
+        index._powers = (1 << np.arange(index.bits, dtype=np.uint32)).astype(np.uint32)
+        index.vectors = np.load(index._file('vectors.npy'), mmap_mode='r+')
+        index.codes = np.load(index._file('codes.npy'), mmap_mode='r+')
+        if os.path.exists(index._file('bucket_rows.npy')):
+            index._sorted = (
+                np.load(index._file('bucket_codes.npy'), mmap_mode='r'),
+                np.load(index._file('bucket_rows.npy'), mmap_mode='r'),
+            )
+        return index
+
+    def _write(self, name, arr):
+        tmp = self._file(name + '.tmp')
+        with open(tmp, 'wb') as fh:
+            np.save(fh, arr)
+        os.replace(tmp, self._file(name))
+
+    def save(self):
+        self.vectors.flush()
+        self.codes.flush()
+        bucket_codes, bucket_rows = self._sorted_buckets()
+        self._write('bucket_codes.npy', bucket_codes)
+        self._write('bucket_rows.npy', bucket_rows)
+        meta = {
+            'dim': self.dim, 'tables': self.tables, 'bits': self.bits, 'seed': self.seed,
+            'ids': self.ids, 'built_at': self.built_at.isoformat() if self.built_at else None,
+        }
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w') as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._file('meta.json'))
+
+    def _grow(self, needed):
+        capacity = max(len(self.vectors) * 2, needed)
+        self.vectors = self._create('vectors.npy', (capacity, self.dim), np.float32, copy_from=self.vectors[:len(self.ids)])
+        self.codes = self._create('codes.npy', (capacity, self.tables), np.uint32, copy_from=self.codes[:len(self.ids)])
+
+    # -- updates ---------------------------------------------------------
+
+    def hash(self, vecs):
+        """(n, dim) vectors -> (n, tables) bucket codes."""
+        signs = np.einsum('tbd,nd->ntb', self._planes, vecs) > 0
+        return (signs.astype(np.uint32) * self._powers).sum(axis=2, dtype=np.uint32)
+
+    def upsert(self, ids, vecs):
+        if not len(ids):
+            return
+        vecs = np.asarray(vecs, dtype=np.float32)
+        rows = {uid: i for i, uid in enumerate(self.ids) if uid is not None}
+        targets = []
+        for uid in ids:
+            uid = str(uid)
+            if uid in rows:
+                targets.append(rows[uid])
+            elif self._free:
+                row = self._free.pop()
+                self.ids[row] = uid
+                targets.append(row)
+            else:
+                self.ids.append(uid)
+                targets.append(len(self.ids) - 1)
+        if len(self.ids) > len(self.vectors):
+            self._grow(len(self.ids))
+        targets = np.asarray(targets)
+        self.vectors[targets] = vecs
+        self.codes[targets] = self.hash(vecs)
+        self._sorted = None
+
+    def remove(self, ids):
+        drop = set(str(i) for i in ids)
+        for row, uid in enumerate(self.ids):
+            if uid in drop:
+                self.ids[row] = None
+                self.vectors[row] = 0.0
+                self._free.append(row)
+        self._sorted = None
+
+    # -- queries ---------------------------------------------------------
+
+    def _sorted_buckets(self):
+        """(tables x live) codes in ascending order and the row behind each."""
+        if self._sorted is None:
+            live = np.asarray([i for i, uid in enumerate(self.ids) if uid is not None], dtype=np.int64)
+            bucket_codes = np.empty((self.tables, len(live)), dtype=np.uint32)
+            bucket_rows = np.empty((self.tables, len(live)), dtype=np.int64)
+            for t in range(self.tables):
+                codes = np.asarray(self.codes[live, t]) if len(live) else np.zeros(0, dtype=np.uint32)
+                order = np.argsort(codes, kind='stable')
+                bucket_codes[t] = codes[order]
+                bucket_rows[t] = live[order]
+            self._sorted = (bucket_codes, bucket_rows)
+        return self._sorted
+
+    def query(self, vec, k=50, probes=1):
+        """
+        Approximate top-k (id, cosine) for a query vector. With probes, codes
+        differing in one bit are also visited (multi-probe LSH) for recall.
+        """
+        vec = np.asarray(vec, dtype=np.float32)
+        if len(self.ids) <= EXACT_BELOW:
+            # small indexes: a full scan is cheaper than probing and exact
+            rows = np.asarray([i for i, uid in enumerate(self.ids) if uid is not None], dtype=np.int64)
+            return self._rerank(rows, vec, k)
+        codes = self.hash(vec[None, :])[0]
+        bucket_codes, bucket_rows = self._sorted_buckets()
+        found = []
+        for t, code in enumerate(codes.tolist()):
+            probe_codes = [code]
+            if probes:
+                probe_codes += [code ^ (1 << b) for b in range(self.bits)]
+            probe_codes = np.asarray(probe_codes, dtype=np.uint32)
+            starts = np.searchsorted(bucket_codes[t], probe_codes, side='left')
+            ends = np.searchsorted(bucket_codes[t], probe_codes, side='right')
+            for lo, hi in zip(starts.tolist(), ends.tolist()):
+                if hi > lo:
+                    found.append(np.asarray(bucket_rows[t, lo:hi]))
+        if not found:
+            return []
+        return self._rerank(np.unique(np.concatenate(found)), vec, k)
+
+    def _rerank(self, rows, vec, k):
+        if not len(rows):
+            return []
+        sims = np.asarray(self.vectors[rows]) @ vec
+        top = np.argsort(-sims, kind='stable')[:k]
+        return [(self.ids[rows[i]], float(sims[i])) for i in top if sims[i] > 0]
+
+
+def index_path():
+    return getattr(settings, 'RECOMMENDATIONS_EMBEDDING_DIR', os.path.join(settings.BASE_DIR, 'embeddings'))
+
+
+_opened = {}  # path -> (meta.json stamp, AnnIndex), per process
+
+
+def load_index(cached=True):
+    """
+    The on-disk index, or None when none was built. Readers share one opened
+    index per process until meta.json changes; writers pass cached=False so
+    they never mutate the shared instance.
+    """
+    path = index_path()
+    try:
+        st = os.stat(os.path.join(path, 'meta.json'))
+        # save() replaces meta.json, so a new mtime (or inode) means a new build
+        stamp = (st.st_mtime_ns, st.st_ino)
+        if cached and path in _opened and _opened[path][0] == stamp:
+            return _opened[path][1]
+        index = AnnIndex.open(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    if cached:
+        _opened[path] = (stamp, index)
+    return index
+
+
+def update_freelancer_index(full=False, batch_size=1000):
+    """
+    Incrementally (re)embed freelancers whose FreelancerFeatures row changed
+    since the last build and drop the ones that are gone. full=True rebuilds.
+    """
+    from accounts.models import User
+    from .models import FreelancerFeatures
+
+    index = None if full else load_index(cached=False)
+    if index is None:
+        index = AnnIndex(index_path())
+    started = timezone.now()
+
+    features = FreelancerFeatures.objects.all()
+    live = set(str(uid) for uid in features.values_list('user_id', flat=True))
+    index.remove([uid for uid in index.ids if uid is not None and uid not in live])
+
+    changed = features if index.built_at is None else features.filter(updated_at__gte=index.built_at)
+    users = User.objects.filter(id__in=changed.values('user_id')).only('id', 'tagline', 'bio', 'summary', 'skills')
+    ids, vecs, total = [], [], 0
+    for user in users.iterator(chunk_size=batch_size):
+        ids.append(user.pk)
+        vecs.append(embed_text(freelancer_text(user), index.dim))
+        if len(ids) >= batch_size:
+            index.upsert(ids, np.vstack(vecs))
+            total += len(ids)
+            ids, vecs = [], []
+    if ids:
+        index.upsert(ids, np.vstack(vecs))
+        total += len(ids)
+
+    index.built_at = started
+    index.save()
+    return total
+
+
+def ann_candidate_ids(project, k=200, skills=None, index=None):
+    """Freelancer ids whose profile text is closest to the project text."""
+    index = index or load_index()
+    if index is None:
+        return []
+    vec = embed_text(project_text(project, skills), index.dim)
+    return [uid for uid, _ in index.query(vec, k=k)]
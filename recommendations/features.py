@@ -0,0 +1,94 @@
+import numpy as np
+from django.db.models.functions import Lower
+from marketplace.models import Skill
+from accounts.models import User
+from .models import FreelancerFeatures
+from .utils import rating_factor, trust_score_factor
+
+# Maintenance of the FreelancerFeatures table (denormalized scoring inputs).
+
+FEATURE_USER_FIELDS = {'skills', 'rating', 'trust_score', 'last_seen', 'total_projects', 'completed_orders', 'user_type', 'is_active',
+                       'tagline', 'bio', 'summary'}  # profile text feeds the embedding index via updated_at
+
+
+def encode_skill_bits(skill_ids):
+    """Little-endian bitset, bit i set for every marketplace.Skill id i."""
+    ids = np.asarray(sorted(set(skill_ids)), dtype=np.int64)
+    if not len(ids):
+        return b''
+    bits = np.zeros(int(ids.max()) + 1, dtype=np.uint8)
+    bits[ids] = 1
+    return np.packbits(bits, bitorder='little').tobytes()
+
+
+def _catalog_ids(tokens):
+    if not tokens:
+        return []
+    return list(
+        Skill.objects.annotate(lname=Lower('name')).filter(lname__in=tokens).values_list('id', flat=True)
+    )
+
+
+def build_features(user, catalog=None):
+    """Unsaved FreelancerFeatures for a user; catalog maps lowercase name -> [skill ids]."""
+    tokens = sorted(set(str(s).lower() for s in (user.skills or [])))
+    if catalog is None:
+        ids = _catalog_ids(tokens)
+    else:
+        ids = [sid for t in tokens for sid in catalog.get(t, ())]
+    total = user.total_projects or 0
+    return FreelancerFeatures(
+        user_id=user.pk,
+        skills=tokens,
+        skill_count=len(tokens),
+        skill_bits=encode_skill_bits(ids),
+        rating=rating_factor(user),
+        trust=trust_score_factor(user),
+        past_success=(user.completed_orders / total) if total > 0 else 0.0,
+        last_seen=user.last_seen,
+    )
+
+
+def refresh_freelancer_features(user):
+    """Upsert (or drop, for non-freelancers) the features row of one user."""
+    if user.user_type != 'freelancer' or not user.is_active:
+        FreelancerFeatures.objects.filter(user_id=user.pk).delete()
+        return None
+    f = build_features(user)
+    FreelancerFeatures.objects.update_or_create(
+        user_id=user.pk,
+        defaults={field: getattr(f, field) for field in
+                  ('skills', 'skill_count', 'skill_bits', 'rating', 'trust', 'past_success', 'last_seen')},
+    )
+    return f
+
+
+def refresh_for_user_id(user_id):
+    try:
+        return refresh_freelancer_features(User.objects.get(pk=user_id))
+    except User.DoesNotExist:
+        return None
+
+
+def rebuild_features(batch_size=1000):
+    """Rebuild the whole table; also repairs drift from queryset.update() writes."""
+    catalog = {}
+    for sid, name in Skill.objects.values_list('id', 'name'):
+        catalog.setdefault(str(name).lower(), []).append(sid)
+
+    FreelancerFeatures.objects.exclude(user__user_type='freelancer', user__is_active=True).delete()
+    users = User.objects.filter(user_type='freelancer', is_active=True).only(
+        'id', 'skills', 'rating', 'trust_score', 'last_seen', 'total_projects', 'completed_orders', 'user_type'
+    )
+    batch, total = [], 0
+    fields = ['skills', 'skill_count', 'skill_bits', 'rating', 'trust', 'past_success', 'last_seen', 'updated_at']
+    for user in users.iterator(chunk_size=batch_size):
+        batch.append(build_features(user, catalog))
+        if len(batch) >= batch_size:
+            FreelancerFeatures.objects.bulk_create(batch, update_conflicts=True, unique_fields=['user'], update_fields=fields)
+            total += len(batch)
+            batch = []
+    if batch:
+        FreelancerFeatures.objects.bulk_create(batch, update_conflicts=True, unique_fields=['user'], update_fields=fields)
+        total += len(batch)
+    return total
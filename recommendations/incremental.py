@@ -0,0 +1,201 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+from marketplace.models import Project
+from accounts.models import User
+from .models import ProjectRecommendation, ProjectRecommendationMember, UserRecommendation
+from .retention import drop_older_duplicates
+from .utils import compute_candidate_score, skill_overlap_score, project_skill_names, CandidatePool
+from .index import candidate_user_ids
+
+# Incremental refresh: instead of recomputing whole recommendation lists on a
+# timer, change events patch the single entry they affect in the latest
+# cached payloads. A full recompute still runs every FULL_REFRESH_SECONDS to
+# pick up recency drift.
+
+PROJECT_TOP_K = 10
+USER_TOP_K = 20
+SCORE_THRESHOLD = 0.01
+
+# User fields that feed compute_candidate_score
+SCORED_USER_FIELDS = {'rating', 'trust_score', 'skills', 'last_seen', 'total_projects', 'completed_orders', 'user_type'}
+# ...of which these schedule a patch; last_seen only moves the recency boost
+# and is picked up by the periodic full recompute
+PATCH_USER_FIELDS = SCORED_USER_FIELDS - {'last_seen'}
+
+
+def incremental_enabled():
+    return getattr(settings, 'RECOMMENDATIONS_INCREMENTAL', True)
+
+
+def full_refresh_seconds():
+    return getattr(settings, 'RECOMMENDATIONS_FULL_REFRESH_SECONDS', 86400)
+
+
+def stale_at(rec):
+    """When a cached recommendation row needs a full recompute."""
+    ttl = rec.ttl_seconds
+    if incremental_enabled():
+        ttl = max(ttl, full_refresh_seconds())
+    return rec.computed_at + timedelta(seconds=ttl)
+
+
+def is_stale(rec):
+    return timezone.now() >= stale_at(rec)
+
+
+def patch_payload(payload, key, item_id, score, top_k):
+    """
+    Return a new payload with item_id re-scored: the old entry is dropped and
+    the new one inserted in order if it still makes the top_k.
+    A dropped entry is not back-filled (the next candidate is not known
+    here), so the list can shrink below top_k; callers schedule a full
+    recompute when that happens, see needs_refill.
+    """
+    item_id = str(item_id)
+    items = [p for p in (payload or []) if str(p.get(key)) != item_id]
+    if score > SCORE_THRESHOLD:
+        pos = len(items)
+        for i, p in enumerate(items):
+            if score > p.get('score', 0):
+                pos = i
+                break
+        items.insert(pos, {key: item_id, 'score': score, 'reason': 'heuristic'})
+    return items[:top_k]
+
+
+def needs_refill(old_payload, new_payload, top_k):
+    # a full list lost an entry, so someone outside it may now qualify
+    return len(old_payload or []) >= top_k and len(new_payload) < top_k
+
+
+def sync_members(recs):
+    """Point ProjectRecommendationMember at the given (latest) project recommendation rows."""
+    recs = list(recs)
+    if not recs:
+        return
+    ProjectRecommendationMember.objects.filter(project_id__in=[r.project_id for r in recs]).delete()
+    ProjectRecommendationMember.objects.bulk_create(
+        [ProjectRecommendationMember(project_id=r.project_id, user_id=int(p['user_id']))
+         for r in recs for p in (r.payload or []) if p.get('user_id')],
+        ignore_conflicts=True,
+    )
+
+
+def _latest(queryset, field):
+    latest = {}
+    for rec in queryset.order_by(field, '-computed_at'):
+        latest.setdefault(getattr(rec, field), rec)
+    return list(latest.values())
+
+
+def affected_project_ids(user):
+    """Open projects with a cached recommendation the user could enter or leave."""
+    skills = [str(s).strip() for s in (user.skills or []) if str(s).strip()]
+    cond = Q()
+    for s in skills:
+        cond |= Q(skills__name__iexact=s)
+    ids = set()
+    if skills:
+        ids.update(Project.objects.filter(cond, status='open').values_list('id', flat=True).distinct())
+    cached = set(ProjectRecommendation.objects.filter(project_id__in=ids).values_list('project_id', flat=True).distinct())
+    # plus lists the user is already in (skills may have been removed)
+    cached.update(ProjectRecommendationMember.objects.filter(user_id=user.pk).values_list('project_id', flat=True))
+    return cached
+
+
+def patch_project_recommendations_for_user(user, top_k=PROJECT_TOP_K):
+    """Re-score one freelancer inside the cached lists of the projects it can affect."""
+    project_ids = affected_project_ids(user)
+    if not project_ids:
+        return 0
+    projects = {
+        p.id: p for p in Project.objects.filter(id__in=project_ids).prefetch_related('skills')
+    }
+    patched = 0
+    refill = []
+    now = timezone.now()
+    for rec in _latest(ProjectRecommendation.objects.filter(project_id__in=project_ids), 'project_id'):
+        project = projects.get(rec.project_id)
+        score = 0.0
+        if project is not None and project.status == 'open' and user.user_type == 'freelancer':
+            project_skills = project_skill_names(project)
+            # full recomputes only consider skill-sharing candidates, keep patches consistent
+            if skill_overlap_score(project_skills, user.skills) > 0:
+                score = compute_candidate_score(project, user, project_skills=project_skills)
+        payload = patch_payload(rec.payload, 'user_id', user.pk, score, top_k)
+        if payload != rec.payload:
+            if needs_refill(rec.payload, payload, top_k):
+                refill.append(rec.project_id)
+            rec.payload = payload
+            rec.patched_at = now
+            drop_older_duplicates(rec, 'project_id')
+            rec.save(update_fields=['payload', 'patched_at'])
+            patched += 1
+    _schedule_refill('compute_recommendations_for_project', refill)
+    return patched
+
+
+def _schedule_refill(task_name, ids):
+    from . import tasks
+    for object_id in ids:
+        try:
+            getattr(tasks, task_name).delay(str(object_id))
+        except Exception:
+            pass
+
+
+def affected_user_ids(project):
+    """Freelancers with a cached recommendation list who share a skill with the project."""
+    skills = project_skill_names(project)
+    if not skills:
+        return set()
+    return set(
+        UserRecommendation.objects.filter(
+            user_id__in=candidate_user_ids(skills), user__user_type='freelancer'
+        ).values_list('user_id', flat=True).distinct()
+    )
+
+
+def patch_user_recommendations_for_project(project, top_k=USER_TOP_K):
+    """Insert a newly opened project into the cached lists of matching freelancers."""
+    user_ids = affected_user_ids(project)
+    if not user_ids or project.status != 'open':
+        return 0
+    pool = CandidatePool.from_queryset(User.objects.filter(id__in=user_ids))
+    scores = dict(zip(pool.ids, pool.score(project_skill_names(project))))
+    patched = 0
+    refill = []
+    now = timezone.now()
+    for rec in _latest(UserRecommendation.objects.filter(user_id__in=user_ids), 'user_id'):
+        score = float(scores.get(str(rec.user_id), 0.0))
+        payload = patch_payload(rec.payload, 'project_id', project.id, score, top_k)
+        if payload != rec.payload:
+            if needs_refill(rec.payload, payload, top_k):
+                refill.append(rec.user_id)
+            rec.payload = payload
+            rec.patched_at = now
+            drop_older_duplicates(rec, 'user_id')
+            rec.save(update_fields=['payload', 'patched_at'])
+            patched += 1
+    _schedule_refill('compute_recommendations_for_user', refill)
+    return patched
+
+
+def schedule_patch(task, object_id, delay=None):
+    """
+    Enqueue `task` for object_id at most once per debounce window; the task
+    runs after the window so it sees the latest state of bursty updates.
+    """
+    delay = delay if delay is not None else getattr(settings, 'RECOMMENDATIONS_PATCH_DEBOUNCE_SECONDS', 30)
+    key = f"recs:patch:{task.name}:{object_id}"
+    if not cache.add(key, 1, timeout=delay or 1):
+        return False
+    try:
+        task.apply_async((str(object_id),), countdown=delay)
+    except Exception:
+        cache.delete(key)
+        return False
+    return True
@@ -0,0 +1,74 @@
+from django.db import transaction
+from .models import SkillPosting
+
+# Inverted skill index maintenance & lookup.
+# Postings are kept per source so profile and category skills can be
+# re-synced independently without clobbering each other.
+
+
+def normalize_skill(name):
+    return str(name).strip().lower()
+
+
+def _sync_postings(user_id, source, skills):
+    wanted = set(normalize_skill(s) for s in (skills or []) if str(s).strip())
+    with transaction.atomic():
+        current = set(
+            SkillPosting.objects.filter(user_id=user_id, source=source).values_list('skill', flat=True)
+        )
+        stale = current - wanted
+        if stale:
+            SkillPosting.objects.filter(user_id=user_id, source=source, skill__in=stale).delete()
+        fresh = wanted - current
+        if fresh:
+            SkillPosting.objects.bulk_create(
+                [SkillPosting(skill=s, user_id=user_id, source=source) for s in fresh],
+                ignore_conflicts=True,
+            )
+
+
+def index_user_profile_skills(user):
+    """Sync postings for User.skills (only freelancers are indexed)."""
+    skills = user.skills if user.user_type == 'freelancer' and user.is_active else []
+    _sync_postings(user.pk, 'profile', skills)
+
+
+def index_user_category_skills(user_id):
+    """Sync postings for the skills of all FreelancerCategory rows of a user."""
+    from categories.models import Skill
+    names = Skill.objects.filter(freelancercategory__user_id=user_id).values_list('name', flat=True).distinct()
+    _sync_postings(user_id, 'category', names)
+
+
+def candidate_user_ids(skills):
+    """
+    Ids of freelancers sharing at least one skill with `skills`.
+    Returns a values_list queryset usable as an `id__in` subquery.
+    """
+    keys = set(normalize_skill(s) for s in (skills or []))
+    return SkillPosting.objects.filter(skill__in=keys).values_list('user_id', flat=True).distinct()
+
+
+def rebuild_index(batch_size=1000):
+    """Drop and rebuild every posting from User and FreelancerCategory data."""
+    from accounts.models import User
+    from categories.models import FreelancerCategory
+
+    SkillPosting.objects.all().delete()
+    postings = []
+    users = User.objects.filter(user_type='freelancer', is_active=True).values_list('id', 'skills')
+    for uid, skills in users.iterator(chunk_size=batch_size):
+        for s in set(normalize_skill(s) for s in (skills or []) if str(s).strip()):
+            postings.append(SkillPosting(skill=s, user_id=uid, source='profile'))
+        if len(postings) >= batch_size:
+            SkillPosting.objects.bulk_create(postings, ignore_conflicts=True)
+            postings = []
+
+    pairs = FreelancerCategory.skills.through.objects.values_list('freelancercategory__user_id', 'skill__name')
+    for uid, name in pairs.iterator(chunk_size=batch_size):
+        postings.append(SkillPosting(skill=normalize_skill(name), user_id=uid, source='category'))
+        if len(postings) >= batch_size:
+            SkillPosting.objects.bulk_create(postings, ignore_conflicts=True)
+            postings = []
+    SkillPosting.objects.bulk_create(postings, ignore_conflicts=True)
+    return SkillPosting.objects.count()
@@ -0,0 +1,40 @@
+import json
+from django.core.management.base import BaseCommand
+from recommendations.benchmark import run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmark the recommendation paths on a synthetic marketplace (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,5000', help="Comma separated user counts")
+        parser.add_argument('--projects-ratio', type=float, default=0.2, help="Projects generated per user")
+        parser.add_argument('--skills', type=int, default=60)
+        parser.add_argument('--samples', type=int, default=5, help="Calls measured per path and size")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--path', action='append', dest='paths', help="Only run this path (repeatable)")
+        parser.add_argument('--json', dest='json_path', help="Also write results to this file")
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        results = []
+        for size in sizes:
+            rows = run_benchmark(
+                sizes=[size],
+                samples=options['samples'],
+                seed=options['seed'],
+                paths=options['paths'],
+                projects=max(int(size * options['projects_ratio']), 1),
+                skills=options['skills'],
+            )
+            for row in rows:
+                self.stdout.write(
+                    f"{row['size']:>7} users  {row['path']:<38} {row['seconds'] * 1000:>10.1f} ms "
+                    f"{row['queries']:>6} queries {row['peak_kb']:>10.1f} KiB peak"
+                )
+            results.extend(rows)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['json_path']}"))
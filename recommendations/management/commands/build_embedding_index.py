@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from recommendations.embeddings import update_freelancer_index
+
+
+class Command(BaseCommand):
+    help = "Build or incrementally update the freelancer text embedding (LSH) index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rebuild from scratch instead of updating changed profiles")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = update_freelancer_index(full=options['full'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Embedded {total} freelancer profiles."))
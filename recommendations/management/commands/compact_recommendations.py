@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from recommendations.retention import compact_all
+
+
+class Command(BaseCommand):
+    help = "Keep only the latest N recommendation snapshots per project/user"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=None)
+        parser.add_argument('--archive-dir', default=None, help="write removed rows to gzipped JSONL files here")
+
+    def handle(self, *args, **options):
+        result = compact_all(keep=options['keep'], archive_dir=options['archive_dir'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {result['project']} project and {result['user']} user recommendation snapshots."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from recommendations.pipeline import precompute_project_recommendations
+
+
+class Command(BaseCommand):
+    help = "Precompute recommendations for all open projects and report throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        stats = precompute_project_recommendations(
+            chunk_size=options['chunk_size'],
+            top_k=options['top_k'],
+            workers=options['workers'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Precomputed {stats['projects']} projects against {stats['freelancers']} freelancers "
+            f"in {stats['seconds']}s ({stats['projects_per_sec']} projects/sec, {stats['workers']} workers)"
+        ))
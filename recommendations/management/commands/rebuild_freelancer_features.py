@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from recommendations.features import rebuild_features
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized FreelancerFeatures table used for scoring"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_features(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt features for {total} freelancers."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from recommendations.index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the inverted skill index used for recommendation candidate generation"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} skill postings."))
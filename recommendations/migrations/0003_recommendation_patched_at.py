@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0002_skillposting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectrecommendation',
+            name='patched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userrecommendation',
+            name='patched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_has_passed_basic_english_test_and_more'),
+        ('recommendations', '0003_recommendation_patched_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreelancerFeatures',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='freelancer_features', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('skills', models.JSONField(blank=True, default=list)),
+                ('skill_count', models.PositiveIntegerField(default=0)),
+                ('skill_bits', models.BinaryField(blank=True, default=b'')),
+                ('rating', models.FloatField(default=0.0)),
+                ('trust', models.FloatField(default=0.0)),
+                ('past_success', models.FloatField(default=0.0)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+def backfill_members(apps, schema_editor):
+    ProjectRecommendation = apps.get_model('recommendations', 'ProjectRecommendation')
+    ProjectRecommendationMember = apps.get_model('recommendations', 'ProjectRecommendationMember')
+    latest = {}
+    for rec in ProjectRecommendation.objects.order_by('project_id', '-computed_at').iterator():
+        latest.setdefault(rec.project_id, rec)
+    ProjectRecommendationMember.objects.bulk_create(
+        [ProjectRecommendationMember(project_id=rec.project_id, user_id=int(p['user_id']))
+         for rec in latest.values() for p in (rec.payload or []) if p.get('user_id')],
+        ignore_conflicts=True, batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0004_freelancerfeatures'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectRecommendationMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.UUIDField()),
+                ('user_id', models.IntegerField(db_index=True)),
+            ],
+            options={
+                'unique_together': {('project_id', 'user_id')},
+            },
+        ),
+        migrations.RunPython(backfill_members, migrations.RunPython.noop),
+    ]
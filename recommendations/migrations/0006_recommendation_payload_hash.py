@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:16
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+
+def _digest(payload, source):
+    # frozen copy of recommendations.models.payload_digest
+    blob = json.dumps([source, payload], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def backfill_hashes(apps, schema_editor):
+    # newest first: older snapshots identical to a newer one are redundant
+    for model_name, key in (('ProjectRecommendation', 'project_id'), ('UserRecommendation', 'user_id')):
+        model = apps.get_model('recommendations', model_name)
+        seen, duplicates = set(), []
+        for rec in model.objects.order_by(key, '-computed_at').only('id', key, 'payload', 'source').iterator():
+            digest = _digest(rec.payload, rec.source)
+            if (getattr(rec, key), digest) in seen:
+                duplicates.append(rec.id)
+                continue
+            seen.add((getattr(rec, key), digest))
+            model.objects.filter(id=rec.id).update(payload_hash=digest)
+        for i in range(0, len(duplicates), 500):
+            model.objects.filter(id__in=duplicates[i:i + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0005_project_recommendation_member'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectrecommendation',
+            name='payload_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='userrecommendation',
+            name='payload_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='projectrecommendation',
+            constraint=models.UniqueConstraint(fields=('project_id', 'payload_hash'), name='project_rec_payload_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='userrecommendation',
+            constraint=models.UniqueConstraint(fields=('user', 'payload_hash'), name='user_rec_payload_uniq'),
+        ),
+    ]
@@ -1,11 +1,33 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
+import hashlib
+import json
 import uuid
 
 User = settings.AUTH_USER_MODEL
 
-class ProjectRecommendation(models.Model):
+
+def payload_digest(payload, source='heuristic'):
+    """Content key of a snapshot; identical snapshots of one owner share it."""
+    blob = json.dumps([source, payload], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class DigestedPayload:
+    """Keeps payload_hash in step with payload on save()."""
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'payload' in update_fields or 'source' in update_fields:
+            self.payload_hash = payload_digest(self.payload, self.source)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'payload_hash'}
+        return super().save(*args, **kwargs)
+
+
+class ProjectRecommendation(DigestedPayload, models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project_id = models.UUIDField(db_index=True)  # marketplace.Project.id
@@ -13,16 +35,20 @@ class ProjectRecommendation(models.Model):
     payload = models.JSONField(default=list, help_text="List of {user_id, score, reason}")  # ordered descending
     source = models.CharField(max_length=50, default="heuristic")  # 'heuristic' or 'ml'
     ttl_seconds = models.IntegerField(default=3600)  # cache TTL
+    patched_at = models.DateTimeField(blank=True, null=True)  # last incremental patch
+    payload_hash = models.CharField(max_length=64, blank=True, null=True)  # see payload_digest
 
     class Meta:
         indexes = [
             models.Index(fields=['project_id','computed_at']),
         ]
+        # an unchanged re-run bumps computed_at instead of adding a snapshot
+        constraints = [models.UniqueConstraint(fields=['project_id', 'payload_hash'], name='project_rec_payload_uniq')]
 
     def __str__(self):
         return f"Recommendations for {self.project_id} @ {self.computed_at.isoformat()}"
 
-class UserRecommendation(models.Model):
+class UserRecommendation(DigestedPayload, models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recommendations')
@@ -30,12 +56,66 @@ class UserRecommendation(models.Model):
     payload = models.JSONField(default=list, help_text="List of {project_id, score, reason}")
     source = models.CharField(max_length=50, default="heuristic")
     ttl_seconds = models.IntegerField(default=3600)
+    patched_at = models.DateTimeField(blank=True, null=True)
+    payload_hash = models.CharField(max_length=64, blank=True, null=True)  # see payload_digest
 
     class Meta:
         indexes = [
             models.Index(fields=['user','computed_at']),
         ]
+        constraints = [models.UniqueConstraint(fields=['user', 'payload_hash'], name='user_rec_payload_uniq')]
 
     def __str__(self):
         return f"Recommendations for {self.user_id} @ {self.computed_at.isoformat()}"
 
+
+class ProjectRecommendationMember(models.Model):
+    """
+    Which freelancers appear in a project's latest cached recommendation list.
+    Lets the incremental patch find lists a freelancer must leave (e.g. after
+    dropping a skill) without scanning payload JSON, on every database.
+    """
+    project_id = models.UUIDField()
+    user_id = models.IntegerField(db_index=True)
+
+    class Meta:
+        unique_together = ('project_id', 'user_id')
+
+
+class SkillPosting(models.Model):
+    """
+    Inverted skill index: one row per (normalized skill, freelancer, source).
+    Lets candidate generation fetch only freelancers sharing a project skill.
+    """
+    SOURCE_CHOICES = [
+        ('profile', 'Profile skills'),
+        ('category', 'Freelancer category skills'),
+    ]
+    skill = models.CharField(max_length=150, db_index=True)  # normalized (lowercase) skill name
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_postings')
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='profile')
+
+    class Meta:
+        unique_together = ('skill', 'user', 'source')
+
+    def __str__(self):
+        return f"{self.skill} -> {self.user_id} ({self.source})"
+
+
+class FreelancerFeatures(models.Model):
+    """
+    Denormalized scoring inputs, one compact row per freelancer.
+    Values are pre-normalized the same way the heuristic scorer does it.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='freelancer_features')
+    skills = models.JSONField(default=list, blank=True)  # normalized (lowercase) skill names
+    skill_count = models.PositiveIntegerField(default=0)
+    skill_bits = models.BinaryField(default=b'', blank=True)  # bit i set -> marketplace.Skill id i
+    rating = models.FloatField(default=0.0)  # 0..1
+    trust = models.FloatField(default=0.0)  # 0..1
+    past_success = models.FloatField(default=0.0)  # completed_orders / total_projects
+    last_seen = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features for {self.user_id}"
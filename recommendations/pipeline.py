@@ -0,0 +1,127 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from marketplace.models import Project
+from .models import ProjectRecommendation, FreelancerFeatures, payload_digest
+from .utils import CandidatePool
+from .cache import project_recommendations
+from .incremental import sync_members
+
+# Bulk precompute of project recommendations.
+# The freelancer pool is loaded once and shared with worker processes; the
+# workers only do NumPy ranking, every DB read/write stays in the parent.
+
+_worker_pool = None
+
+
+def _init_worker(pool):
+    global _worker_pool
+    _worker_pool = pool
+
+
+def rank_chunk(pool, chunk, top_k, threshold, now):
+    """chunk: [(project_id, [skill names]), ...] -> [(project_id, payload), ...]"""
+    results = []
+    for project_id, skills in chunk:
+        payload = [
+            {'user_id': uid, 'score': score, 'reason': 'heuristic'}
+            for uid, score in pool.rank(skills, k=top_k, threshold=threshold, now=now, require_overlap=True)
+        ]
+        results.append((project_id, payload))
+    return results
+
+
+def _rank_chunk_in_worker(chunk, top_k, threshold, now):
+    return rank_chunk(_worker_pool, chunk, top_k, threshold, now)
+
+
+def iter_open_project_chunks(chunk_size):
+    """Stream open projects as [(project_id, [skill names]), ...] chunks."""
+    ids = Project.objects.filter(status='open').order_by('created_at').values_list('id', flat=True)
+    batch = []
+    for pid in ids.iterator(chunk_size=chunk_size):
+        batch.append(pid)
+        if len(batch) >= chunk_size:
+            yield _with_skills(batch)
+            batch = []
+    if batch:
+        yield _with_skills(batch)
+
+
+def _with_skills(project_ids):
+    skills = {pid: [] for pid in project_ids}
+    rows = Project.skills.through.objects.filter(project_id__in=project_ids).values_list('project_id', 'skill__name')
+    for pid, name in rows:
+        skills[pid].append(name)
+    return [(pid, skills[pid]) for pid in project_ids]
+
+
+def _can_fork():
+    # celery prefork children are daemonic and may not start their own processes
+    return not multiprocessing.current_process().daemon
+
+
+def precompute_project_recommendations(chunk_size=500, top_k=10, threshold=0.01, workers=None):
+    """
+    Rank every open project against the whole freelancer pool and bulk insert
+    one ProjectRecommendation per project. Returns throughput stats.
+    """
+    if workers is None:
+        workers = getattr(settings, 'RECOMMENDATIONS_PRECOMPUTE_WORKERS', multiprocessing.cpu_count())
+    if workers > 1 and not _can_fork():
+        workers = 1
+
+    started = time.monotonic()
+    now = timezone.now()
+    pool = CandidatePool.from_features(FreelancerFeatures.objects.all())
+    loaded = time.monotonic()
+
+    total = 0
+
+    def save(results):
+        # bulk_create skips save(), so the payload_hash is set here; an unchanged
+        # list only bumps computed_at, which keeps re-runs idempotent
+        recs = ProjectRecommendation.objects.bulk_create(
+            [ProjectRecommendation(project_id=pid, computed_at=now, payload=payload, source='heuristic',
+                                   payload_hash=payload_digest(payload))
+             for pid, payload in results],
+            batch_size=chunk_size,
+            update_conflicts=True,
+            unique_fields=['project_id', 'payload_hash'],
+            update_fields=['computed_at'],
+        )
+        project_recommendations.store_many(recs)
+        sync_members(recs)
+        return len(results)
+
+    chunks = iter_open_project_chunks(chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            total += save(rank_chunk(pool, chunk, top_k, threshold, now))
+    else:
+        # forked workers must not inherit open DB connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pool,)) as executor:
+            executor.submit(int).result()  # fork every worker before the parent reconnects
+            # bounded window of in-flight chunks keeps memory flat
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_rank_chunk_in_worker, chunk, top_k, threshold, now))
+                if len(pending) >= workers * 2:
+                    total += save(pending.popleft().result())
+            while pending:
+                total += save(pending.popleft().result())
+
+    elapsed = time.monotonic() - started
+    return {
+        'projects': total,
+        'freelancers': len(pool),
+        'workers': workers,
+        'load_seconds': round(loaded - started, 3),
+        'seconds': round(elapsed, 3),
+        'projects_per_sec': round(total / elapsed, 2) if elapsed > 0 else 0.0,
+    }
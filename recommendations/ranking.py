@@ -0,0 +1,65 @@
+import heapq
+from itertools import count
+
+# Bounded top-K selection for recommendation ranking.
+# Keeps O(K) memory instead of collecting and sorting every scored candidate.
+
+
+class TopK:
+    """
+    Min-heap of the k best (score, item) pairs seen so far.
+    Ties keep the earliest item, same as sorted(..., reverse=True)[:k].
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._seq = count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    @property
+    def floor(self):
+        # score a new candidate has to beat once the heap is full
+        return self._heap[0][0] if len(self._heap) >= self.k else None
+
+    def can_beat(self, ceiling):
+        return self.k > 0 and (self.floor is None or ceiling > self.floor)
+
+    def push(self, score, item):
+        if self.k <= 0:
+            return
+        entry = (score, -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """(score, item) pairs, best first."""
+        return [(s, item) for s, _, item in sorted(self._heap, key=lambda e: (e[0], e[1]), reverse=True)]
+
+
+def rank_candidates(candidates, k, score_fn, ceiling_fn=None, threshold=None):
+    """
+    Stream `candidates` through a TopK heap.
+
+    ceiling_fn(candidate) must return an upper bound of score_fn(candidate);
+    when it cannot beat the current k-th score (or threshold) the full
+    score_fn is skipped. Returns [(score, candidate), ...] best first.
+    """
+    top = TopK(k)
+    for c in candidates:
+        if ceiling_fn is not None:
+            ceiling = ceiling_fn(c)
+            if not top.can_beat(ceiling) or (threshold is not None and ceiling <= threshold):
+                continue
+        try:
+            score = score_fn(c)
+        except Exception:
+            continue
+        if threshold is not None and score <= threshold:
+            continue
+        top.push(score, c)
+    return top.items()
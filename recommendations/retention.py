@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from .models import ProjectRecommendation, UserRecommendation, payload_digest
+
+# Retention for recommendation history: keep the latest N snapshots per
+# project/user, optionally archiving older ones to gzipped JSONL files.
+
+ARCHIVE_FIELDS = ('id', 'computed_at', 'payload', 'source', 'ttl_seconds', 'patched_at')
+
+
+def save_recommendation(model, lookup, payload, source='heuristic'):
+    """
+    Upsert write path keyed on (owner, payload_hash): a snapshot identical to
+    a stored one only has its computed_at bumped (so it is the latest again),
+    otherwise a new snapshot row is created.
+    """
+    now = timezone.now()
+    return model.objects.update_or_create(
+        payload_hash=payload_digest(payload, source), **lookup,
+        defaults={'computed_at': now},
+        create_defaults={'computed_at': now, 'payload': payload, 'source': source},
+    )
+
+
+def drop_older_duplicates(rec, key_field):
+    """Before re-saving rec with a new payload: drop an older snapshot holding the same content."""
+    rec.payload_hash = payload_digest(rec.payload, rec.source)
+    type(rec).objects.filter(**{key_field: getattr(rec, key_field)}, payload_hash=rec.payload_hash).exclude(pk=rec.pk).delete()
+
+
+def _excess_rows(model, key_field, keep):
+    ranked = model.objects.annotate(
+        snapshot_rank=Window(RowNumber(), partition_by=[F(key_field)], order_by=F('computed_at').desc())
+    )
+    return ranked.filter(snapshot_rank__gt=keep).values(key_field, *ARCHIVE_FIELDS)
+
+
+def compact(model, key_field, keep=None, archive_dir=None, batch_size=1000):
+    """Delete all but the `keep` newest rows per key. Returns deleted row count."""
+    keep = keep if keep is not None else getattr(settings, 'RECOMMENDATIONS_KEEP_SNAPSHOTS', 3)
+    archive_dir = archive_dir if archive_dir is not None else getattr(settings, 'RECOMMENDATIONS_ARCHIVE_DIR', None)
+    archive = None
+    deleted = 0
+    try:
+        while True:
+            rows = list(_excess_rows(model, key_field, keep)[:batch_size])
+            if not rows:
+                break
+            if archive_dir:
+                if archive is None:
+                    os.makedirs(archive_dir, exist_ok=True)
+                    path = os.path.join(archive_dir, f"{model._meta.db_table}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz")
+                    archive = gzip.open(path, 'at', encoding='utf-8')
+                for row in rows:
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            model.objects.filter(id__in=[r['id'] for r in rows]).delete()
+            deleted += len(rows)
+    finally:
+        if archive is not None:
+            archive.close()
+    return deleted
+
+
+def compact_all(keep=None, archive_dir=None):
+    return {
+        'project': compact(ProjectRecommendation, 'project_id', keep=keep, archive_dir=archive_dir),
+        'user': compact(UserRecommendation, 'user_id', keep=keep, archive_dir=archive_dir),
+    }
@@ -24,3 +24,170 @@ if Project is not None:
             tasks.compute_recommendations_for_project.delay(str(instance.project.id))
         except Exception:
             pass
+
+
+# Keep the inverted skill index in sync with freelancer skills
+from django.db.models.signals import post_delete, m2m_changed
+from django.contrib.auth import get_user_model
+from . import index
+
+INDEXED_USER_FIELDS = {'skills', 'user_type', 'is_active'}
+
+
+@receiver(post_save, sender=get_user_model())
+def on_user_saved_index_skills(sender, instance, created, update_fields=None, **kwargs):
+    # skip frequent partial saves (mark_online, rating updates...) that cannot change postings
+    if update_fields and not INDEXED_USER_FIELDS.intersection(update_fields):
+        return
+    try:
+        index.index_user_profile_skills(instance)
+    except Exception:
+        pass
+
+
+try:
+    from categories.models import FreelancerCategory
+except Exception:
+    FreelancerCategory = None
+
+if FreelancerCategory is not None:
+    @receiver(m2m_changed, sender=FreelancerCategory.skills.through)
+    def on_freelancer_category_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        try:
+            if reverse and action == 'pre_clear':
+                # instance is a categories.Skill; remember who holds it before the rows go away
+                instance._indexed_user_ids = set(
+                    FreelancerCategory.objects.filter(skills=instance).values_list('user_id', flat=True)
+                )
+                return
+            if action not in ('post_add', 'post_remove', 'post_clear'):
+                return
+            if not reverse:
+                user_ids = {instance.user_id}
+            elif action == 'post_clear':
+                user_ids = getattr(instance, '_indexed_user_ids', set())
+            else:
+                user_ids = set(FreelancerCategory.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
+            for uid in user_ids:
+                index.index_user_category_skills(uid)
+        except Exception:
+            pass
+
+    @receiver(post_delete, sender=FreelancerCategory)
+    def on_freelancer_category_deleted(sender, instance, **kwargs):
+        try:
+            index.index_user_category_skills(instance.user_id)
+        except Exception:
+            pass
+
+
+# Incremental refresh: patch cached payloads affected by a change event
+from . import incremental
+
+
+@receiver(post_save, sender=get_user_model())
+def on_user_saved_patch_recommendations(sender, instance, created, update_fields=None, **kwargs):
+    if created or not incremental.incremental_enabled() or instance.user_type != 'freelancer':
+        return
+    if update_fields and not incremental.PATCH_USER_FIELDS.intersection(update_fields):
+        return
+    try:
+        # the affected-list lookup runs in the debounced task, not on the save path
+        incremental.schedule_patch(tasks.patch_recommendations_for_user, instance.pk)
+    except Exception:
+        pass
+
+
+if Project is not None:
+    def _schedule_project_patch(project):
+        if not incremental.incremental_enabled() or project.status != 'open':
+            return
+        try:
+            if incremental.affected_user_ids(project):
+                incremental.schedule_patch(tasks.patch_recommendations_for_project, project.pk)
+        except Exception:
+            pass
+
+    @receiver(post_save, sender=Project)
+    def on_project_opened(sender, instance, created, update_fields=None, **kwargs):
+        if created or (update_fields and 'status' in update_fields):
+            _schedule_project_patch(instance)
+
+    @receiver(m2m_changed, sender=Project.skills.through)
+    def on_project_skills_changed(sender, instance, action, reverse, **kwargs):
+        # skills are attached after create, which is when matching becomes possible
+        if action == 'post_add' and not reverse:
+            _schedule_project_patch(instance)
+
+
+# Keep the recommendation read cache in sync with newly written rows
+from .models import ProjectRecommendation, UserRecommendation
+from .cache import project_recommendations, user_recommendations
+
+
+@receiver(post_save, sender=ProjectRecommendation)
+def on_project_recommendation_saved(sender, instance, **kwargs):
+    try:
+        project_recommendations.store(instance.project_id, instance)
+    except Exception:
+        pass
+    # any save makes this the latest snapshot (a computed_at bump can revive an older one)
+    try:
+        incremental.sync_members([instance])
+    except Exception:
+        pass
+
+
+@receiver(post_save, sender=UserRecommendation)
+def on_user_recommendation_saved(sender, instance, **kwargs):
+    try:
+        user_recommendations.store(instance.user_id, instance)
+    except Exception:
+        pass
+
+
+# Keep FreelancerFeatures in sync with the rows it is derived from
+from . import features
+
+
+@receiver(post_save, sender=get_user_model())
+def on_user_saved_refresh_features(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not features.FEATURE_USER_FIELDS.intersection(update_fields):
+        return
+    try:
+        features.refresh_freelancer_features(instance)
+    except Exception:
+        pass
+
+
+try:
+    from reviews.models import Review
+except Exception:
+    Review = None
+
+if Review is not None:
+    @receiver(post_save, sender=Review)
+    def on_review_saved_refresh_features(sender, instance, **kwargs):
+        try:
+            features.refresh_for_user_id(instance.reviewee_id)
+        except Exception:
+            pass
+
+if Project is not None:
+    @receiver(post_save, sender=Contract)
+    def on_contract_saved_refresh_features(sender, instance, **kwargs):
+        try:
+            features.refresh_for_user_id(instance.freelancer_id)
+        except Exception:
+            pass
+
+    from marketplace.models import Skill as CatalogSkill
+
+    @receiver(post_save, sender=CatalogSkill)
+    def on_catalog_skill_saved_refresh_features(sender, instance, **kwargs):
+        # skill bitsets are keyed by catalog id, so holders of this name need new bits
+        try:
+            for uid in index.candidate_user_ids([instance.name]):
+                features.refresh_for_user_id(uid)
+        except Exception:
+            pass
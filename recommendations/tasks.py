@@ -1,13 +1,17 @@
+import logging
 from celery import shared_task
 from django.contrib.auth import get_user_model
 from marketplace.models import Project
-from .models import ProjectRecommendation, UserRecommendation
-from .utils import compute_candidate_score
-from django.utils import timezone
+from .models import ProjectRecommendation, UserRecommendation, FreelancerFeatures
+from .utils import compute_candidate_score, score_ceiling, project_skill_names, CandidatePool
 from django.conf import settings
-from celery import shared_task
 from accounts.models import User  
-from .utils import calculate_recommendations 
+from .index import candidate_user_ids
+from .ranking import rank_candidates
+from .retention import save_recommendation
+from .cache import project_recommendations, user_recommendations
+
+logger = logging.getLogger(__name__)
 
 
 User = get_user_model()
@@ -18,28 +22,33 @@ def compute_recommendations_for_project(self, project_id, top_k=10):
     try:
         project = Project.objects.get(id=project_id)
     except Project.DoesNotExist:
+        project_recommendations.release(project_id)
         return False
 
-    
-    candidates = User.objects.filter(user_type='freelancer')[:2000]  
-
-    scored = []
-    for u in candidates:
-        try:
-            score = compute_candidate_score(project, u)
-            if score > 0.01:
-                scored.append({'user_id': str(u.id), 'score': score, 'reason': 'heuristic'})
-        except Exception:
-            continue
-
-    scored_sorted = sorted(scored, key=lambda x: x['score'], reverse=True)[:top_k]
-
-    ProjectRecommendation.objects.create(
-        project_id=project_id,
-        computed_at=timezone.now(),
-        payload=scored_sorted,
-        source='heuristic',
-    )
+    project_skills = project_skill_names(project)
+    # FreelancerFeatures only holds active freelancers
+    freelancers = FreelancerFeatures.objects.all()
+    if project_skills:
+        # only freelancers sharing at least one skill, via the inverted skill index
+        freelancers = freelancers.filter(user_id__in=candidate_user_ids(project_skills))
+    else:
+        # no skills to match on: fall back to text similarity when the index exists
+        from .embeddings import ann_candidate_ids
+        text_matches = ann_candidate_ids(project, skills=[])
+        if text_matches:
+            freelancers = freelancers.filter(user_id__in=text_matches)
+
+    # whole candidate pool is ranked in one vectorized pass
+    pool = CandidatePool.from_features(freelancers)
+    scored_sorted = [
+        {'user_id': uid, 'score': score, 'reason': 'heuristic'}
+        for uid, score in pool.rank(project_skills, k=top_k, threshold=0.01)
+    ]
+
+    # replaces the latest snapshot in place when nothing changed
+    save_recommendation(ProjectRecommendation, {'project_id': project_id}, scored_sorted)
+    # a crashed run leaves the lock to its timeout
+    project_recommendations.release(project_id)
     return True
 
 @shared_task(bind=True)
@@ -50,62 +59,98 @@ def compute_recommendations_for_user(self, user_id, top_k=20):
     try:
         user = User.objects.get(id=user_id)
     except User.DoesNotExist:
+        user_recommendations.release(user_id)
         return False
 
-    
-    projects = Project.objects.filter(status='open').order_by('-created_at')[:1000]
-    scored = []
-    for p in projects:
-        try:
-            score = compute_candidate_score(p, user)
-            if score > 0.01:
-                scored.append({'project_id': str(p.id), 'score': score, 'reason': 'heuristic'})
-        except Exception:
-            continue
-
-    scored_sorted = sorted(scored, key=lambda x: x['score'], reverse=True)[:top_k]
-    UserRecommendation.objects.create(
-        user=user,
-        computed_at=timezone.now(),
-        payload=scored_sorted,
-        source='heuristic'
+    projects = Project.objects.filter(status='open').prefetch_related('skills').order_by('-created_at')[:1000]
+    ranked = rank_candidates(
+        projects.iterator(chunk_size=200),
+        top_k,
+        score_fn=lambda p: compute_candidate_score(p, user, project_skills=project_skill_names(p)),
+        # projects whose best possible score cannot enter the top k are never fully scored
+        ceiling_fn=lambda p: score_ceiling(p, user, project_skills=project_skill_names(p)),
+        threshold=0.01,
     )
+    scored_sorted = [{'project_id': str(p.id), 'score': score, 'reason': 'heuristic'} for score, p in ranked]
+    save_recommendation(UserRecommendation, {'user': user}, scored_sorted)
+    user_recommendations.release(user_id)
     return True
 
 
+
 @shared_task
-def compute_recommendations_for_project(project_id):
+def patch_recommendations_for_user(user_id):
     """
-    Calculate recommended freelancers for a given project.
+    Incremental refresh after a freelancer's scoring fields changed.
+    """
+    from .incremental import patch_project_recommendations_for_user
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        return 0
+    return patch_project_recommendations_for_user(user)
 
-    This task runs asynchronously when a new project is created.
+
+@shared_task
+def patch_recommendations_for_project(project_id):
     """
+    Incremental refresh after a project was opened or its skills changed.
+    """
+    from .incremental import patch_user_recommendations_for_project
     try:
         project = Project.objects.get(id=project_id)
     except Project.DoesNotExist:
-        return
+        return 0
+    return patch_user_recommendations_for_project(project)
+
+
+@shared_task
+def precompute_all_project_recommendations(chunk_size=500, top_k=10):
+    """
+    Nightly batch: precompute recommendations for every open project.
+    """
+    from .pipeline import precompute_project_recommendations
+    stats = precompute_project_recommendations(chunk_size=chunk_size, top_k=top_k)
+    logger.info("Precomputed %s projects in %ss (%s projects/sec, %s workers)",
+                stats['projects'], stats['seconds'], stats['projects_per_sec'], stats['workers'])
+    return stats
+
+
+@shared_task
+def compact_recommendation_history(keep=None):
+    """
+    Daily retention: keep only the latest snapshots per project/user.
+    """
+    from .retention import compact_all
+    result = compact_all(keep=keep)
+    logger.info("Compacted %s project / %s user snapshots", result['project'], result['user'])
+    return result
+
 
-   
+@shared_task
+def rebuild_freelancer_features():
+    """
+    Nightly repair of the FreelancerFeatures table.
+    """
+    from .features import rebuild_features
+    total = rebuild_features()
+    logger.info("Rebuilt features for %s freelancers", total)
+    return total
+
+
+@shared_task
+def update_embedding_index(full=False):
+    """
+    Re-embed freelancers whose profile changed since the last index build.
+    """
+    from django.core.cache import cache
+    from .embeddings import update_freelancer_index
+    # the memory-mapped index has a single writer
+    if not cache.add('recs:embeddings:lock', 1, 3600):
+        return 0
     try:
-        
-        from categories.models import FreelancerCategory
-        if project.category:
-            freelancers = FreelancerCategory.objects.filter(
-                category=project.category,
-                verified=True
-            ).select_related('user')[:10]
-
-            project.recommended_freelancers = [
-                {
-                    "user_id": str(f.user.id),
-                    "username": f.user.username,
-                    "category": f.category.name,
-                    "subcategory": f.subcategory.name if f.subcategory else None
-                }
-                for f in freelancers
-            ]
-            project.recommended_score = 0.85 
-            project.save(update_fields=["recommended_freelancers", "recommended_score"])
-
-    except Exception as e:
-        print(f"[Recommendations] Failed for Project {project_id}: {e}")
+        total = update_freelancer_index(full=full)
+    finally:
+        cache.delete('recs:embeddings:lock')
+    logger.info("Embedded %s freelancer profiles", total)
+    return total
@@ -1,7 +1,9 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
 from marketplace.models import Project, Skill
-from .utils import compute_candidate_score
+from django.utils import timezone
+from datetime import timedelta
+from .utils import compute_candidate_score, project_skill_names, CandidatePool
 
 User = get_user_model()
 
@@ -24,3 +26,230 @@ class RecommendationsBasicTests(TestCase):
         score = compute_candidate_score(self.project, self.f)
         self.assertGreater(score, 0)
 
+    def test_pool_scores_match_single_scores(self):
+        other = User.objects.create_user(email='other@example.com', full_name='X', password='pass', user_type='freelancer')
+        other.skills = ['Python', 'react', 'aws']
+        other.rating = 3.2
+        other.trust_score = 40
+        other.total_projects = 4
+        other.completed_orders = 3
+        other.last_seen = timezone.now() - timedelta(days=5)
+        other.save()
+
+        users = list(User.objects.filter(user_type='freelancer').order_by('id'))
+        pool = CandidatePool.from_queryset(User.objects.filter(user_type='freelancer').order_by('id'))
+        scores = pool.score(project_skill_names(self.project))
+        for u, s in zip(users, scores):
+            self.assertEqual(float(s), compute_candidate_score(self.project, u))
+
+    def test_skill_index_tracks_profile_skills(self):
+        from .index import candidate_user_ids
+        self.assertIn(self.f.id, list(candidate_user_ids(['Python'])))
+        self.assertNotIn(self.owner.id, list(candidate_user_ids(['Python'])))
+        self.f.skills = ['react']
+        self.f.save(update_fields=['skills'])
+        self.assertNotIn(self.f.id, list(candidate_user_ids(['python', 'django'])))
+        self.assertIn(self.f.id, list(candidate_user_ids(['React'])))
+
+    def test_rank_matches_full_sort(self):
+        for i in range(6):
+            u = User.objects.create_user(email=f'f{i}@example.com', full_name='F', password='pass', user_type='freelancer')
+            u.skills = ['python'] if i % 2 else ['django', 'go']
+            u.rating = i % 5
+            u.trust_score = 10 * i
+            u.save()
+        qs = User.objects.filter(user_type='freelancer').order_by('id')
+        pool = CandidatePool.from_queryset(qs)
+        skills = project_skill_names(self.project)
+        scores = pool.score(skills)
+        expected = sorted(
+            [(uid, float(s)) for uid, s in zip(pool.ids, scores) if s > 0.01],
+            key=lambda x: x[1], reverse=True,
+        )[:3]
+        self.assertEqual(pool.rank(skills, k=3, threshold=0.01), expected)
+
+    def test_ceiling_prunes_candidates_without_scoring_them(self):
+        from .ranking import rank_candidates
+        from .utils import score_ceiling
+        candidates = [['python', 'django'], ['python', 'django', 'go', 'rust', 'java', 'c'], ['django', 'python', 'go']]
+        scored = []
+
+        def score(skills):
+            scored.append(skills)
+            return compute_candidate_score(None, self.f, project_skills=skills)
+
+        for skills in candidates:
+            self.assertGreaterEqual(score_ceiling(None, self.f, project_skills=skills), score(skills))
+        expected = sorted(((s, c) for s, c in zip(map(score, candidates), candidates)), key=lambda x: -x[0])[:1]
+        scored.clear()
+        ranked = rank_candidates(candidates, 1, score_fn=score, threshold=0.01,
+                                 ceiling_fn=lambda skills: score_ceiling(None, self.f, project_skills=skills))
+        self.assertEqual(ranked, expected)
+        # the perfect match fills the heap; the others cannot beat it on skill count alone
+        self.assertEqual(scored, [candidates[0]])
+
+    def test_incremental_patch_inserts_and_drops_freelancer(self):
+        from .models import ProjectRecommendation
+        from .incremental import patch_project_recommendations_for_user
+        rec = ProjectRecommendation.objects.create(project_id=self.project.id, payload=[])
+        self.assertEqual(patch_project_recommendations_for_user(self.f), 1)
+        rec.refresh_from_db()
+        self.assertEqual([p['user_id'] for p in rec.payload], [str(self.f.id)])
+        self.assertEqual(rec.payload[0]['score'], compute_candidate_score(self.project, self.f))
+
+        self.f.user_type = 'buyer'
+        patch_project_recommendations_for_user(self.f)
+        rec.refresh_from_db()
+        self.assertEqual(rec.payload, [])
+
+    def test_incremental_patch_drops_freelancer_who_lost_skills(self):
+        from unittest import mock
+        from .models import ProjectRecommendation, ProjectRecommendationMember
+        from .incremental import patch_project_recommendations_for_user
+        rec = ProjectRecommendation.objects.create(project_id=self.project.id, payload=[
+            {'user_id': str(self.f.id), 'score': 0.9},
+            {'user_id': '999999', 'score': 0.5},
+        ])
+        self.assertTrue(ProjectRecommendationMember.objects.filter(project_id=self.project.id, user_id=self.f.id).exists())
+
+        # no skill overlap any more, so only the membership table finds this list
+        self.f.skills = ['react']
+        self.f.save(update_fields=['skills'])
+        with mock.patch('recommendations.tasks.compute_recommendations_for_project.delay') as refill:
+            self.assertEqual(patch_project_recommendations_for_user(self.f, top_k=2), 1)
+        rec.refresh_from_db()
+        self.assertEqual([p['user_id'] for p in rec.payload], ['999999'])
+        self.assertFalse(ProjectRecommendationMember.objects.filter(user_id=self.f.id).exists())
+        # the full list shrank, so a recompute back-fills it
+        refill.assert_called_once_with(str(self.project.id))
+
+    def test_precompute_pipeline_bulk_inserts(self):
+        from .models import ProjectRecommendation
+        from .pipeline import precompute_project_recommendations
+        stats = precompute_project_recommendations(chunk_size=1, workers=1)
+        self.assertEqual(stats['projects'], 1)
+        rec = ProjectRecommendation.objects.get(project_id=self.project.id)
+        self.assertEqual(rec.payload[0]['user_id'], str(self.f.id))
+        # an unchanged re-run only bumps computed_at
+        precompute_project_recommendations(chunk_size=1, workers=1)
+        self.assertEqual(ProjectRecommendation.objects.filter(project_id=self.project.id).count(), 1)
+        self.assertGreater(ProjectRecommendation.objects.get(project_id=self.project.id).computed_at, rec.computed_at)
+
+    def test_read_through_cache_levels(self):
+        from django.core.cache import cache
+        from .models import ProjectRecommendation
+        from .cache import project_recommendations as rc
+        ProjectRecommendation.objects.create(project_id=self.project.id, payload=[{'user_id': str(self.f.id), 'score': 0.5}])
+        cache.clear()
+        rc.local.clear()
+        before = dict(rc.counters)
+        self.assertEqual(rc.get(self.project.id)['payload'][0]['score'], 0.5)
+        self.assertEqual(rc.get(self.project.id)['payload'][0]['score'], 0.5)
+        rc.local.clear()
+        rc.get(self.project.id)
+        self.assertEqual(rc.counters['misses'] - before['misses'], 1)
+        self.assertEqual(rc.counters['local_hits'] - before['local_hits'], 1)
+        self.assertEqual(rc.counters['shared_hits'] - before['shared_hits'], 1)
+        self.assertEqual(rc.counters['refreshes'], before['refreshes'])
+
+        # a patch landing while a refresh is queued keeps the refresh lock
+        self.assertTrue(cache.add(f"{rc.key(self.project.id)}:refresh", 1))
+        rec = ProjectRecommendation.objects.get(project_id=self.project.id)
+        rec.payload = []
+        rec.save(update_fields=['payload'])
+        self.assertFalse(rc.refresh(self.project.id))
+        rc.release(self.project.id)
+        self.assertIsNone(cache.get(f"{rc.key(self.project.id)}:refresh"))
+
+    def test_compaction_keeps_latest_snapshots(self):
+        import gzip, os, tempfile
+        from .models import ProjectRecommendation
+        from .retention import compact, save_recommendation
+        base = timezone.now()
+        for i in range(5):
+            ProjectRecommendation.objects.create(project_id=self.project.id, computed_at=base - timedelta(hours=i), payload=[i])
+        archive_dir = tempfile.mkdtemp()
+        self.assertEqual(compact(ProjectRecommendation, 'project_id', keep=2, archive_dir=archive_dir), 3)
+        kept = ProjectRecommendation.objects.filter(project_id=self.project.id).order_by('-computed_at')
+        self.assertEqual([r.payload for r in kept], [[0], [1]])
+        (name,) = os.listdir(archive_dir)
+        with gzip.open(os.path.join(archive_dir, name), 'rt') as fh:
+            self.assertEqual(len(fh.readlines()), 3)
+
+        _, created = save_recommendation(ProjectRecommendation, {'project_id': self.project.id}, [0])
+        self.assertFalse(created)
+        self.assertEqual(kept.count(), 2)
+
+    def test_feature_pool_matches_user_pool(self):
+        from .models import FreelancerFeatures
+        from .features import rebuild_features
+        self.f.last_seen = timezone.now() - timedelta(days=3)
+        self.f.save(update_fields=['last_seen'])
+        self.assertEqual(FreelancerFeatures.objects.get(user=self.f).skill_count, 2)
+        skills = project_skill_names(self.project)
+        by_user = CandidatePool.from_queryset(User.objects.filter(user_type='freelancer')).score(skills)
+        by_features = CandidatePool.from_features(FreelancerFeatures.objects.all()).score(skills)
+        self.assertEqual(list(by_user), list(by_features))
+        self.assertEqual(rebuild_features(), 1)
+        self.assertFalse(FreelancerFeatures.objects.filter(user=self.owner).exists())
+
+    def test_embedding_index_incremental_update(self):
+        import tempfile
+        from django.test import override_settings
+        from .embeddings import update_freelancer_index, ann_candidate_ids, load_index
+        self.f.bio = 'Backend developer building REST APIs with Django and PostgreSQL'
+        self.f.save(update_fields=['bio'])
+        designer = User.objects.create_user(email='designer@example.com', full_name='D', password='pass', user_type='freelancer')
+        designer.bio = 'Logo design, branding and illustration in Figma'
+        designer.save(update_fields=['bio'])
+        self.project.description = 'Need a Django REST API backend'
+        with override_settings(RECOMMENDATIONS_EMBEDDING_DIR=tempfile.mkdtemp()):
+            self.assertEqual(update_freelancer_index(), 2)
+            self.assertEqual(update_freelancer_index(), 0)
+            self.assertEqual(ann_candidate_ids(self.project, k=1)[0], str(self.f.pk))
+            designer.is_active = False
+            designer.save(update_fields=['is_active'])
+            update_freelancer_index()
+            self.assertEqual([uid for uid in load_index().ids if uid], [str(self.f.pk)])
+
+    def test_benchmark_harness_rolls_back(self):
+        from .benchmark import run_benchmark
+        from .cache import project_recommendations, user_recommendations
+        users_before = User.objects.count()
+        cached_before = set(project_recommendations.local._data) | set(user_recommendations.local._data)
+        rows = run_benchmark(sizes=[40], samples=1, projects=10, skills=8)
+        self.assertEqual({r['path'] for r in rows}, {
+            'compute_recommendations_for_project', 'compute_recommendations_for_user', 'calculate_recommendations'})
+        self.assertTrue(all(r['queries'] > 0 and r['seconds'] > 0 for r in rows))
+        self.assertEqual(User.objects.count(), users_before)
+        self.assertEqual(set(project_recommendations.local._data) | set(user_recommendations.local._data), cached_before)
+
+
+class EmbeddingIndexTests(SimpleTestCase):
+    def test_lsh_query_above_exact_threshold(self):
+        import os, tempfile
+        import numpy as np
+        from unittest import mock
+        from django.test import override_settings
+        from . import embeddings
+        rng = np.random.default_rng(0)
+        vecs = rng.standard_normal((500, 64)).astype(np.float32)
+        vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+        path = tempfile.mkdtemp()
+        index = embeddings.AnnIndex(path, dim=64, capacity=16)
+        index.upsert(list(range(500)), vecs)
+        index.save()
+        self.assertTrue(os.path.exists(os.path.join(path, 'bucket_rows.npy')))
+
+        with override_settings(RECOMMENDATIONS_EMBEDDING_DIR=path), mock.patch.object(embeddings, 'EXACT_BELOW', 100):
+            loaded = embeddings.load_index()
+            self.assertIs(embeddings.load_index(), loaded)
+            self.assertIsNotNone(loaded._sorted)
+            for i in (0, 123, 499):
+                self.assertEqual(loaded.query(vecs[i], k=1)[0][0], str(i))
+
+            index.remove(['123'])
+            index.save()
+            reloaded = embeddings.load_index()
+            self.assertIsNot(reloaded, loaded)
+            self.assertNotIn('123', [uid for uid, _ in reloaded.query(vecs[123], k=5)])
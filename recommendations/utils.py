@@ -5,6 +5,8 @@ from django.utils import timezone
 from marketplace.models import Project
 from accounts.models import User
 from reviews.models import Review
+from .index import candidate_user_ids
+import numpy as np
 import math
 
 # NOTE: This file hosts the core heuristic scoring logic.
@@ -56,22 +58,30 @@ def trust_score_factor(user):
     except Exception:
         return 0.0
 
-def compute_candidate_score(project, candidate_user, weights=None):
+DEFAULT_WEIGHTS = {
+    'skill': 0.45,
+    'rating': 0.2,
+    'trust': 0.15,
+    'recency': 0.1,
+    'past_success': 0.1
+}
+
+
+def project_skill_names(project):
+    # resolve once per project and pass to the scorers to avoid a query per candidate
+    return [s.name for s in getattr(project, 'skills').all()] if hasattr(project, 'skills') else project.recommended_freelancers or []
+
+
+def compute_candidate_score(project, candidate_user, weights=None, project_skills=None):
     """
     Heuristic composite score:
     score = w1 * skill_overlap + w2 * rating + w3 * trust + w4 * recency + w5 * past_success
     Returns float 0..1
     """
-    weights = weights or {
-        'skill': 0.45,
-        'rating': 0.2,
-        'trust': 0.15,
-        'recency': 0.1,
-        'past_success': 0.1
-    }
+    weights = weights or DEFAULT_WEIGHTS
 
-    
-    project_skills = [s.name for s in getattr(project, 'skills').all()] if hasattr(project, 'skills') else project.recommended_freelancers or []
+    if project_skills is None:
+        project_skills = project_skill_names(project)
     user_skills = getattr(candidate_user, 'skills', []) or []
     skill_score = skill_overlap_score(project_skills, user_skills)  # 0..1
 
@@ -98,6 +108,190 @@ def compute_candidate_score(project, candidate_user, weights=None):
     return float(round(score, 4))
 
 
+def score_ceiling(project, candidate_user, weights=None, project_skills=None):
+    """
+    Cheap upper bound of compute_candidate_score: rating and trust exactly,
+    the skill overlap bounded by the two skill counts (no set intersection)
+    and recency / past success at their maximum.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    if project_skills is None:
+        project_skills = project_skill_names(project)
+    n_p = len(set(str(s).lower() for s in project_skills))
+    n_u = len(set(str(s).lower() for s in (getattr(candidate_user, 'skills', []) or [])))
+    skill_bound = min(n_p, n_u) / max(n_p, n_u) if n_p and n_u else 0.0
+    raw = (weights['skill'] * skill_bound +
+           weights['rating'] * rating_factor(candidate_user) +
+           weights['trust'] * trust_score_factor(candidate_user) +
+           weights['recency'] * 0.2 +
+           weights['past_success'] * 1.0)
+    # rounding is monotonic, so this never drops below the rounded score
+    return float(round(math.tanh(raw * 1.2), 4))
+
+
+
+class CandidatePool:
+    """
+    Column snapshot of the freelancer fields used by compute_candidate_score.
+
+    Rows are loaded once with values_list() and kept as NumPy arrays so a whole
+    pool can be scored against a project in one vectorized pass. Scores match
+    compute_candidate_score for the same user and weights.
+    """
+    FIELDS = ('id', 'skills', 'rating', 'trust_score', 'last_seen', 'total_projects', 'completed_orders')
+
+    def __init__(self, ids, vocab, skill_rows, skill_cols, skill_counts, rating, trust, last_seen, past_success):
+        self.ids = ids
+        self.vocab = vocab
+        self.skill_rows = np.asarray(skill_rows, dtype=np.int64)
+        self.skill_cols = np.asarray(skill_cols, dtype=np.int64)
+        self.skill_counts = np.asarray(skill_counts, dtype=np.float64)
+        self.rating = np.asarray(rating, dtype=np.float64)
+        self.trust = np.asarray(trust, dtype=np.float64)
+        self.last_seen = np.asarray(last_seen, dtype=np.float64)
+        self.past_success = np.asarray(past_success, dtype=np.float64)
+
+    @classmethod
+    def from_rows(cls, rows):
+        ids, ratings, trusts, seen, totals, completed = [], [], [], [], [], []
+        vocab = {}
+        skill_rows, skill_cols, skill_counts = [], [], []
+        for i, (uid, skills, rating, trust, last_seen, total, done) in enumerate(rows):
+            ids.append(str(uid))
+            tokens = set(str(s).lower() for s in (skills or []))
+            skill_counts.append(len(tokens))
+            for t in tokens:
+                skill_rows.append(i)
+                skill_cols.append(vocab.setdefault(t, len(vocab)))
+            ratings.append(float(rating or 0.0))
+            trusts.append(float(trust or 0.0))
+            seen.append(last_seen.timestamp() if last_seen else np.nan)
+            totals.append(total or 0)
+            completed.append(done or 0)
+
+        # static factors do not depend on the project, compute them once
+        totals = np.asarray(totals, dtype=np.float64)
+        completed = np.asarray(completed, dtype=np.float64)
+        return cls(
+            ids, vocab, skill_rows, skill_cols, skill_counts,
+            rating=np.clip(np.asarray(ratings, dtype=np.float64) / 5.0, 0.0, 1.0),
+            trust=np.clip(np.asarray(trusts, dtype=np.float64) / 100.0, 0.0, 1.0),
+            last_seen=seen,
+            past_success=np.divide(completed, totals, out=np.zeros_like(totals), where=totals > 0),
+        )
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls.from_rows(queryset.values_list(*cls.FIELDS))
+
+    @classmethod
+    def from_features(cls, queryset):
+        """
+        Build from FreelancerFeatures rows: values are already normalized and
+        skills come from the catalog bitset, so no User rows are touched.
+        """
+        from marketplace.models import Skill
+        vocab = {}
+        for sid, name in Skill.objects.values_list('id', 'name'):
+            vocab[str(name).lower()] = sid
+        ids, skill_rows, skill_cols, skill_counts = [], [], [], []
+        ratings, trusts, seen, past = [], [], [], []
+        rows = queryset.values_list('user_id', 'skill_bits', 'skill_count', 'rating', 'trust', 'last_seen', 'past_success')
+        for i, (uid, bits, count, rating, trust, last_seen, success) in enumerate(rows):
+            ids.append(str(uid))
+            cols = np.flatnonzero(np.unpackbits(np.frombuffer(bytes(bits or b''), dtype=np.uint8), bitorder='little'))
+            skill_rows.extend([i] * len(cols))
+            skill_cols.extend(cols.tolist())
+            skill_counts.append(count)
+            ratings.append(rating)
+            trusts.append(trust)
+            seen.append(last_seen.timestamp() if last_seen else np.nan)
+            past.append(success)
+        return cls(ids, vocab, skill_rows, skill_cols, skill_counts, ratings, trusts, seen, past)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def skill_overlap(self, project_skills):
+        n = len(self.ids)
+        set_p = set(str(s).lower() for s in (project_skills or []))
+        if not set_p or not n:
+            return np.zeros(n)
+        cols = [self.vocab[t] for t in set_p if t in self.vocab]
+        if cols:
+            hit = np.isin(self.skill_cols, cols)
+            inter = np.bincount(self.skill_rows[hit], minlength=n).astype(np.float64)
+        else:
+            inter = np.zeros(n)
+        denom = np.maximum(self.skill_counts, len(set_p))
+        # users without skills score 0, same as skill_overlap_score
+        return np.where(self.skill_counts > 0, inter / denom, 0.0)
+
+    def recency(self, now=None):
+        now = (now or timezone.now()).timestamp()
+        with np.errstate(invalid='ignore'):
+            days = np.floor((now - self.last_seen) / 86400.0)
+        boost = np.select([days <= 1, days <= 7, days <= 30], [0.2, 0.1, 0.02], default=0.0)
+        return np.where(np.isnan(self.last_seen), 0.0, boost)
+
+    def score(self, project_skills, weights=None, now=None):
+        """
+        Vectorized compute_candidate_score for every user in the pool.
+        Returns a float array aligned with self.ids.
+        """
+        weights = weights or DEFAULT_WEIGHTS
+        raw = (weights['skill'] * self.skill_overlap(project_skills) +
+               weights['rating'] * self.rating +
+               weights['trust'] * self.trust +
+               weights['recency'] * self.recency(now) +
+               weights['past_success'] * self.past_success)
+        return np.round(np.tanh(raw * 1.2), 4)
+
+    def rank(self, project_skills, k, threshold=0.0, weights=None, now=None, require_overlap=False):
+        """
+        Top-k (user_id, score) pairs above threshold for a project, best first.
+        With require_overlap, only users sharing a skill are ranked (same pool
+        the inverted skill index would return).
+
+        Lower/upper bounds (recency at 0 / at its 0.2 maximum) are used to drop
+        candidates that cannot reach the k-th best before recency is computed,
+        then only the survivors are partially sorted.
+        """
+        weights = weights or DEFAULT_WEIGHTS
+        n = len(self.ids)
+        if not n or k <= 0:
+            return []
+        overlap = self.skill_overlap(project_skills)
+        partial = (weights['skill'] * overlap +
+                   weights['rating'] * self.rating +
+                   weights['trust'] * self.trust)
+        low = partial + weights['past_success'] * self.past_success
+        ceiling = np.round(np.tanh((low + weights['recency'] * 0.2 + 1e-12) * 1.2), 4)
+        keep = ceiling > threshold
+        if require_overlap and project_skills:
+            keep &= overlap > 0
+            low = np.where(keep, low, -np.inf)
+        if k < n:
+            kth = np.partition(low, n - k)[n - k]
+            keep &= ceiling >= np.round(np.tanh((kth - 1e-12) * 1.2), 4)
+        idx = np.flatnonzero(keep)
+        if not len(idx):
+            return []
+
+        raw = (partial[idx] +
+               weights['recency'] * self.recency(now)[idx] +
+               weights['past_success'] * self.past_success[idx])
+        scores = np.round(np.tanh(raw * 1.2), 4)
+        hit = scores > threshold
+        idx, scores = idx[hit], scores[hit]
+        if len(idx) > k:
+            # argpartition keeps selection O(n); ties are settled by the stable sort below
+            cut = np.partition(scores, len(scores) - k)[len(scores) - k]
+            sel = scores >= cut
+            idx, scores = idx[sel], scores[sel]
+        order = np.lexsort((idx, -scores))[:k]
+        return [(self.ids[idx[i]], float(scores[i])) for i in order]
+
 def calculate_recommendations(project_id):
     """
     Main function called by tasks.py — compute best freelancers for a given project.
@@ -110,18 +304,22 @@ def calculate_recommendations(project_id):
 
     # basic candidate pool (freelancers only)
     freelancers = User.objects.filter(is_active=True, is_staff=False)
-    results = []
+    project_skills = project_skill_names(project)
+    if project_skills:
+        freelancers = freelancers.filter(id__in=candidate_user_ids(project_skills))
+    pool = CandidatePool.from_queryset(freelancers)
+    top = pool.rank(project_skills, k=20, threshold=0.3)  # threshold
 
-    for freelancer in freelancers:
-        score = compute_candidate_score(project, freelancer)[0]
-        if score > 0.3:  # threshold
-            results.append({
-                "user_id": str(freelancer.id),
-                "username": getattr(freelancer, "username", ""),
-                "score": score,
-                "reason": "matched_skills/trust"
-            })
-
-    # sort descending
-    results = sorted(results, key=lambda x: x["score"], reverse=True)
-    return results[:20]
\ No newline at end of file
+    usernames = {
+        str(uid): name
+        for uid, name in User.objects.filter(id__in=[uid for uid, _ in top]).values_list('id', 'username')
+    }
+    results = []
+    for uid, score in top:
+        results.append({
+            "user_id": uid,
+            "username": usernames.get(uid) or "",
+            "score": score,
+            "reason": "matched_skills/trust"
+        })
+    return results
@@ -4,6 +4,7 @@ from django.shortcuts import get_object_or_404
 from .models import Referral, ReferralCode, ReferralCommission
 from .serializers import ReferralCodeSerializer, ReferralSerializer, ReferralCommissionSerializer
 from .utils import create_referral_code_for_user, get_referrer_for_code
+from jobsalign.pagination import KeysetPagination
 
 class MyReferralCodeView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -15,6 +16,7 @@ class MyReferralCodeView(generics.RetrieveAPIView):
 class MyReferralsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ReferralSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Referral.objects.filter(referrer=self.request.user).order_by("-created_at")
@@ -50,7 +50,7 @@ class Referral(models.Model):
     total_commission = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
 
     class Meta:
-        indexes = [models.Index(fields=["code_used"]), models.Index(fields=["referrer"])]
+        indexes = [models.Index(fields=["code_used"]), models.Index(fields=["referrer"]), models.Index(fields=["referrer", "created_at", "id"])]
 
     def __str__(self):
         return f"{self.referrer} → {self.referred or 'Pending'} ({self.code_used})"
@@ -4,6 +4,7 @@ from django.shortcuts import get_object_or_404
 from .models import SubscriptionPlan, Coupon, UserSubscription, Invoice
 from .serializers import PlanSerializer, CouponSerializer, UserSubscriptionSerializer, InvoiceSerializer, SubscribeSerializer
 from . import utils
+from jobsalign.pagination import KeysetPagination
 from django.utils import timezone
 from decimal import Decimal
 
@@ -76,6 +77,7 @@ class CancelSubscriptionView(generics.GenericAPIView):
 class InvoiceListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = InvoiceSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Invoice.objects.filter(subscription__user=self.request.user).order_by('-created_at')
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0002_coupon_invoice_alter_subscriptionplan_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['subscription', 'created_at', 'id'], name='subscriptio_subscri_8f0d92_idx'),
+        ),
+    ]
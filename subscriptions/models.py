@@ -122,6 +122,9 @@ class Invoice(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['subscription', 'created_at', 'id'])]
+
     def mark_paid(self, reference=None, gateway_response=None):
         self.paid = True
         self.paid_at = timezone.now()